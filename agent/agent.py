@@ -26,6 +26,7 @@ from components import (
     LearningResourceRecommender,
     FeedbackGenerator
 )
+from shared.utils.classification_parser import classification_table_from_result
 
 class LearningObjectiveAgent:
     """Agent principal qui coordonne tous les composants"""
@@ -207,27 +208,18 @@ Utilisez une approche étape par étape et expliquez clairement votre raisonneme
         # Évaluation de la difficulté
         difficulty_evaluation = self.evaluator.evaluate(objectives)
         
-        # Extraction des niveaux de Bloom à partir de la classification
-        bloom_levels = {}
-        for obj in objectives:
-            # On extrait le niveau de Bloom de la classification
-            pattern = re.compile(rf"{re.escape(obj)}.*?Niveau de Bloom: ([a-zéè ]+)", re.DOTALL | re.IGNORECASE)
-            match = pattern.search(classification_result["classification"])
-            if match:
-                bloom_levels[obj] = match.group(1).strip()
-            else:
-                bloom_levels[obj] = "non classifié"
+        # Tableau des objectifs classifiés, calculé une seule fois
+        classified_objectives = classification_table_from_result(classification_result)
+        bloom_levels = {obj: classified_objectives.level_of(obj) for obj in objectives}
         
         # Recommandation de ressources
         recommendations = self.recommender.recommend(objectives, bloom_levels)
         
-        # Extraction des classifications détaillées pour le feedback
-        classifications = {}
-        pattern = r"Objectif: (.*?)\n(.*?)(?=Objectif:|$)"
-        matches = re.findall(pattern, classification_result["classification"], re.DOTALL)
-        for obj, classification in matches:
-            obj = obj.strip()
-            classifications[obj] = classification.strip()
+        # Classifications détaillées pour le feedback
+        classifications = {
+            entry.objective: f"Verbe principal: {entry.verb}\nNiveau de Bloom: {entry.level}\nJustification: {entry.justification}"
+            for entry in classified_objectives
+        }
         
         # Génération de feedback
         feedback = self.feedback_generator.generate_feedback(objectives, classifications)
@@ -237,6 +229,7 @@ Utilisez une approche étape par étape et expliquez clairement votre raisonneme
             "objectives": objectives,
             "content_analysis": content_analysis,
             "classification": classification_result,
+            "classified_objectives": classified_objectives.to_records(),
             "formatted_objectives": formatted_objectives,
             "difficulty_evaluation": difficulty_evaluation,
             "recommendations": recommendations,
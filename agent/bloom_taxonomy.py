@@ -1,4 +1,40 @@
-from typing import List, Optional
+import re
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+
+# Formes conjuguées ou participes -> terminaisons de l'infinitif possibles
+_INFINITIVE_RULES = [
+    ("issons", ("ir",)), ("issez", ("ir",)), ("issent", ("ir",)), ("issant", ("ir",)), ("isse", ("ir",)),
+    ("uisons", ("uire",)), ("uisez", ("uire",)), ("uisent", ("uire",)), ("uisant", ("uire",)),
+    ("ivons", ("ire",)), ("ivez", ("ire",)), ("ivent", ("ire",)), ("ivant", ("ire",)),
+    ("erons", ("er",)), ("eront", ("er",)), ("erez", ("er",)), ("erai", ("er",)), ("era", ("er",)),
+    ("irons", ("ir", "ire")), ("iront", ("ir", "ire")), ("irez", ("ir", "ire")), ("ira", ("ir", "ire")),
+    ("urons", ("ure",)), ("uront", ("ure",)), ("urez", ("ure",)), ("ura", ("ure",)), ("ut", ("ure",)),
+    ("ées", ("er",)), ("és", ("er",)), ("ée", ("er",)), ("é", ("er",)),
+    ("ons", ("er",)), ("ez", ("er",)), ("ent", ("er",)), ("ant", ("er",)),
+    ("it", ("ir", "ire")), ("is", ("ir", "ire")), ("es", ("er",)), ("e", ("er",)),
+]
+
+# Début d'objectif précédant le verbe d'action (« l'apprenant sera capable de ... »)
+_VERB_MARKER = re.compile(
+    r"\b(?:capables?|en mesure|aptes?)\s+(?:de\s+|d['’]\s*)"
+    r"|\b(?:pourra|pourront|devra|devront|saura|sauront|doit|doivent|savoir|pouvoir)\s+",
+    re.IGNORECASE
+)
+# Sujet explicite suivi directement du verbe conjugué (« l'apprenant listera ... »)
+_SUBJECT_MARKER = re.compile(
+    r"^\W*(?:l['’]\s*|les\s+|le\s+|chaque\s+)?(?:apprenant|étudiant|participant|élève|stagiaire)e?s?\s+",
+    re.IGNORECASE
+)
+_WORD = re.compile(r"[a-zà-ÿœ]+(?:-[a-zà-ÿœ]+)*")
+# Pronoms pouvant précéder le verbe (« de les identifier », « s'approprier »)
+_CLITICS = {"se", "s", "le", "la", "les", "l", "en", "y", "lui", "leur"}
+
+
+def _fold(text: str) -> str:
+    """Minuscules sans accents, pour comparer les verbes quelle que soit la saisie"""
+    text = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in text if not unicodedata.combining(c))
 
 class BloomTaxonomy:
     """Classe qui définit la taxonomie de Bloom avec ses niveaux et verbes associés"""
@@ -59,6 +95,77 @@ class BloomTaxonomy:
                 return level
         return None
     
+    # Index inversé : premier mot (sans accents) -> [(mots suivants, verbe, niveaux)], construit à la demande
+    _verb_index: Optional[Dict[str, List[Tuple[Tuple[str, ...], str, List[str]]]]] = None
+    
+    @classmethod
+    def _get_verb_index(cls) -> Dict[str, List[Tuple[Tuple[str, ...], str, List[str]]]]:
+        """Construit l'index inversé verbe -> niveaux (les expressions de plusieurs mots d'abord)"""
+        if cls._verb_index is None:
+            levels_by_verb: Dict[str, List[str]] = {}
+            for level, level_data in cls.LEVELS.items():
+                for verb in level_data["verbs"]:
+                    levels_by_verb.setdefault(verb, [])
+                    if level not in levels_by_verb[verb]:
+                        levels_by_verb[verb].append(level)
+            
+            index: Dict[str, List[Tuple[Tuple[str, ...], str, List[str]]]] = {}
+            for verb, levels in levels_by_verb.items():
+                words = _fold(verb).split()
+                index.setdefault(words[0], []).append((tuple(words[1:]), verb, levels))
+            for entries in index.values():
+                entries.sort(key=lambda entry: len(entry[0]), reverse=True)
+            cls._verb_index = index
+        return cls._verb_index
+    
+    @classmethod
+    def levels_for_verb(cls, verb: str) -> List[str]:
+        """Tous les niveaux auxquels appartient un verbe (plusieurs si le verbe est ambigu)"""
+        words = _fold(verb).split()
+        for rest, _, levels in cls._get_verb_index().get(words[0] if words else "", []):
+            if tuple(words[1:]) == rest:
+                return list(levels)
+        return []
+    
+    @classmethod
+    def _lemma_candidates(cls, word: str) -> List[str]:
+        """Infinitifs possibles d'une forme conjuguée présents dans l'index (« listera » -> « lister »)"""
+        index = cls._get_verb_index()
+        if word in index:
+            return [word]
+        candidates = []
+        for ending, replacements in _INFINITIVE_RULES:
+            if word.endswith(_fold(ending)) and len(word) > len(ending) + 1:
+                stem = word[:-len(ending)]
+                candidates.extend(stem + replacement for replacement in replacements if stem + replacement in index)
+        return list(dict.fromkeys(candidates))
+    
+    @classmethod
+    def extract_action_verb(cls, objective: str) -> Optional[Tuple[str, List[str]]]:
+        """Repère le verbe d'action en tête d'objectif et retourne (verbe à l'infinitif, niveaux)"""
+        marker = _VERB_MARKER.search(objective) or _SUBJECT_MARKER.search(objective)
+        text = objective[marker.end():] if marker else objective
+        words = _WORD.findall(_fold(text)[:200])
+        while words and words[0] in _CLITICS:
+            words = words[1:]
+        if not words:
+            return None
+        
+        index = cls._get_verb_index()
+        for lemma in cls._lemma_candidates(words[0]):
+            for rest, verb, levels in index[lemma]:
+                if tuple(words[1:1 + len(rest)]) == rest:
+                    return verb, list(levels)
+        return None
+    
+    @classmethod
+    def pre_classify(cls, objective: str) -> Optional[Tuple[str, str]]:
+        """Retourne (verbe, niveau) si le verbe d'action n'appartient qu'à un seul niveau, sinon None"""
+        match = cls.extract_action_verb(objective)
+        if match and len(match[1]) == 1:
+            return match[0], match[1][0]
+        return None
+    
     @classmethod
     def get_level_description(cls, level: str) -> str:
         """Obtient la description d'un niveau de Bloom"""
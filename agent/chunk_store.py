@@ -0,0 +1,202 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def hash_content(text: str) -> str:
+    """Empreinte SHA-256 du contenu d'un chunk ou d'un fichier"""
+    if isinstance(text, str):
+        text = text.encode("utf-8")
+    return hashlib.sha256(text).hexdigest()
+
+
+class ChunkStore:
+    """Manifeste SQLite des chunks indexés, adressés par le hash de leur contenu
+
+    - chunk_embeddings : un embedding par (hash du chunk, modèle), partagé entre sessions
+    - chunk_texts : texte de chaque chunk, stocké une seule fois par hash
+    - session_chunks : position (session, source, n° de chunk) -> hash du chunk, ordonnée
+      par clé primaire pour reconstituer un document par simple lecture de plage
+    - session_documents : fichiers déjà indexés dans une session (hash du fichier et résumé)
+    """
+
+    def __init__(self, db_path: str = "chunk_store.db"):
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunk_embeddings (
+                    content_hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    dimension INTEGER NOT NULL,
+                    embedding BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (content_hash, model)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunk_texts (
+                    content_hash TEXT PRIMARY KEY,
+                    text TEXT NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_chunks (
+                    session_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    chunk INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    PRIMARY KEY (session_id, source, chunk)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_session_chunks_hash ON session_chunks(session_id, content_hash)")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session_documents (
+                    session_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    file_hash TEXT NOT NULL,
+                    summary TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (session_id, source)
+                )
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connexion dans une transaction (validée ou annulée), fermée à la sortie du bloc"""
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    @staticmethod
+    def _placeholders(values: Sequence) -> str:
+        return ",".join("?" for _ in values)
+
+    def get_embeddings(self, hashes: Iterable[str], model: str) -> Dict[str, List[float]]:
+        """Retourne les embeddings déjà calculés pour ces hashes avec ce modèle"""
+        unique = list(dict.fromkeys(hashes))
+        found: Dict[str, List[float]] = {}
+        with self._lock, self._connect() as conn:
+            # Par tranches pour rester sous la limite de paramètres SQLite
+            for start in range(0, len(unique), 500):
+                part = unique[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT content_hash, embedding FROM chunk_embeddings "
+                    f"WHERE model = ? AND content_hash IN ({self._placeholders(part)})",
+                    [model, *part]
+                ).fetchall()
+                for content_hash, blob in rows:
+                    found[content_hash] = np.frombuffer(blob, dtype=np.float32).tolist()
+        return found
+
+    def put_embeddings(self, embeddings: Dict[str, List[float]], model: str):
+        """Enregistre des embeddings (float32) pour un modèle"""
+        now = time.time()
+        rows = []
+        for content_hash, vector in embeddings.items():
+            array = np.asarray(vector, dtype=np.float32)
+            rows.append((content_hash, model, int(array.shape[0]), array.tobytes(), now))
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO chunk_embeddings (content_hash, model, dimension, embedding, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def session_hashes(self, session_id: str, hashes: Iterable[str]) -> set:
+        """Retourne les hashes déjà indexés dans la session parmi ceux fournis"""
+        unique = list(dict.fromkeys(hashes))
+        present = set()
+        with self._lock, self._connect() as conn:
+            for start in range(0, len(unique), 500):
+                part = unique[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT DISTINCT content_hash FROM session_chunks "
+                    f"WHERE session_id = ? AND content_hash IN ({self._placeholders(part)})",
+                    [session_id, *part]
+                ).fetchall()
+                present.update(row[0] for row in rows)
+        return present
+
+    def record_session_chunks(self, session_id: str, rows: List[Tuple[str, int, str, str]]):
+        """Enregistre les positions (source, n° de chunk, hash, texte) indexées dans une session"""
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO chunk_texts (content_hash, text) VALUES (?, ?)",
+                [(content_hash, text) for _, _, content_hash, text in rows]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO session_chunks (session_id, source, chunk, content_hash) VALUES (?, ?, ?, ?)",
+                [(session_id, source, chunk, content_hash) for source, chunk, content_hash, _ in rows]
+            )
+
+    def get_session_chunks(self, session_id: str, source: Optional[str] = None) -> List[Tuple[str, int, str, str]]:
+        """Lit les chunks d'une session dans l'ordre (source, n° de chunk) : (source, chunk, hash, texte)"""
+        query = (
+            "SELECT sc.source, sc.chunk, sc.content_hash, ct.text FROM session_chunks sc "
+            "JOIN chunk_texts ct ON ct.content_hash = sc.content_hash "
+            "WHERE sc.session_id = ?"
+        )
+        params = [session_id]
+        if source is not None:
+            query += " AND sc.source = ?"
+            params.append(source)
+        query += " ORDER BY sc.source, sc.chunk"
+
+        with self._lock, self._connect() as conn:
+            return conn.execute(query, params).fetchall()
+
+    def get_document(self, session_id: str, source: str) -> Optional[Tuple[str, Dict]]:
+        """Retourne (hash du fichier, résumé) si le document est déjà indexé dans la session"""
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT file_hash, summary FROM session_documents WHERE session_id = ? AND source = ?",
+                (session_id, source)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def record_document(self, session_id: str, source: str, file_hash: str, summary: Dict):
+        """Marque un document comme entièrement indexé dans la session"""
+        with self._lock, self._connect() as conn:
+            # Une version plus courte du fichier ne doit pas garder ses anciennes positions
+            conn.execute(
+                "DELETE FROM session_chunks WHERE session_id = ? AND source = ? AND chunk >= ?",
+                (session_id, source, summary.get("chunk_count", 0))
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO session_documents (session_id, source, file_hash, summary, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (session_id, source, file_hash, json.dumps(summary, ensure_ascii=False), time.time())
+            )
+
+    def document_hashes(self, session_id: str, source: str) -> set:
+        """Hashes des chunks actuellement associés à un document de la session"""
+        with self._lock, self._connect() as conn:
+            rows = conn.execute(
+                "SELECT DISTINCT content_hash FROM session_chunks WHERE session_id = ? AND source = ?",
+                (session_id, source)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def unreferenced_hashes(self, session_id: str, hashes: Iterable[str]) -> List[str]:
+        """Retourne les hashes qui ne sont plus utilisés par aucun chunk de la session"""
+        candidates = list(dict.fromkeys(hashes))
+        still_used = self.session_hashes(session_id, candidates)
+        return [content_hash for content_hash in candidates if content_hash not in still_used]
+
+    def delete_session(self, session_id: str):
+        """Supprime le manifeste d'une session (les embeddings partagés sont conservés)"""
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM session_chunks WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM session_documents WHERE session_id = ?", (session_id,))
@@ -1,15 +1,259 @@
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate
 from langchain.chains import LLMChain
-from typing import List, Dict, Optional
+from typing import Any, Awaitable, Callable, List, Dict, Optional
+from pydantic import BaseModel, Field
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import json
 import re
+import threading
 from bloom_taxonomy import BloomTaxonomy
+from pipeline import ConcurrencyLimiter
+from tokenization import count_tokens_batch
+
+from shared.utils.llm_cache import get_llm_cache
+from shared.utils.classification_parser import iter_objective_blocks, normalize_objective, parse_classification
+
+# Budget de tokens de sortie par lot d'objectifs (0 = un seul appel) et appels simultanés
+DEFAULT_SHARD_TOKENS = 3000
+DEFAULT_SHARD_WORKERS = 4
+
+def _cache_identity(component) -> tuple:
+    """Retourne (modèle, température, prompt système) servant de clé de cache"""
+    llm = component.llm
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+    system_message = component.prompt.messages[0]
+    system_prompt = getattr(getattr(system_message, "prompt", None), "template", None) or str(system_message)
+    return model, getattr(llm, "temperature", None), system_prompt
+
+def _invoke_chain(component, inputs: Dict) -> str:
+    """Invoque la chaîne d'un composant en passant par le cache LLM"""
+    model, temperature, system_prompt = _cache_identity(component)
+
+    def compute():
+        with component.limiter.slot():
+            return component.chain.invoke(inputs)["text"]
+
+    return get_llm_cache().get_or_compute(model, temperature, system_prompt, inputs, compute)
+
+async def _ainvoke_chain(component, inputs: Dict) -> str:
+    """Version asynchrone de _invoke_chain"""
+    model, temperature, system_prompt = _cache_identity(component)
+
+    async def compute():
+        async with component.limiter.aslot():
+            result = await component.chain.ainvoke(inputs)
+        return result["text"]
+
+    return await get_llm_cache().aget_or_compute(model, temperature, system_prompt, inputs, compute)
+
+def _shard_objectives(objectives: List[str], tokens_per_objective: int, budget: int) -> List[List[str]]:
+    """Découpe les objectifs en lots contigus dont la sortie estimée tient dans le budget de tokens"""
+    if budget <= 0 or len(objectives) <= 1:
+        return [objectives]
+
+    # Chaque objectif est recopié dans la réponse, suivi de son analyse
+    estimates = [tokens + tokens_per_objective for tokens in count_tokens_batch(objectives)]
+    if sum(estimates) <= budget:
+        return [objectives]
+
+    shards, current, current_tokens = [], [], 0
+    for objective, estimate in zip(objectives, estimates):
+        if current and current_tokens + estimate > budget:
+            shards.append(current)
+            current, current_tokens = [], 0
+        current.append(objective)
+        current_tokens += estimate
+    shards.append(current)
+    return shards
+
+def _run_sharded(component, objectives: List[str], run_shard: Callable[[List[str]], Dict], merge: Callable) -> Dict:
+    """Exécute un composant par lots d'objectifs en parallèle et fusionne les résultats dans l'ordre
+
+    Chaque appel LLM d'un lot prend une place dans `component.limiter`, partagé avec les
+    autres étapes du pipeline : les threads des lots ne dépassent pas le plafond global.
+    """
+    shards = _shard_objectives(objectives, component.output_tokens_per_objective, component.shard_tokens)
+    if len(shards) == 1:
+        return run_shard(objectives)
+
+    print(f"🧩 {type(component).__name__}: {len(objectives)} objectifs répartis en {len(shards)} lots")
+    with ThreadPoolExecutor(max_workers=max(1, min(component.max_workers, len(shards)))) as executor:
+        results = list(executor.map(run_shard, shards))
+    return merge(objectives, shards, results)
+
+async def _arun_sharded(component, objectives: List[str], run_shard: Callable[[List[str]], Awaitable[Dict]], merge: Callable) -> Dict:
+    """Version asynchrone de _run_sharded"""
+    shards = _shard_objectives(objectives, component.output_tokens_per_objective, component.shard_tokens)
+    if len(shards) == 1:
+        return await run_shard(objectives)
+
+    print(f"🧩 {type(component).__name__}: {len(objectives)} objectifs répartis en {len(shards)} lots")
+    results = await asyncio.gather(*(run_shard(shard) for shard in shards))
+    return merge(objectives, shards, results)
+
+def _merge_records(text_key: str):
+    """Fusion des lots pour les composants à enregistrements : textes concaténés, enregistrements dans l'ordre"""
+    def merge(objectives: List[str], shards: List[List[str]], results: List[Dict]) -> Dict:
+        records: Dict[str, Dict] = {}
+        for result in results:
+            records.update(result["records"])
+        return {
+            text_key: "\n\n".join(result[text_key] for result in results),
+            "records": {obj: records[obj] for obj in objectives if obj in records}
+        }
+    return merge
+
+_NUMBERED_LINE = re.compile(r"^(\s*)(\d+)\.", re.MULTILINE)
+
+def _merge_formatted(objectives: List[str], shards: List[List[str]], results: List[Dict]) -> Dict:
+    """Fusion des reformulations : la numérotation de chaque lot reprend à la suite du précédent"""
+    texts, offset = [], 0
+    for shard, result in zip(shards, results):
+        text = result["formatted_objectives"]
+        first = _NUMBERED_LINE.search(text)
+        if offset and first and first.group(2) == "1":
+            text = _NUMBERED_LINE.sub(lambda m: f"{m.group(1)}{int(m.group(2)) + offset}.", text)
+        texts.append(text)
+        offset += len(shard)
+    return {"formatted_objectives": "\n\n".join(texts)}
+
+class BloomClassificationRecord(BaseModel):
+    """Classification d'un objectif selon la taxonomie de Bloom"""
+    objective: str = Field(description="Texte de l'objectif, recopié tel que fourni")
+    verb: str = Field(description="Verbe d'action principal")
+    level: str = Field(description="Niveau de Bloom en minuscules: se souvenir, comprendre, appliquer, analyser, évaluer ou créer")
+    justification: str = Field(description="Justification de la classification")
+
+class BloomClassificationReport(BaseModel):
+    """Classification de tous les objectifs fournis, dans l'ordre"""
+    classifications: List[BloomClassificationRecord]
+
+class DifficultyRecord(BaseModel):
+    """Évaluation de la difficulté d'un objectif"""
+    objective: str = Field(description="Texte de l'objectif, recopié tel que fourni")
+    level: int = Field(ge=1, le=5, description="Niveau de difficulté de 1 à 5")
+    justification: str = Field(description="Justification de l'évaluation")
+    estimated_time: str = Field(description="Estimation du temps nécessaire pour atteindre l'objectif")
+    advice: str = Field(default="", description="Conseils de décomposition si la difficulté est ≥ 4")
+
+class DifficultyReport(BaseModel):
+    """Évaluation de tous les objectifs fournis, dans l'ordre"""
+    evaluations: List[DifficultyRecord]
+
+def _build_structured_chain(llm, prompt, schema):
+    """Chaîne prompt | llm à sortie typée, ou None si le modèle ne la supporte pas"""
+    try:
+        return prompt | llm.with_structured_output(schema)
+    except Exception as e:
+        print(f"⚠️ Sortie structurée indisponible ({type(llm).__name__}): {e}")
+        return None
+
+def _invoke_structured(component, inputs: Dict) -> Optional[List[Dict]]:
+    """Invoque la chaîne structurée d'un composant (réponse JSON mise en cache) et retourne ses enregistrements"""
+    if component.structured_chain is None:
+        return None
+    model, temperature, system_prompt = _cache_identity(component)
+    try:
+        def compute():
+            with component.limiter.slot():
+                return component.structured_chain.invoke(inputs).model_dump_json()
+
+        payload = get_llm_cache().get_or_compute(model, temperature, system_prompt + "\n[structured]", inputs, compute)
+        return json.loads(payload)[component.records_field]
+    except Exception as e:
+        print(f"⚠️ Erreur sortie structurée, repli sur le texte: {e}")
+        return None
+
+async def _ainvoke_structured(component, inputs: Dict) -> Optional[List[Dict]]:
+    """Version asynchrone de _invoke_structured"""
+    if component.structured_chain is None:
+        return None
+    model, temperature, system_prompt = _cache_identity(component)
+
+    async def compute():
+        async with component.limiter.aslot():
+            report = await component.structured_chain.ainvoke(inputs)
+        return report.model_dump_json()
+
+    try:
+        payload = await get_llm_cache().aget_or_compute(
+            model, temperature, system_prompt + "\n[structured]", inputs, compute
+        )
+        return json.loads(payload)[component.records_field]
+    except Exception as e:
+        print(f"⚠️ Erreur sortie structurée, repli sur le texte: {e}")
+        return None
+
+def index_records_by_objective(objectives: List[str], records: List[Dict]) -> Dict[str, Dict]:
+    """Associe chaque objectif fourni à son enregistrement : texte exact, texte normalisé, puis position"""
+    by_key = {}
+    for record in records:
+        by_key.setdefault(normalize_objective(record.get("objective", "")), record)
+
+    indexed = {}
+    for position, objective in enumerate(objectives):
+        record = by_key.get(normalize_objective(objective))
+        if record is None and position < len(records) and len(records) == len(objectives):
+            record = records[position]
+        if record is not None:
+            indexed[objective] = dict(record, objective=objective)
+    return indexed
+
+def parse_classification_text(text: str) -> List[Dict]:
+    """Convertit une classification textuelle en enregistrements (repli si la sortie structurée échoue)"""
+    return [
+        {key: value for key, value in entry.to_dict().items() if key != "position"}
+        for entry in parse_classification(text)
+    ]
+
+def parse_difficulty_text(text: str) -> List[Dict]:
+    """Convertit une évaluation de difficulté textuelle en enregistrements"""
+    records = []
+    for objective, fields in iter_objective_blocks(text):
+        level_text = fields.get("niveau de difficulté", "")
+        level = re.search(r"[1-5]", level_text)
+        records.append({
+            "objective": objective,
+            "level": int(level.group()) if level else 3,
+            "justification": fields.get("justification", ""),
+            "estimated_time": fields.get("temps nécessaire", fields.get("temps estimé", "")),
+            "advice": fields.get("conseils", "")
+        })
+    return records
+
+def render_classification(records: List[Dict]) -> str:
+    """Rend les enregistrements de classification au format texte historique"""
+    return "\n\n".join(
+        f"Objectif: {record['objective']}\n"
+        f"Verbe principal: {record['verb']}\n"
+        f"Niveau de Bloom: {record['level']}\n"
+        f"Justification: {record['justification']}"
+        for record in records
+    )
+
+def render_difficulty(records: List[Dict]) -> str:
+    """Rend les enregistrements de difficulté au format texte"""
+    blocks = []
+    for record in records:
+        block = (
+            f"Objectif: {record['objective']}\n"
+            f"Niveau de difficulté: {record['level']}\n"
+            f"Justification: {record['justification']}\n"
+            f"Temps nécessaire: {record['estimated_time']}"
+        )
+        if record.get("advice"):
+            block += f"\nConseils: {record['advice']}"
+        blocks.append(block)
+    return "\n\n".join(blocks)
 
 class ObjectiveExtractor:
     """Classe pour extraire des objectifs d'apprentissage d'un texte"""
     
-    def __init__(self, llm):
+    def __init__(self, llm, limiter: Optional[ConcurrencyLimiter] = None):
         self.llm = llm
+        self.limiter = limiter or ConcurrencyLimiter(DEFAULT_SHARD_WORKERS)
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Vous êtes un expert en pédagogie spécialisé dans l'extraction d'objectifs d'apprentissage.
             Analysez le texte fourni et extrayez tous les objectifs d'apprentissage explicites ou implicites.
@@ -22,16 +266,24 @@ class ObjectiveExtractor:
     
     def extract(self, text: str) -> List[str]:
         """Extrait les objectifs d'apprentissage d'un texte"""
-        result = self.chain.invoke({"text": text})
-        # Nettoyer et extraire les objectifs ligne par ligne
-        objectives = [obj.strip() for obj in result["text"].split("\n") if obj.strip()]
-        return objectives
+        result = _invoke_chain(self, {"text": text})
+        return self._parse_objectives(result)
+    
+    async def aextract(self, text: str) -> List[str]:
+        """Version asynchrone de extract"""
+        result = await _ainvoke_chain(self, {"text": text})
+        return self._parse_objectives(result)
+    
+    def _parse_objectives(self, response: str) -> List[str]:
+        """Nettoie et extrait les objectifs ligne par ligne"""
+        return [obj.strip() for obj in response.split("\n") if obj.strip()]
 
 class ContentAnalyzer:
     """Classe pour analyser le contenu pédagogique"""
     
-    def __init__(self, llm):
+    def __init__(self, llm, limiter: Optional[ConcurrencyLimiter] = None):
         self.llm = llm
+        self.limiter = limiter or ConcurrencyLimiter(DEFAULT_SHARD_WORKERS)
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Vous êtes un expert en analyse de contenu pédagogique.
             Analysez le contenu fourni et répondez aux questions suivantes:
@@ -47,15 +299,36 @@ class ContentAnalyzer:
     
     def analyze(self, content: str) -> Dict:
         """Analyse le contenu pédagogique"""
-        result = self.chain.invoke({"content": content})
-        return {"analysis": result["text"]}
+        result = _invoke_chain(self, {"content": content})
+        return {"analysis": result}
+    
+    async def aanalyze(self, content: str) -> Dict:
+        """Version asynchrone de analyze"""
+        result = await _ainvoke_chain(self, {"content": content})
+        return {"analysis": result}
 
 class BloomClassifier:
     """Classe pour classifier les objectifs selon la taxonomie de Bloom"""
     
-    def __init__(self, llm):
+    # Estimation des tokens de sortie par objectif (verbe, niveau, justification)
+    output_tokens_per_objective = 120
+    
+    def __init__(
+        self,
+        llm,
+        shard_tokens: int = DEFAULT_SHARD_TOKENS,
+        max_workers: int = DEFAULT_SHARD_WORKERS,
+        verb_fast_path: bool = True,
+        limiter: Optional[ConcurrencyLimiter] = None
+    ):
         self.llm = llm
+        self.shard_tokens = shard_tokens
+        self.max_workers = max_workers
+        self.limiter = limiter or ConcurrencyLimiter(max_workers)
+        self.verb_fast_path = verb_fast_path
         self.bloom = BloomTaxonomy()
+        self._fast_path_lock = threading.Lock()
+        self._fast_path_counts = {"objectives": 0, "local": 0, "llm_calls": 0, "llm_calls_without_fast_path": 0}
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", f"""Vous êtes un expert de la taxonomie de Bloom. Voici les niveaux de la taxonomie avec leurs descriptions:
             
@@ -74,6 +347,8 @@ class BloomClassifier:
             ("human", "{objectives}")
         ])
         self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
+        self.records_field = "classifications"
+        self.structured_chain = _build_structured_chain(self.llm, self.prompt, BloomClassificationReport)
     
     def _format_bloom_levels(self) -> str:
         """Formate les niveaux de Bloom pour le prompt"""
@@ -84,16 +359,138 @@ class BloomClassifier:
         return result
     
     def classify(self, objectives: List[str]) -> Dict:
-        """Classifie les objectifs selon la taxonomie de Bloom"""
-        objectives_text = "\n".join(objectives)
-        result = self.chain.invoke({"objectives": objectives_text})
-        return {"classification": result["text"]}
+        """Classifie les objectifs selon la taxonomie de Bloom, par lots si la sortie dépasse le budget
+        
+        Les objectifs dont le verbe d'action n'appartient qu'à un niveau sont classés localement;
+        seuls les autres sont envoyés au LLM.
+        
+        Returns:
+            {"classification": texte, "records": {objectif: {"verb", "level", "justification"}},
+             "fast_path": statistiques de classification locale de cet appel}
+        """
+        local, escalated, counts = self._pre_classify(objectives)
+        llm_result = _run_sharded(self, escalated, self._classify_shard, _merge_records("classification")) if escalated else None
+        return self._merge_fast_path(objectives, local, llm_result, counts)
+    
+    async def aclassify(self, objectives: List[str]) -> Dict:
+        """Version asynchrone de classify"""
+        local, escalated, counts = self._pre_classify(objectives)
+        llm_result = None
+        if escalated:
+            llm_result = await _arun_sharded(self, escalated, self._aclassify_shard, _merge_records("classification"))
+        return self._merge_fast_path(objectives, local, llm_result, counts)
+    
+    def _pre_classify(self, objectives: List[str]) -> tuple:
+        """Classe localement les objectifs au verbe non ambigu
+        
+        Returns:
+            (enregistrements locaux, objectifs pour le LLM, compteurs de cet appel)
+        """
+        local: Dict[str, Dict] = {}
+        if self.verb_fast_path:
+            for objective in objectives:
+                match = self.bloom.pre_classify(objective)
+                if match:
+                    verb, level = match
+                    local[objective] = {
+                        "objective": objective,
+                        "verb": verb,
+                        "level": level,
+                        "justification": f"Le verbe « {verb} » n'appartient qu'au niveau « {level} » de la taxonomie de Bloom (classification locale)."
+                    }
+        escalated = [objective for objective in objectives if objective not in local]
+        
+        calls = len(_shard_objectives(escalated, self.output_tokens_per_objective, self.shard_tokens)) if escalated else 0
+        calls_without = len(_shard_objectives(objectives, self.output_tokens_per_objective, self.shard_tokens)) if objectives else 0
+        counts = {
+            "objectives": len(objectives),
+            "local": len(local),
+            "llm_calls": calls,
+            "llm_calls_without_fast_path": calls_without
+        }
+        with self._fast_path_lock:
+            for key, value in counts.items():
+                self._fast_path_counts[key] += value
+        if local:
+            print(f"⚡ Classification locale: {len(local)}/{len(objectives)} objectifs, {calls_without - calls}/{calls_without} appels LLM évités")
+        return local, escalated, counts
+    
+    def _merge_fast_path(self, objectives: List[str], local: Dict[str, Dict], llm_result: Optional[Dict], counts: Dict) -> Dict:
+        """Fusionne les classifications locales et celles du LLM dans l'ordre des objectifs"""
+        fast_path = self._summarize_fast_path(counts)
+        if not local and llm_result is not None:
+            return {**llm_result, "fast_path": fast_path}
+        llm_records = llm_result["records"] if llm_result else {}
+        records = {obj: local.get(obj) or llm_records[obj] for obj in objectives if obj in local or obj in llm_records}
+        
+        if len(records) == len(objectives) or llm_result is None:
+            text = render_classification(list(records.values()))
+        else:
+            # Réponse du LLM partiellement analysée : son texte brut est conservé tel quel
+            text = "\n\n".join([render_classification(list(local.values())), llm_result["classification"]])
+        return {"classification": text, "records": records, "fast_path": fast_path}
+    
+    def fast_path_stats(self) -> Dict:
+        """Cumul, depuis la création du composant (partagé entre analyses), des objectifs classés localement"""
+        with self._fast_path_lock:
+            counts = dict(self._fast_path_counts)
+        return self._summarize_fast_path(counts)
+    
+    @staticmethod
+    def _summarize_fast_path(counts: Dict) -> Dict:
+        """Ajoute aux compteurs la part classée localement et les appels LLM évités"""
+        counts = dict(counts)
+        avoided = counts["llm_calls_without_fast_path"] - counts["llm_calls"]
+        counts["local_ratio"] = round(counts["local"] / counts["objectives"], 3) if counts["objectives"] else 0.0
+        counts["llm_calls_avoided"] = avoided
+        counts["llm_calls_avoided_ratio"] = (
+            round(avoided / counts["llm_calls_without_fast_path"], 3) if counts["llm_calls_without_fast_path"] else 0.0
+        )
+        return counts
+    
+    def _classify_shard(self, objectives: List[str]) -> Dict:
+        """Classifie un lot d'objectifs en un appel"""
+        inputs = {"objectives": "\n".join(objectives)}
+        records = _invoke_structured(self, inputs)
+        if records is None:
+            text = _invoke_chain(self, inputs)
+            return self._build_result(objectives, parse_classification_text(text), text)
+        return self._build_result(objectives, records)
+    
+    async def _aclassify_shard(self, objectives: List[str]) -> Dict:
+        """Version asynchrone de _classify_shard"""
+        inputs = {"objectives": "\n".join(objectives)}
+        records = await _ainvoke_structured(self, inputs)
+        if records is None:
+            text = await _ainvoke_chain(self, inputs)
+            return self._build_result(objectives, parse_classification_text(text), text)
+        return self._build_result(objectives, records)
+    
+    def _build_result(self, objectives: List[str], records: List[Dict], text: Optional[str] = None) -> Dict:
+        """Indexe les enregistrements par objectif; le texte est rendu depuis les enregistrements s'il n'est pas fourni"""
+        for record in records:
+            record["level"] = record.get("level", "").strip().lower() or "non classifié"
+        indexed = index_records_by_objective(objectives, records)
+        rendered = text if text is not None else render_classification(list(indexed.values()) or records)
+        return {"classification": rendered, "records": indexed}
 
 class ObjectiveFormatter:
     """Classe pour reformuler et améliorer les objectifs d'apprentissage"""
     
-    def __init__(self, llm):
+    # Estimation des tokens de sortie par objectif (reformulation SMART)
+    output_tokens_per_objective = 90
+    
+    def __init__(
+        self,
+        llm,
+        shard_tokens: int = DEFAULT_SHARD_TOKENS,
+        max_workers: int = DEFAULT_SHARD_WORKERS,
+        limiter: Optional[ConcurrencyLimiter] = None
+    ):
         self.llm = llm
+        self.shard_tokens = shard_tokens
+        self.max_workers = max_workers
+        self.limiter = limiter or ConcurrencyLimiter(max_workers)
         self.bloom = BloomTaxonomy()
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Vous êtes un expert en formulation d'objectifs d'apprentissage.
@@ -114,16 +511,42 @@ class ObjectiveFormatter:
         self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
     
     def format(self, objectives: List[str]) -> Dict:
-        """Reformule et améliore les objectifs d'apprentissage"""
+        """Reformule et améliore les objectifs d'apprentissage, par lots si la sortie dépasse le budget"""
+        return _run_sharded(self, objectives, self._format_shard, _merge_formatted)
+    
+    async def aformat(self, objectives: List[str]) -> Dict:
+        """Version asynchrone de format"""
+        return await _arun_sharded(self, objectives, self._aformat_shard, _merge_formatted)
+    
+    def _format_shard(self, objectives: List[str]) -> Dict:
+        """Reformule un lot d'objectifs en un appel"""
         objectives_text = "\n".join(objectives)
-        result = self.chain.invoke({"objectives": objectives_text})
-        return {"formatted_objectives": result["text"]}
+        result = _invoke_chain(self, {"objectives": objectives_text})
+        return {"formatted_objectives": result}
+    
+    async def _aformat_shard(self, objectives: List[str]) -> Dict:
+        """Version asynchrone de _format_shard"""
+        objectives_text = "\n".join(objectives)
+        result = await _ainvoke_chain(self, {"objectives": objectives_text})
+        return {"formatted_objectives": result}
 
 class DifficultyEvaluator:
     """Classe pour évaluer la difficulté des objectifs d'apprentissage"""
     
-    def __init__(self, llm):
+    # Estimation des tokens de sortie par objectif (niveau, justification, temps, conseils)
+    output_tokens_per_objective = 200
+    
+    def __init__(
+        self,
+        llm,
+        shard_tokens: int = DEFAULT_SHARD_TOKENS,
+        max_workers: int = DEFAULT_SHARD_WORKERS,
+        limiter: Optional[ConcurrencyLimiter] = None
+    ):
         self.llm = llm
+        self.shard_tokens = shard_tokens
+        self.max_workers = max_workers
+        self.limiter = limiter or ConcurrencyLimiter(max_workers)
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Vous êtes un expert en évaluation de la difficulté des objectifs d'apprentissage.
             Pour chaque objectif fourni, évaluez sa difficulté sur une échelle de 1 à 5 où:
@@ -137,22 +560,62 @@ class DifficultyEvaluator:
             1. Le niveau de difficulté (1-5)
             2. Une justification de votre évaluation
             3. Une estimation du temps nécessaire pour l'atteindre
-            4. Des conseils pour décomposer l'objectif en sous-objectifs plus faciles si la difficulté est ≥ 4"""),
+            4. Des conseils pour décomposer l'objectif en sous-objectifs plus faciles si la difficulté est ≥ 4
+            
+            Formatez votre réponse pour chaque objectif comme:
+            Objectif: [texte de l'objectif]
+            Niveau de difficulté: [1-5]
+            Justification: [votre justification]
+            Temps nécessaire: [estimation]
+            Conseils: [conseils de décomposition]"""),
             ("human", "{objectives}")
         ])
         self.chain = LLMChain(llm=self.llm, prompt=self.prompt)
+        self.records_field = "evaluations"
+        self.structured_chain = _build_structured_chain(self.llm, self.prompt, DifficultyReport)
     
     def evaluate(self, objectives: List[str]) -> Dict:
-        """Évalue la difficulté des objectifs d'apprentissage"""
-        objectives_text = "\n".join(objectives)
-        result = self.chain.invoke({"objectives": objectives_text})
-        return {"difficulty_evaluation": result["text"]}
+        """Évalue la difficulté des objectifs d'apprentissage, par lots si la sortie dépasse le budget
+        
+        Returns:
+            {"difficulty_evaluation": texte, "records": {objectif: {"level", "justification", ...}}}
+        """
+        return _run_sharded(self, objectives, self._evaluate_shard, _merge_records("difficulty_evaluation"))
+    
+    async def aevaluate(self, objectives: List[str]) -> Dict:
+        """Version asynchrone de evaluate"""
+        return await _arun_sharded(self, objectives, self._aevaluate_shard, _merge_records("difficulty_evaluation"))
+    
+    def _evaluate_shard(self, objectives: List[str]) -> Dict:
+        """Évalue un lot d'objectifs en un appel"""
+        inputs = {"objectives": "\n".join(objectives)}
+        records = _invoke_structured(self, inputs)
+        if records is None:
+            text = _invoke_chain(self, inputs)
+            return self._build_result(objectives, parse_difficulty_text(text), text)
+        return self._build_result(objectives, records)
+    
+    async def _aevaluate_shard(self, objectives: List[str]) -> Dict:
+        """Version asynchrone de _evaluate_shard"""
+        inputs = {"objectives": "\n".join(objectives)}
+        records = await _ainvoke_structured(self, inputs)
+        if records is None:
+            text = await _ainvoke_chain(self, inputs)
+            return self._build_result(objectives, parse_difficulty_text(text), text)
+        return self._build_result(objectives, records)
+    
+    def _build_result(self, objectives: List[str], records: List[Dict], text: Optional[str] = None) -> Dict:
+        """Indexe les enregistrements par objectif; le texte est rendu depuis les enregistrements s'il n'est pas fourni"""
+        indexed = index_records_by_objective(objectives, records)
+        rendered = text if text is not None else render_difficulty(list(indexed.values()) or records)
+        return {"difficulty_evaluation": rendered, "records": indexed}
 
 class LearningResourceRecommender:
     """Classe pour recommander des ressources d'apprentissage"""
     
-    def __init__(self, llm):
+    def __init__(self, llm, limiter: Optional[ConcurrencyLimiter] = None):
         self.llm = llm
+        self.limiter = limiter or ConcurrencyLimiter(DEFAULT_SHARD_WORKERS)
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Vous êtes un expert en ressources pédagogiques.
             Pour chaque objectif d'apprentissage, recommandez:
@@ -168,20 +631,31 @@ class LearningResourceRecommender:
     
     def recommend(self, objectives: List[str], bloom_levels: Dict[str, str]) -> Dict:
         """Recommande des ressources d'apprentissage"""
+        objectives_text = self._format_objectives_with_levels(objectives, bloom_levels)
+        result = _invoke_chain(self, {"objectives_with_levels": objectives_text})
+        return {"recommendations": result}
+    
+    async def arecommend(self, objectives: List[str], bloom_levels: Dict[str, str]) -> Dict:
+        """Version asynchrone de recommend"""
+        objectives_text = self._format_objectives_with_levels(objectives, bloom_levels)
+        result = await _ainvoke_chain(self, {"objectives_with_levels": objectives_text})
+        return {"recommendations": result}
+    
+    def _format_objectives_with_levels(self, objectives: List[str], bloom_levels: Dict[str, str]) -> str:
+        """Associe chaque objectif à son niveau de Bloom pour le prompt"""
         objectives_with_levels = []
         for obj in objectives:
             level = bloom_levels.get(obj, "non classifié")
             objectives_with_levels.append(f"Objectif: {obj}\nNiveau Bloom: {level}")
         
-        objectives_text = "\n\n".join(objectives_with_levels)
-        result = self.chain.invoke({"objectives_with_levels": objectives_text})
-        return {"recommendations": result["text"]}
+        return "\n\n".join(objectives_with_levels)
 
 class FeedbackGenerator:
     """Classe pour générer du feedback sur les objectifs d'apprentissage"""
     
-    def __init__(self, llm):
+    def __init__(self, llm, limiter: Optional[ConcurrencyLimiter] = None):
         self.llm = llm
+        self.limiter = limiter or ConcurrencyLimiter(DEFAULT_SHARD_WORKERS)
         self.prompt = ChatPromptTemplate.from_messages([
             ("system", """Vous êtes un expert en conception pédagogique spécialisé dans l'évaluation des objectifs d'apprentissage.
             Analysez les objectifs fournis et générez un feedback constructif sur:
@@ -199,5 +673,11 @@ class FeedbackGenerator:
     def generate_feedback(self, objectives: List[str], classifications: Dict) -> Dict:
         """Génère du feedback sur les objectifs d'apprentissage"""
         objectives_text = "\n\n".join([f"Objectif: {obj}\n{classifications.get(obj, 'Non classifié')}" for obj in objectives])
-        result = self.chain.invoke({"objectives_with_classifications": objectives_text})
-        return {"feedback": result["text"]}
\ No newline at end of file
+        result = _invoke_chain(self, {"objectives_with_classifications": objectives_text})
+        return {"feedback": result}
+    
+    async def agenerate_feedback(self, objectives: List[str], classifications: Dict) -> Dict:
+        """Version asynchrone de generate_feedback"""
+        objectives_text = "\n\n".join([f"Objectif: {obj}\n{classifications.get(obj, 'Non classifié')}" for obj in objectives])
+        result = await _ainvoke_chain(self, {"objectives_with_classifications": objectives_text})
+        return {"feedback": result}
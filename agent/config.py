@@ -12,6 +12,48 @@ LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4.1-mini")
 AGENT_TEMPERATURE = float(os.getenv("AGENT_TEMPERATURE", 0.2))
 VERBOSE_MODE = os.getenv("VERBOSE_MODE", "True").lower() == "true"
 
+# Nombre maximal d'appels LLM simultanés dans le pipeline d'analyse (toutes étapes et tous lots confondus)
+PIPELINE_MAX_CONCURRENCY = int(os.getenv("PIPELINE_MAX_CONCURRENCY", 4))
+
+# Embeddings des documents : budget de tokens par lot et lots simultanés
+EMBEDDING_BATCH_TOKENS = int(os.getenv("EMBEDDING_BATCH_TOKENS", 20000))
+EMBEDDING_MAX_WORKERS = int(os.getenv("EMBEDDING_MAX_WORKERS", 4))
+
+# Index vectoriel : "pinecone" (distant) ou "local" (NumPy sur disque)
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+LOCAL_VECTOR_STORE_DIR = os.getenv("LOCAL_VECTOR_STORE_DIR", "./vector_store")
+
+# Dossier des embeddings précalculés (mots-clés de recherche d'objectifs)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache")
+
+# Extraction d'objectifs : appels LLM simultanés et budget de regroupement des chunks courts (0 = désactivé)
+OBJECTIVE_EXTRACTION_MAX_WORKERS = int(os.getenv("OBJECTIVE_EXTRACTION_MAX_WORKERS", 4))
+OBJECTIVE_PACK_TOKENS = int(os.getenv("OBJECTIVE_PACK_TOKENS", 0))
+
+# Processus utilisés pour extraire et découper les fichiers en parallèle (1 = désactivé)
+INGEST_PROCESS_WORKERS = int(os.getenv("INGEST_PROCESS_WORKERS", min(4, os.cpu_count() or 1)))
+
+# Manifeste SQLite des chunks indexés (à côté de educational_platform.db)
+CHUNK_STORE_PATH = os.getenv("CHUNK_STORE_PATH", "chunk_store.db")
+
+# Déduplication sémantique des objectifs : seuil cosinus et taille au-delà de laquelle le mode approché (LSH) est utilisé
+DEDUP_SIMILARITY_THRESHOLD = float(os.getenv("DEDUP_SIMILARITY_THRESHOLD", 0.9))
+DEDUP_APPROXIMATE_ABOVE = int(os.getenv("DEDUP_APPROXIMATE_ABOVE", 2000))
+
+# Recherche dans les documents : "dense" (embeddings), "lexical" (BM25 local) ou "hybrid" (fusion RRF)
+SEARCH_MODE = os.getenv("SEARCH_MODE", "dense")
+
+# Nombre d'embeddings de requêtes gardés en mémoire (copie float32 dans EMBEDDING_CACHE_DIR)
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", 1024))
+
+# Classification, reformulation et difficulté : budget de tokens de sortie par lot d'objectifs (0 = un seul appel)
+# et threads de lots par appel (leurs requêtes restent bornées par PIPELINE_MAX_CONCURRENCY)
+OBJECTIVE_SHARD_TOKENS = int(os.getenv("OBJECTIVE_SHARD_TOKENS", 3000))
+OBJECTIVE_SHARD_MAX_WORKERS = int(os.getenv("OBJECTIVE_SHARD_MAX_WORKERS", 4))
+
+# Classification locale des objectifs dont le verbe d'action n'appartient qu'à un niveau de Bloom (sans appel LLM)
+BLOOM_VERB_FAST_PATH = os.getenv("BLOOM_VERB_FAST_PATH", "true").lower() == "true"
+
 # Configuration Flask
 FLASK_ENV = os.getenv("FLASK_ENV", "development")
 FLASK_DEBUG = int(os.getenv("FLASK_DEBUG", 1))
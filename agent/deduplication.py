@@ -0,0 +1,135 @@
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class _UnionFind:
+    """Union-find avec compression de chemin pour regrouper les paires similaires"""
+
+    def __init__(self, size: int):
+        self.parent = np.arange(size)
+
+    def find(self, i: int) -> int:
+        root = i
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[i] != root:
+            self.parent[i], i = root, self.parent[i]
+        return root
+
+    def union(self, a: int, b: int):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a != root_b:
+            # La plus petite racine est conservée pour un résultat déterministe
+            if root_a < root_b:
+                self.parent[root_b] = root_a
+            else:
+                self.parent[root_a] = root_b
+
+
+class SemanticDeduplicator:
+    """Regroupe des textes quasi identiques d'après la similarité cosinus de leurs embeddings
+
+    - mode exact (n <= `approximate_above`) : matrice de similarité complète en un produit matriciel
+    - mode approché : LSH par hyperplans aléatoires; seules les paires partageant un
+      bucket (codes triés, O(n log n)) sont comparées
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        approximate_above: int = 2000,
+        num_planes: int = 12,
+        num_tables: int = 6,
+        seed: int = 0
+    ):
+        self.threshold = threshold
+        self.approximate_above = approximate_above
+        self.num_planes = num_planes
+        self.num_tables = num_tables
+        self.seed = seed
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (vectors / norms).astype(np.float32)
+
+    def cluster(self, vectors: np.ndarray) -> np.ndarray:
+        """Retourne pour chaque vecteur l'indice du représentant de son groupe"""
+        vectors = self._normalize(np.asarray(vectors, dtype=np.float32))
+        n = len(vectors)
+        union_find = _UnionFind(n)
+
+        if n <= self.approximate_above:
+            similarities = vectors @ vectors.T
+            rows, cols = np.nonzero(np.triu(similarities >= self.threshold, k=1))
+            for a, b in zip(rows, cols):
+                union_find.union(int(a), int(b))
+        else:
+            self._cluster_approximate(vectors, union_find)
+
+        return np.array([union_find.find(i) for i in range(n)])
+
+    def _cluster_approximate(self, vectors: np.ndarray, union_find: _UnionFind):
+        """Compare uniquement les vecteurs qui tombent dans le même bucket LSH d'au moins une table"""
+        rng = np.random.default_rng(self.seed)
+        powers = 1 << np.arange(self.num_planes)
+
+        for _ in range(self.num_tables):
+            planes = rng.standard_normal((vectors.shape[1], self.num_planes)).astype(np.float32)
+            codes = ((vectors @ planes) > 0).astype(np.int64) @ powers
+            order = np.argsort(codes, kind="stable")
+            sorted_codes = codes[order]
+            boundaries = np.flatnonzero(np.diff(sorted_codes)) + 1
+
+            for bucket in np.split(order, boundaries):
+                if len(bucket) < 2:
+                    continue
+                similarities = vectors[bucket] @ vectors[bucket].T
+                rows, cols = np.nonzero(np.triu(similarities >= self.threshold, k=1))
+                for a, b in zip(rows, cols):
+                    union_find.union(int(bucket[a]), int(bucket[b]))
+
+    def deduplicate(
+        self,
+        items: List[Dict[str, Any]],
+        vectors: np.ndarray,
+        score_key: str = "relevance_score"
+    ) -> List[Dict[str, Any]]:
+        """Garde l'élément de meilleur score de chaque groupe, dans l'ordre de première apparition"""
+        if not items:
+            return []
+
+        labels = self.cluster(vectors)
+        best: Dict[int, int] = {}
+        for i, label in enumerate(labels):
+            label = int(label)
+            if label not in best or items[i].get(score_key, 0.0) > items[best[label]].get(score_key, 0.0):
+                best[label] = i
+
+        return [items[best[int(label)]] for label in dict.fromkeys(labels.tolist())]
+
+
+def benchmark_deduplication(num_items: int = 5000, dimension: int = 256, duplicates_per_item: int = 2) -> dict:
+    """Compare les modes exact et approché sur des vecteurs synthétiques avec paraphrases bruitées"""
+    rng = np.random.default_rng(42)
+    base = rng.standard_normal((num_items // (duplicates_per_item + 1), dimension)).astype(np.float32)
+    variants = [base] + [base + 0.05 * rng.standard_normal(base.shape).astype(np.float32) for _ in range(duplicates_per_item)]
+    vectors = np.concatenate(variants)
+    items = [{"objective": str(i), "relevance_score": float(rng.random())} for i in range(len(vectors))]
+
+    results: Dict[str, Optional[float]] = {"items": len(vectors), "expected_groups": len(base)}
+    for mode, limit in (("exact", len(vectors)), ("approximate", 0)):
+        deduplicator = SemanticDeduplicator(threshold=0.9, approximate_above=limit)
+        start = time.perf_counter()
+        unique = deduplicator.deduplicate(items, vectors)
+        results[f"{mode}_seconds"] = round(time.perf_counter() - start, 3)
+        results[f"{mode}_groups"] = len(unique)
+    return results
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmark déduplication sémantique")
+    print(benchmark_deduplication())
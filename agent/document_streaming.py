@@ -0,0 +1,122 @@
+import io
+import zipfile
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterator, Union
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    from PyPDF2 import PdfReader
+
+# Le splitter est résolu à côté de ce module (agent.document_streaming ou document_streaming) :
+# un processus de travail qui importe ce module sous le même nom le retrouve sans dépendre de sys.path
+try:
+    from .tokenization import TokenAwareTextSplitter
+except ImportError:
+    from tokenization import TokenAwareTextSplitter
+
+SUPPORTED_EXTENSIONS = ("pdf", "txt", "docx", "doc")
+
+# Taille maximale d'un segment texte émis d'un seul bloc (caractères)
+MAX_SEGMENT_CHARS = 64 * 1024
+
+_WORD_NAMESPACE = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _as_stream(data: Union[bytes, BinaryIO]) -> BinaryIO:
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return io.BytesIO(data)
+    return data
+
+
+def iter_pdf_pages(data: Union[bytes, BinaryIO]) -> Iterator[str]:
+    """Produit le texte d'un PDF page par page"""
+    reader = PdfReader(_as_stream(data))
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        if text.strip():
+            yield text
+
+
+def iter_docx_paragraphs(data: Union[bytes, BinaryIO]) -> Iterator[str]:
+    """Produit les paragraphes d'un .docx en parcourant word/document.xml de façon incrémentale"""
+    with zipfile.ZipFile(_as_stream(data)) as archive:
+        with archive.open("word/document.xml") as xml_stream:
+            parts = []
+            for event, element in ET.iterparse(xml_stream, events=("end",)):
+                if element.tag == f"{_WORD_NAMESPACE}t" and element.text:
+                    parts.append(element.text)
+                elif element.tag == f"{_WORD_NAMESPACE}tab":
+                    parts.append("\t")
+                elif element.tag in (f"{_WORD_NAMESPACE}br", f"{_WORD_NAMESPACE}cr"):
+                    parts.append("\n")
+                elif element.tag == f"{_WORD_NAMESPACE}p":
+                    paragraph = "".join(parts)
+                    parts = []
+                    # Libérer les éléments déjà traités pour garder une mémoire bornée
+                    element.clear()
+                    if paragraph.strip():
+                        yield paragraph
+
+
+def iter_text_paragraphs(data: Union[bytes, BinaryIO], encoding: str = "utf-8") -> Iterator[str]:
+    """Produit les paragraphes d'un fichier texte (blocs séparés par une ligne vide)"""
+    reader = io.TextIOWrapper(_as_stream(data), encoding=encoding, errors="replace")
+    buffer = []
+    size = 0
+    for line in reader:
+        if not line.strip():
+            if buffer:
+                yield "".join(buffer)
+                buffer, size = [], 0
+            continue
+        buffer.append(line)
+        size += len(line)
+        if size >= MAX_SEGMENT_CHARS:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
+    reader.detach()
+
+
+def iter_document_segments(file_name: str, data: Union[bytes, BinaryIO]) -> Iterator[str]:
+    """Produit paresseusement les pages ou paragraphes d'un document selon son extension"""
+    file_extension = file_name.split(".")[-1].lower()
+
+    if file_extension == "pdf":
+        return iter_pdf_pages(data)
+    if file_extension == "txt":
+        return iter_text_paragraphs(data)
+    if file_extension in ["docx", "doc"]:
+        return iter_docx_paragraphs(data)
+    raise ValueError(f"Type de fichier non supporté: {file_extension}")
+
+
+def new_document_summary(file_name: str) -> dict:
+    """Résumé d'un document rempli au fil de la lecture"""
+    return {"name": file_name, "text_preview": "", "word_count": 0, "char_count": 0, "chunk_count": 0}
+
+
+def iter_counted_segments(file_name: str, data: Union[bytes, BinaryIO], summary: dict) -> Iterator[str]:
+    """Produit les segments d'un document en calculant ses statistiques sans conserver le texte"""
+    for segment in iter_document_segments(file_name, data):
+        if len(summary["text_preview"]) < 200:
+            joined = (summary["text_preview"] + "\n" + segment) if summary["text_preview"] else segment
+            summary["text_preview"] = joined[:200]
+        summary["word_count"] += len(segment.split())
+        summary["char_count"] += len(segment)
+        yield segment
+
+
+def chunk_document_worker(file_name: str, data: bytes, chunk_size: int, chunk_overlap: int, separators: list):
+    """Extrait et découpe un document dans un processus séparé (fonction picklable)
+
+    Returns:
+        Tuple (résumé du document, liste des chunks)
+    """
+    splitter = TokenAwareTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap, separators=separators)
+    summary = new_document_summary(file_name)
+    chunks = list(splitter.split_stream(iter_counted_segments(file_name, data, summary)))
+    summary["chunk_count"] = len(chunks)
+    return summary, chunks
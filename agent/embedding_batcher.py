@@ -0,0 +1,138 @@
+import hashlib
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, Optional
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class EmbeddingBatcher:
+    """Calcule les embeddings de nombreux chunks par lots dimensionnés en tokens
+
+    Les lots sont envoyés via `embed_documents` et plusieurs lots peuvent être
+    traités simultanément. Tout objet exposant `embed_documents(List[str])`
+    convient, ce qui permet de mesurer le débit hors ligne avec FakeEmbeddings.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        max_batch_tokens: int = 20000,
+        max_batch_size: int = 256,
+        max_workers: int = 4,
+        token_counter: Optional[Callable[[str], int]] = None,
+        batch_token_counter: Optional[Callable[[List[str]], List[int]]] = None
+    ):
+        self.embeddings = embeddings
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max_batch_size
+        self.max_workers = max(1, max_workers)
+        self.token_counter = token_counter or (lambda text: max(1, len(text) // 4))
+        # Si fourni, compte les tokens de tous les textes en un seul appel
+        self.batch_token_counter = batch_token_counter
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """Regroupe les indices des textes en lots respectant le budget de tokens"""
+        batches = []
+        current, current_tokens = [], 0
+
+        if self.batch_token_counter is not None:
+            sizes = self.batch_token_counter(texts)
+        else:
+            sizes = [self.token_counter(text) for text in texts]
+
+        for i, tokens in enumerate(sizes):
+            if current and (current_tokens + tokens > self.max_batch_tokens or len(current) >= self.max_batch_size):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed(self, texts: List[str], progress_callback: Optional[ProgressCallback] = None) -> List[Optional[List[float]]]:
+        """Retourne les embeddings dans l'ordre des textes (None pour un lot en échec)"""
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        if not texts:
+            return embeddings
+
+        batches = self.make_batches(texts)
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self.embeddings.embed_documents, [texts[i] for i in batch]): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    for i, vector in zip(batch, future.result()):
+                        embeddings[i] = vector
+                except Exception as batch_error:
+                    print(f"⚠️ Erreur embedding lot de {len(batch)} chunks: {batch_error}")
+
+                done += len(batch)
+                if progress_callback:
+                    progress_callback(done, len(texts))
+
+        return embeddings
+
+
+class FakeEmbeddings:
+    """Embeddings déterministes sans appel réseau, avec latence simulée par requête"""
+
+    def __init__(self, dimension: int = 1536, latency_per_call: float = 0.05):
+        self.dimension = dimension
+        self.latency_per_call = latency_per_call
+        self.calls = 0
+
+    def _vector(self, text: str) -> List[float]:
+        seed = hashlib.sha256(text.encode("utf-8")).digest()
+        values = [(seed[i % len(seed)] - 127.5) / 127.5 for i in range(self.dimension)]
+        norm = math.sqrt(sum(v * v for v in values)) or 1.0
+        return [v / norm for v in values]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        time.sleep(self.latency_per_call)
+        return self._vector(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        time.sleep(self.latency_per_call)
+        return [self._vector(text) for text in texts]
+
+
+def benchmark_embedding_throughput(num_chunks: int = 500, chunk_words: int = 250, latency_per_call: float = 0.02) -> dict:
+    """Compare l'embedding chunk par chunk et l'embedding par lots sur des données synthétiques"""
+    chunks = [" ".join(f"mot{i}_{j}" for j in range(chunk_words)) for i in range(num_chunks)]
+
+    sequential = FakeEmbeddings(dimension=64, latency_per_call=latency_per_call)
+    start = time.perf_counter()
+    for chunk in chunks:
+        sequential.embed_query(chunk)
+    sequential_time = time.perf_counter() - start
+
+    batched = FakeEmbeddings(dimension=64, latency_per_call=latency_per_call)
+    batcher = EmbeddingBatcher(batched)
+    start = time.perf_counter()
+    batcher.embed(chunks)
+    batched_time = time.perf_counter() - start
+
+    return {
+        "chunks": num_chunks,
+        "sequential_seconds": round(sequential_time, 3),
+        "sequential_requests": sequential.calls,
+        "batched_seconds": round(batched_time, 3),
+        "batched_requests": batched.calls,
+        "speedup": round(sequential_time / batched_time, 1) if batched_time else None
+    }
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmark embeddings (hors ligne)")
+    print(benchmark_embedding_throughput())
@@ -1,29 +1,75 @@
 import os
-import tempfile
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+import io
 from typing import List, Dict, Any, Optional, Tuple
 import re
+import sys
+from pathlib import Path
 from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from langchain_pinecone import PineconeVectorStore
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain.chains import LLMChain
 from langchain.agents import Tool, AgentExecutor, create_openai_tools_agent
 from langchain.memory import ConversationBufferMemory
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.document_loaders import PyPDFLoader, TextLoader, Docx2txtLoader
 from langchain.schema import Document
-import tiktoken
-from pinecone import Pinecone, ServerlessSpec
+import numpy as np
 
 # Importer la configuration
 try:
-    from config import OPENAI_API_KEY, LLM_MODEL, AGENT_TEMPERATURE, VERBOSE_MODE, PINECONE_API_KEY
+    from config import (
+        OPENAI_API_KEY, LLM_MODEL, AGENT_TEMPERATURE, VERBOSE_MODE, PINECONE_API_KEY,
+        PIPELINE_MAX_CONCURRENCY, EMBEDDING_BATCH_TOKENS, EMBEDDING_MAX_WORKERS,
+        VECTOR_STORE_BACKEND, LOCAL_VECTOR_STORE_DIR, EMBEDDING_CACHE_DIR,
+        OBJECTIVE_EXTRACTION_MAX_WORKERS, OBJECTIVE_PACK_TOKENS, INGEST_PROCESS_WORKERS,
+        CHUNK_STORE_PATH, DEDUP_SIMILARITY_THRESHOLD, DEDUP_APPROXIMATE_ABOVE, SEARCH_MODE,
+        QUERY_EMBEDDING_CACHE_SIZE, OBJECTIVE_SHARD_TOKENS, OBJECTIVE_SHARD_MAX_WORKERS,
+        BLOOM_VERB_FAST_PATH
+    )
 except ImportError:
     OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
     LLM_MODEL = os.environ.get("LLM_MODEL", "gpt-3.5-turbo")
     AGENT_TEMPERATURE = float(os.environ.get("AGENT_TEMPERATURE", 0.2))
     VERBOSE_MODE = os.environ.get("VERBOSE_MODE", "True").lower() == "true"
     PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY")
+    PIPELINE_MAX_CONCURRENCY = int(os.environ.get("PIPELINE_MAX_CONCURRENCY", 4))
+    EMBEDDING_BATCH_TOKENS = int(os.environ.get("EMBEDDING_BATCH_TOKENS", 20000))
+    EMBEDDING_MAX_WORKERS = int(os.environ.get("EMBEDDING_MAX_WORKERS", 4))
+    VECTOR_STORE_BACKEND = os.environ.get("VECTOR_STORE_BACKEND", "pinecone")
+    LOCAL_VECTOR_STORE_DIR = os.environ.get("LOCAL_VECTOR_STORE_DIR", "./vector_store")
+    EMBEDDING_CACHE_DIR = os.environ.get("EMBEDDING_CACHE_DIR", "./embedding_cache")
+    OBJECTIVE_EXTRACTION_MAX_WORKERS = int(os.environ.get("OBJECTIVE_EXTRACTION_MAX_WORKERS", 4))
+    OBJECTIVE_PACK_TOKENS = int(os.environ.get("OBJECTIVE_PACK_TOKENS", 0))
+    INGEST_PROCESS_WORKERS = int(os.environ.get("INGEST_PROCESS_WORKERS", min(4, os.cpu_count() or 1)))
+    CHUNK_STORE_PATH = os.environ.get("CHUNK_STORE_PATH", "chunk_store.db")
+    DEDUP_SIMILARITY_THRESHOLD = float(os.environ.get("DEDUP_SIMILARITY_THRESHOLD", 0.9))
+    DEDUP_APPROXIMATE_ABOVE = int(os.environ.get("DEDUP_APPROXIMATE_ABOVE", 2000))
+    SEARCH_MODE = os.environ.get("SEARCH_MODE", "dense")
+    QUERY_EMBEDDING_CACHE_SIZE = int(os.environ.get("QUERY_EMBEDDING_CACHE_SIZE", 1024))
+    OBJECTIVE_SHARD_TOKENS = int(os.environ.get("OBJECTIVE_SHARD_TOKENS", 3000))
+    OBJECTIVE_SHARD_MAX_WORKERS = int(os.environ.get("OBJECTIVE_SHARD_MAX_WORKERS", 4))
+    BLOOM_VERB_FAST_PATH = os.environ.get("BLOOM_VERB_FAST_PATH", "true").lower() == "true"
 
+if __name__ == "__main__":
+    # Exécution directe (python enhanced_agent.py) : ajouter le répertoire racine pour le package shared
+    sys.path.append(str(Path(__file__).parent.parent))
+
+from pipeline import ConcurrencyLimiter, StageGraph
+from embedding_batcher import EmbeddingBatcher
+from tokenization import TokenAwareTextSplitter, count_tokens, count_tokens_batch
+from chunk_store import ChunkStore, hash_content
+from deduplication import SemanticDeduplicator
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from query_embedding_cache import QueryEmbeddingCache
+from document_streaming import (
+    chunk_document_worker,
+    iter_counted_segments,
+    iter_document_segments,
+    new_document_summary
+)
+from vector_stores import VectorStore, create_vector_store
 from components import (
     ObjectiveExtractor,
     ContentAnalyzer,
@@ -33,26 +79,85 @@ from components import (
     LearningResourceRecommender,
     FeedbackGenerator
 )
+from shared.utils.classification_parser import ClassificationTable, classification_table_from_result
+
+# Mots-clés pour rechercher les sections contenant des objectifs
+OBJECTIVE_KEYWORDS = [
+    "objectif apprentissage",
+    "learning objective", 
+    "compétence visée",
+    "à la fin de ce cours",
+    "l'étudiant sera capable",
+    "students will be able",
+    "learning outcome",
+    "but pédagogique",
+    "compétences développées",
+    "skills acquired"
+]
 
 class DocumentProcessor:
     """Classe pour traiter et gérer les documents pédagogiques avec extraction d'objectifs"""
     
-    def __init__(self, embedding_model="text-embedding-3-small", index_name="learn-obj"):
-        self.embeddings = OpenAIEmbeddings(
+    def __init__(self, embedding_model="text-embedding-3-small", index_name="learn-obj", embeddings=None,
+                 vector_store: Optional[VectorStore] = None, chunk_store: Optional[ChunkStore] = None,
+                 openai_api_key: Optional[str] = None):
+        # Les embeddings peuvent être injectés (ex: FakeEmbeddings pour les benchmarks hors ligne)
+        self.embedding_model = embedding_model
+        self.embeddings = embeddings or OpenAIEmbeddings(
             model=embedding_model,
-            openai_api_key=OPENAI_API_KEY
+            openai_api_key=openai_api_key or OPENAI_API_KEY
+        )
+        self.embedding_batcher = EmbeddingBatcher(
+            self.embeddings,
+            max_batch_tokens=EMBEDDING_BATCH_TOKENS,
+            max_workers=EMBEDDING_MAX_WORKERS,
+            token_counter=self._tiktoken_len,
+            batch_token_counter=count_tokens_batch
         )
         
-        # Initialiser Pinecone
-        self._initialize_pinecone(index_name)
+        # Cache des embeddings de requêtes (mémoire LRU + disque)
+        self.query_embedding_cache = QueryEmbeddingCache(
+            self.embeddings,
+            self._embedding_identity(),
+            cache_dir=EMBEDDING_CACHE_DIR,
+            max_entries=QUERY_EMBEDDING_CACHE_SIZE
+        )
+        
+        # Initialiser l'index vectoriel (Pinecone ou local selon VECTOR_STORE_BACKEND)
+        if vector_store is not None:
+            self.index = vector_store
+            self.index_name = index_name
+        else:
+            self._initialize_vector_store(index_name)
+        
+        # Manifeste des chunks adressés par contenu (embeddings réutilisés entre uploads et sessions)
+        self.chunk_store = chunk_store or ChunkStore(CHUNK_STORE_PATH)
+        
+        # Index lexical BM25 par session, construit pendant l'ingestion
+        self.lexical_indexes: Dict[str, BM25Index] = {}
+        self._lexical_lock = threading.Lock()
+        self.search_mode = SEARCH_MODE
+        
+        # Déduplication sémantique des objectifs extraits
+        self.deduplicator = SemanticDeduplicator(
+            threshold=DEDUP_SIMILARITY_THRESHOLD,
+            approximate_above=DEDUP_APPROXIMATE_ABOVE
+        )
+        
+        # Embeddings des mots-clés d'objectifs, identiques pour toutes les sessions
+        self._keyword_embeddings: Optional[List[List[float]]] = None
+        self._load_keyword_embeddings()
         
         # Text splitter optimisé pour les objectifs d'apprentissage
-        self.text_splitter = RecursiveCharacterTextSplitter(
+        self.text_splitter = TokenAwareTextSplitter(
             chunk_size=400,  # Plus petit pour éviter les erreurs de tokens
             chunk_overlap=80,
-            length_function=self._tiktoken_len,
             separators=["\n\n", "\n", ". ", " ", ""]
         )
+        # Nombre de chunks accumulés avant calcul des embeddings et envoi à l'index
+        self.ingest_flush_chunks = 256
+        # Processus de découpage pour les envois de plusieurs fichiers (1 = tout dans le processus courant)
+        self.ingest_process_workers = max(1, INGEST_PROCESS_WORKERS)
         
         # LLM pour l'extraction d'objectifs depuis les documents
         self.llm = ChatOpenAI(
@@ -91,61 +196,67 @@ Si aucun objectif n'est trouvé, répondez : "AUCUN OBJECTIF IDENTIFIÉ"
 """),
             ("human", "TEXTE À ANALYSER:\n{text}")
         ])
+        self.objective_extraction_chain = self.objective_extraction_prompt | self.llm
+        
+        # Extraction parallèle des chunks et regroupement optionnel des chunks courts (0 = désactivé)
+        self.extraction_max_workers = max(1, OBJECTIVE_EXTRACTION_MAX_WORKERS)
+        self.pack_tokens = OBJECTIVE_PACK_TOKENS
     
-    def _initialize_pinecone(self, index_name: str):
-        """Initialise la connexion à Pinecone"""
+    def _initialize_vector_store(self, index_name: str):
+        """Initialise l'index vectoriel configuré (Pinecone ou local)"""
         try:
-            pc = Pinecone(api_key=PINECONE_API_KEY)
-            
-            existing_indexes = pc.list_indexes()
-            index_names = [idx.name for idx in existing_indexes]
-            
-            if index_name not in index_names:
-                pc.create_index(
-                    name=index_name,
-                    dimension=1536,
-                    metric='cosine',
-                    spec=ServerlessSpec(cloud="aws", region="us-east-1")
-                )
-            
-            self.index = pc.Index(index_name)
+            self.index = create_vector_store(
+                VECTOR_STORE_BACKEND,
+                index_name=index_name,
+                api_key=PINECONE_API_KEY,
+                root_dir=LOCAL_VECTOR_STORE_DIR
+            )
             self.index_name = index_name
-            print(f"✅ Pinecone initialisé avec l'index: {index_name}")
+            print(f"✅ Index vectoriel '{VECTOR_STORE_BACKEND}' initialisé: {index_name}")
             
         except Exception as e:
-            print(f"❌ Erreur lors de l'initialisation de Pinecone: {e}")
+            print(f"❌ Erreur lors de l'initialisation de l'index vectoriel: {e}")
             raise
     
+    def _keyword_embeddings_path(self) -> str:
+        """Chemin du fichier d'embeddings des mots-clés, propre au modèle et à la liste de mots-clés"""
+        identity = f"{type(self.embeddings).__name__}|{self.embedding_model}|" + "|".join(OBJECTIVE_KEYWORDS)
+        digest = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:16]
+        return os.path.join(EMBEDDING_CACHE_DIR, f"objective_keywords_{digest}.npy")
+    
+    def _load_keyword_embeddings(self) -> Optional[List[List[float]]]:
+        """Charge les embeddings des mots-clés depuis le disque, ou les calcule en un appel et les persiste"""
+        if self._keyword_embeddings is not None:
+            return self._keyword_embeddings
+        
+        path = self._keyword_embeddings_path()
+        try:
+            if os.path.exists(path):
+                self._keyword_embeddings = np.load(path).tolist()
+            else:
+                vectors = self.embeddings.embed_documents(OBJECTIVE_KEYWORDS)
+                os.makedirs(EMBEDDING_CACHE_DIR, exist_ok=True)
+                tmp_path = path + ".tmp.npy"
+                np.save(tmp_path, np.asarray(vectors, dtype=np.float32))
+                os.replace(tmp_path, path)
+                self._keyword_embeddings = [list(vector) for vector in vectors]
+        except Exception as e:
+            print(f"⚠️ Erreur préparation des embeddings de mots-clés: {e}")
+        
+        return self._keyword_embeddings
+    
     def _tiktoken_len(self, text: str) -> int:
         """Calcule la longueur d'un texte en tokens"""
-        try:
-            tokenizer = tiktoken.get_encoding("cl100k_base")
-            tokens = tokenizer.encode(text, disallowed_special=())
-            return len(tokens)
-        except Exception:
-            # Fallback simple
-            return len(text.split())
+        return count_tokens(text)
+    
+    def iter_file_segments(self, uploaded_file):
+        """Produit les pages ou paragraphes d'un fichier uploadé directement depuis son buffer mémoire"""
+        return iter_document_segments(uploaded_file.name, io.BytesIO(uploaded_file.getvalue()))
     
     def extract_text_from_file(self, uploaded_file) -> str:
         """Extrait le texte d'un fichier uploadé"""
-        file_extension = uploaded_file.name.split(".")[-1].lower()
-        
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f".{file_extension}") as tmp_file:
-            tmp_file.write(uploaded_file.getvalue())
-            tmp_path = tmp_file.name
-        
         try:
-            if file_extension == "pdf":
-                loader = PyPDFLoader(tmp_path)
-            elif file_extension == "txt":
-                loader = TextLoader(tmp_path, encoding='utf-8')
-            elif file_extension in ["docx", "doc"]:
-                loader = Docx2txtLoader(tmp_path)
-            else:
-                raise ValueError(f"Type de fichier non supporté: {file_extension}")
-            
-            docs = loader.load()
-            text = "\n".join([doc.page_content for doc in docs])
+            text = "\n".join(self.iter_file_segments(uploaded_file))
             
             if not text.strip():
                 raise ValueError("Le fichier ne contient pas de texte extractible")
@@ -155,101 +266,318 @@ Si aucun objectif n'est trouvé, répondez : "AUCUN OBJECTIF IDENTIFIÉ"
         except Exception as e:
             print(f"Erreur lors de l'extraction du fichier {uploaded_file.name}: {e}")
             return f"Erreur d'extraction pour {uploaded_file.name}: {str(e)}"
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
     
-    def process_documents(self, files: List, session_id: str) -> Tuple[List[str], List[str]]:
+    def _embedding_identity(self) -> str:
+        """Identifie le modèle d'embedding pour le partage des vecteurs entre sessions"""
+        return f"{type(self.embeddings).__name__}:{self.embedding_model}"
+    
+    def _vector_id(self, session_id: str, content_hash: str) -> str:
+        """ID de session pointant vers un contenu adressé par son hash"""
+        return f"{session_id}_{content_hash}"
+    
+    def _embed_and_upsert(self, pending_chunks: List[Tuple[str, int, str, int]], session_id: str) -> Tuple[int, int]:
+        """
+        Indexe un lot de chunks en ne calculant que les embeddings inconnus du manifeste
+        
+        Returns:
+            Tuple (chunks indexés dans la session, chunks en échec)
         """
-        Traite une liste de fichiers et les stocke dans Pinecone
+        model = self._embedding_identity()
+        hashes = [hash_content(chunk) for _, _, chunk, _ in pending_chunks]
+        
+        # Réutiliser les embeddings déjà calculés (toutes sessions confondues)
+        known = self.chunk_store.get_embeddings(hashes, model)
+        already_indexed = self.chunk_store.session_hashes(session_id, hashes)
+        
+        missing = {}
+        for content_hash, (_, _, chunk, _) in zip(hashes, pending_chunks):
+            if content_hash not in known and content_hash not in missing:
+                missing[content_hash] = chunk
+        
+        if missing:
+            # Embeddings par lots (un appel embed_documents par lot au lieu d'un appel par chunk)
+            computed = self._embed_texts_with_store(list(missing.values()))
+            known.update({h: e for h, e in zip(missing.keys(), computed) if e is not None})
+        print(f"♻️ {len(hashes) - len(missing)}/{len(hashes)} embeddings réutilisés")
+        
+        vectors_to_upsert = []
+        rows_by_id = {}
+        indexed_rows = []
+        failed = 0
+        for content_hash, (name, i, chunk, file_size) in zip(hashes, pending_chunks):
+            if content_hash in already_indexed:
+                indexed_rows.append((name, i, content_hash, chunk))
+                continue
+            
+            embedding = known.get(content_hash)
+            if embedding is None:
+                print(f"⚠️ Erreur chunk {i} de {name}: embedding indisponible")
+                failed += 1
+                continue
+            
+            vector_id = self._vector_id(session_id, content_hash)
+            if vector_id in rows_by_id:
+                rows_by_id[vector_id].append((name, i, content_hash, chunk))
+                continue
+            rows_by_id[vector_id] = [(name, i, content_hash, chunk)]
+            
+            vectors_to_upsert.append({
+                "id": vector_id,
+                "values": embedding,
+                "metadata": {
+                    "text": chunk,
+                    "source": name,
+                    "chunk": i,
+                    "session_id": session_id,
+                    "content_type": "educational_content",
+                    "file_size": file_size,
+                    "content_hash": content_hash
+                }
+            })
+        
+        # Uploader vers l'index par batch
+        stored = 0
+        batch_size = 50
+        for i in range(0, len(vectors_to_upsert), batch_size):
+            batch = vectors_to_upsert[i:i + batch_size]
+            try:
+                self.index.upsert(vectors=batch)
+                stored += len(batch)
+                for vector in batch:
+                    indexed_rows.extend(rows_by_id[vector["id"]])
+            except Exception as batch_error:
+                print(f"❌ Erreur batch de {len(batch)} vecteurs: {batch_error}")
+                failed += sum(len(rows_by_id[vector["id"]]) for vector in batch)
+                continue
+        
+        self.chunk_store.record_session_chunks(session_id, indexed_rows)
+        
+        # Alimenter l'index lexical de la session au fil de l'ingestion
+        lexical_index = self._get_lexical_index(session_id)
+        lexical_index.add_many(
+            (self._vector_id(session_id, content_hash), text, {"source": name, "chunk": i})
+            for name, i, content_hash, text in indexed_rows
+        )
+        
+        if stored:
+            print(f"✅ {stored} vecteurs uploadés")
+        return len(indexed_rows), failed
+    
+    def _iter_chunked_files(self, files: List):
+        """Produit (fichier, résumé, chunks) en découpant chaque fichier en flux dans le processus courant"""
+        for uploaded_file in files:
+            print(f"📄 Traitement du fichier: {uploaded_file.name}")
+            summary = new_document_summary(uploaded_file.name)
+            segments = iter_counted_segments(uploaded_file.name, io.BytesIO(uploaded_file.getvalue()), summary)
+            yield uploaded_file, summary, self.text_splitter.split_stream(segments)
+    
+    def _iter_chunked_files_in_processes(self, files: List):
+        """Produit (fichier, résumé, chunks) en découpant les fichiers dans un pool de processus
+        
+        Les fichiers sont renvoyés au fur et à mesure qu'ils sont prêts; un fichier dont
+        le worker échoue est retraité en flux dans le processus courant.
+        """
+        splitter = self.text_splitter
+        workers = min(self.ingest_process_workers, len(files))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(
+                    chunk_document_worker,
+                    uploaded_file.name,
+                    uploaded_file.getvalue(),
+                    splitter.chunk_size,
+                    splitter.chunk_overlap,
+                    splitter.separators
+                ): uploaded_file
+                for uploaded_file in files
+            }
+            print(f"⚙️ Découpage de {len(files)} fichiers sur {workers} processus")
+            
+            for future in as_completed(futures):
+                uploaded_file = futures[future]
+                try:
+                    summary, chunks = future.result()
+                    print(f"📄 Fichier découpé: {uploaded_file.name}")
+                except ValueError as file_error:
+                    # Fichier non supporté ou illisible : inutile de le retraiter localement
+                    print(f"❌ Erreur fichier {uploaded_file.name}: {file_error}")
+                    continue
+                except Exception as worker_error:
+                    print(f"⚠️ Worker en échec pour {uploaded_file.name}, traitement local: {worker_error}")
+                    yield from self._iter_chunked_files([uploaded_file])
+                    continue
+                yield uploaded_file, summary, chunks
+    
+    def process_documents(self, files: List, session_id: str, progress_callback=None) -> Tuple[List[Dict], List[str]]:
+        """
+        Traite une liste de fichiers en flux et les stocke dans l'index vectoriel
+        
+        Le texte complet d'un document n'est jamais assemblé : les pages ou paragraphes
+        sont découpés au fil de la lecture et les chunks sont envoyés par lots de
+        `ingest_flush_chunks`, ce qui borne la mémoire quelle que soit la taille du fichier.
+        Avec plusieurs fichiers et `ingest_process_workers` > 1, l'extraction et le découpage
+        (coûteux en CPU) sont répartis sur un pool de processus; les embeddings et l'envoi
+        à l'index restent centralisés ici.
         
         Args:
             files: Liste des fichiers uploadés
             session_id: Identifiant de la session
+            progress_callback: Fonction optionnelle appelée avec (chunks stockés, chunks découpés)
+                après chaque lot envoyé
             
         Returns:
-            Tuple contenant les textes extraits et les noms des documents
+            Tuple contenant les résumés des documents (nom, aperçu, nombre de mots,
+            de caractères et de chunks) et les noms des documents
         """
-        document_texts = []
-        document_names = []
-        vectors_to_upsert = []
+        summaries_by_file = {}
+        file_hashes = {}
+        pending_chunks = []
+        total_chunks = 0
+        total_stored = 0
+        total_failed = 0
+        
+        def flush():
+            nonlocal pending_chunks, total_stored, total_failed
+            if pending_chunks:
+                stored, failed = self._embed_and_upsert(pending_chunks, session_id)
+                total_stored += stored
+                total_failed += failed
+                pending_chunks = []
+                if progress_callback:
+                    progress_callback(total_stored, total_chunks)
         
+        # Les fichiers identiques déjà indexés dans la session ne sont ni extraits ni découpés
+        files_to_process = []
+        previous_hashes = set()
         for uploaded_file in files:
+            file_hash = hash_content(uploaded_file.getvalue())
+            file_hashes[id(uploaded_file)] = file_hash
+            recorded = self.chunk_store.get_document(session_id, uploaded_file.name)
+            if recorded is not None and recorded[0] == file_hash:
+                print(f"♻️ {uploaded_file.name} déjà indexé dans la session, ignoré")
+                summaries_by_file[id(uploaded_file)] = recorded[1]
+                continue
+            if recorded is not None:
+                # Fichier modifié : ses chunks inchangés restent indexés, les autres seront retirés
+                previous_hashes.update(self.chunk_store.document_hashes(session_id, uploaded_file.name))
+            files_to_process.append(uploaded_file)
+        
+        if self.ingest_process_workers > 1 and len(files_to_process) > 1:
+            chunked_files = self._iter_chunked_files_in_processes(files_to_process)
+        else:
+            chunked_files = self._iter_chunked_files(files_to_process)
+        
+        while True:
+            try:
+                uploaded_file, summary, chunks = next(chunked_files)
+            except StopIteration:
+                break
+            except Exception as file_error:
+                print(f"❌ Erreur lors du découpage des fichiers: {file_error}")
+                break
+            
             try:
-                print(f"📄 Traitement du fichier: {uploaded_file.name}")
+                file_size = len(uploaded_file.getvalue())
+                chunk_count = 0
                 
-                # Extraire le texte
-                text = self.extract_text_from_file(uploaded_file)
+                for chunk in chunks:
+                    pending_chunks.append((uploaded_file.name, chunk_count, chunk, file_size))
+                    chunk_count += 1
+                    total_chunks += 1
+                    if len(pending_chunks) >= self.ingest_flush_chunks:
+                        flush()
+                summary["chunk_count"] = chunk_count
                 
-                if "Erreur d'extraction" in text:
-                    print(f"⚠️ Problème avec {uploaded_file.name}")
+                if not summary["char_count"]:
+                    print(f"⚠️ Problème avec {uploaded_file.name}: aucun texte extractible")
                     continue
                 
-                document_texts.append(text)
-                document_names.append(uploaded_file.name)
-                
-                # Diviser en chunks
-                chunks = self.text_splitter.split_text(text)
-                print(f"📊 {len(chunks)} chunks créés pour {uploaded_file.name}")
-                
-                # Créer les vecteurs pour Pinecone
-                for i, chunk in enumerate(chunks):
-                    try:
-                        embedding = self.embeddings.embed_query(chunk)
-                        
-                        vectors_to_upsert.append({
-                            "id": f"{session_id}_{uploaded_file.name}_{i}",
-                            "values": embedding,
-                            "metadata": {
-                                "text": chunk,
-                                "source": uploaded_file.name,
-                                "chunk": i,
-                                "session_id": session_id,
-                                "content_type": "educational_content",
-                                "file_size": len(uploaded_file.getvalue())
-                            }
-                        })
-                    except Exception as chunk_error:
-                        print(f"⚠️ Erreur chunk {i} de {uploaded_file.name}: {chunk_error}")
-                        continue
+                if summary["char_count"] > 200:
+                    summary["text_preview"] += "..."
+                summaries_by_file[id(uploaded_file)] = summary
+                print(f"📊 {chunk_count} chunks créés pour {uploaded_file.name}")
                         
             except Exception as file_error:
                 print(f"❌ Erreur fichier {uploaded_file.name}: {file_error}")
                 continue
         
-        # Uploader vers Pinecone par batch
-        if vectors_to_upsert:
-            batch_size = 50
-            total_batches = (len(vectors_to_upsert) + batch_size - 1) // batch_size
+        flush()
+        
+        # Un document n'est marqué comme indexé que si tous ses chunks ont été stockés
+        if total_failed == 0:
+            for uploaded_file in files_to_process:
+                summary = summaries_by_file.get(id(uploaded_file))
+                if summary is not None:
+                    self.chunk_store.record_document(session_id, uploaded_file.name, file_hashes[id(uploaded_file)], summary)
             
-            for i in range(0, len(vectors_to_upsert), batch_size):
-                batch = vectors_to_upsert[i:i + batch_size]
-                batch_num = (i // batch_size) + 1
-                
+            # Retirer de l'index les chunks des anciennes versions qui ne sont plus référencés
+            stale_hashes = self.chunk_store.unreferenced_hashes(session_id, previous_hashes)
+            if stale_hashes:
+                stale_ids = [self._vector_id(session_id, h) for h in stale_hashes]
+                self._get_lexical_index(session_id).remove(stale_ids)
                 try:
-                    self.index.upsert(vectors=batch)
-                    print(f"✅ Batch {batch_num}/{total_batches} uploadé ({len(batch)} vecteurs)")
-                except Exception as batch_error:
-                    print(f"❌ Erreur batch {batch_num}: {batch_error}")
-                    continue
+                    self.index.delete(ids=stale_ids)
+                    print(f"🗑️ {len(stale_hashes)} chunks obsolètes retirés de l'index")
+                except Exception as delete_error:
+                    print(f"⚠️ Erreur suppression des chunks obsolètes: {delete_error}")
+        
+        # Résumés dans l'ordre des fichiers, quel que soit l'ordre de fin des workers
+        document_summaries = [summaries_by_file[id(f)] for f in files if id(f) in summaries_by_file]
+        document_names = [summary["name"] for summary in document_summaries]
         
-        print(f"🎉 Traitement terminé: {len(document_texts)} documents, {len(vectors_to_upsert)} chunks")
-        return document_texts, document_names
+        print(f"🎉 Traitement terminé: {len(document_summaries)} documents, {total_stored} chunks")
+        return document_summaries, document_names
+    
+    def _get_lexical_index(self, session_id: str) -> BM25Index:
+        """Retourne l'index BM25 de la session, reconstruit depuis le manifeste local si besoin"""
+        with self._lexical_lock:
+            lexical_index = self.lexical_indexes.get(session_id)
+            if lexical_index is None:
+                lexical_index = BM25Index()
+                for source, chunk, content_hash, text in self.chunk_store.get_session_chunks(session_id):
+                    lexical_index.add(self._vector_id(session_id, content_hash), text, {"source": source, "chunk": chunk})
+                self.lexical_indexes[session_id] = lexical_index
+            return lexical_index
+    
+    def _dense_search(self, query: str, session_id: str, top_k: int) -> List[Dict]:
+        query_embedding = self.query_embedding_cache.embed_query(query)
+        
+        results = self.index.query(
+            vector=query_embedding,
+            top_k=top_k,
+            include_metadata=True,
+            filter={"session_id": {"$eq": session_id}}
+        )
+        return list(results['matches'])
     
-    def search_relevant_content(self, query: str, session_id: str, top_k: int = 5) -> List[str]:
-        """Recherche du contenu pertinent dans les documents de la session"""
+    def search_relevant_content(self, query: str, session_id: str, top_k: int = 5, mode: Optional[str] = None) -> List[str]:
+        """
+        Recherche du contenu pertinent dans les documents de la session
+        
+        Args:
+            query: Requête en langage naturel ou mots-clés (ex: code de cours)
+            session_id: Identifiant de la session
+            top_k: Nombre de passages retournés
+            mode: "dense" (embeddings), "lexical" (BM25 local, sans appel réseau) ou
+                "hybrid" (fusion RRF des deux); SEARCH_MODE par défaut
+        """
+        mode = (mode or self.search_mode).lower()
         try:
-            query_embedding = self.embeddings.embed_query(query)
-            
-            results = self.index.query(
-                vector=query_embedding,
-                top_k=top_k,
-                include_metadata=True,
-                filter={"session_id": {"$eq": session_id}}
-            )
+            if mode == "dense":
+                matches = self._dense_search(query, session_id, top_k)
+            else:
+                lexical_index = self._get_lexical_index(session_id)
+                candidates = top_k if mode == "lexical" else top_k * 4
+                lexical_matches = lexical_index.search(query, top_k=candidates)
+                
+                if mode == "lexical":
+                    matches = lexical_matches
+                else:
+                    dense_matches = self._dense_search(query, session_id, candidates)
+                    matches = reciprocal_rank_fusion([dense_matches, lexical_matches], top_k=top_k)
             
             relevant_content = []
-            for match in results['matches']:
+            for match in matches:
                 content = f"Source: {match['metadata']['source']}\n{match['metadata']['text']}"
                 relevant_content.append(content)
             
@@ -271,59 +599,40 @@ Si aucun objectif n'est trouvé, répondez : "AUCUN OBJECTIF IDENTIFIÉ"
         """
         print(f"🔍 Recherche d'objectifs dans la session {session_id[:8]}...")
         
-        # Mots-clés pour rechercher les sections contenant des objectifs
-        objective_keywords = [
-            "objectif apprentissage",
-            "learning objective", 
-            "compétence visée",
-            "à la fin de ce cours",
-            "l'étudiant sera capable",
-            "students will be able",
-            "learning outcome",
-            "but pédagogique",
-            "compétences développées",
-            "skills acquired"
-        ]
-        
         all_objectives = []
         processed_chunks = set()  # Pour éviter les doublons
         
-        # Rechercher pour chaque mot-clé
-        for keyword in objective_keywords:
-            try:
-                query_embedding = self.embeddings.embed_query(keyword)
-                
-                results = self.index.query(
-                    vector=query_embedding,
-                    top_k=8,  # Résultats par mot-clé
-                    include_metadata=True,
-                    filter={"session_id": {"$eq": session_id}}
-                )
-                
-                for match in results['matches']:
-                    chunk_id = match['id']
-                    
-                    # Éviter de traiter le même chunk plusieurs fois
-                    if chunk_id in processed_chunks:
-                        continue
-                    
-                    processed_chunks.add(chunk_id)
-                    
-                    # Extraire les objectifs de ce chunk
-                    chunk_text = match['metadata']['text']
-                    source_doc = match['metadata']['source']
-                    
-                    objectives = self._extract_objectives_from_chunk(
-                        chunk_text, 
-                        source_doc,
-                        match['score']
-                    )
-                    
-                    all_objectives.extend(objectives)
-                    
-            except Exception as e:
-                print(f"⚠️ Erreur recherche '{keyword}': {e}")
-                continue
+        # Une seule requête groupée pour tous les mots-clés, fusionnée par chunk (meilleur score)
+        try:
+            keyword_embeddings = self._load_keyword_embeddings()
+            if keyword_embeddings is None:
+                keyword_embeddings = self.embeddings.embed_documents(OBJECTIVE_KEYWORDS)
+            
+            responses = self.index.query_many(
+                keyword_embeddings,
+                top_k=8,  # Résultats par mot-clé
+                include_metadata=True,
+                filter={"session_id": {"$eq": session_id}}
+            )
+        except Exception as e:
+            print(f"⚠️ Erreur recherche des mots-clés d'objectifs: {e}")
+            responses = []
+        
+        best_matches = {}
+        for results in responses:
+            for match in results['matches']:
+                chunk_id = match['id']
+                if chunk_id not in best_matches or match['score'] > best_matches[chunk_id]['score']:
+                    best_matches[chunk_id] = match
+        
+        ranked_matches = sorted(best_matches.values(), key=lambda m: m['score'], reverse=True)
+        processed_chunks.update(match['id'] for match in ranked_matches)
+        
+        # Extraire les objectifs des chunks en parallèle, résultats fusionnés dans l'ordre du classement
+        units = self._build_extraction_units(ranked_matches)
+        with ThreadPoolExecutor(max_workers=self.extraction_max_workers) as executor:
+            for objectives in executor.map(lambda unit: self._extract_objectives_from_chunk(*unit), units):
+                all_objectives.extend(objectives)
         
         print(f"📊 {len(processed_chunks)} chunks analysés, {len(all_objectives)} objectifs bruts trouvés")
         
@@ -333,6 +642,37 @@ Si aucun objectif n'est trouvé, répondez : "AUCUN OBJECTIF IDENTIFIÉ"
         
         return unique_objectives
     
+    def _build_extraction_units(self, ranked_matches: List[Dict]) -> List[Tuple[str, str, float]]:
+        """
+        Prépare les requêtes d'extraction (texte, source, score) dans l'ordre du classement
+        
+        Si `pack_tokens` > 0, les chunks courts d'une même source sont regroupés dans une
+        seule requête tant que leur total reste sous ce budget de tokens.
+        """
+        if self.pack_tokens <= 0:
+            return [(m['metadata']['text'], m['metadata']['source'], m['score']) for m in ranked_matches]
+        
+        units = []
+        open_packs = {}  # source -> index de l'unité en cours de remplissage
+        for match in ranked_matches:
+            text = match['metadata']['text']
+            source = match['metadata']['source']
+            tokens = self._tiktoken_len(text)
+            
+            position = open_packs.get(source)
+            if position is not None:
+                pack = units[position]
+                if pack["tokens"] + tokens <= self.pack_tokens:
+                    pack["texts"].append(text)
+                    pack["tokens"] += tokens
+                    pack["score"] = max(pack["score"], match['score'])
+                    continue
+            
+            units.append({"texts": [text], "source": source, "score": match['score'], "tokens": tokens})
+            open_packs[source] = len(units) - 1
+        
+        return [("\n\n---\n\n".join(unit["texts"]), unit["source"], unit["score"]) for unit in units]
+    
     def _extract_objectives_from_chunk(self, text: str, source_doc: str, relevance_score: float) -> List[Dict]:
         """Extrait les objectifs d'un chunk de texte avec gestion d'erreur robuste"""
         try:
@@ -341,8 +681,7 @@ Si aucun objectif n'est trouvé, répondez : "AUCUN OBJECTIF IDENTIFIÉ"
                 return []
             
             # Utiliser le LLM pour extraire les objectifs
-            chain = self.objective_extraction_prompt | self.llm
-            result = chain.invoke({"text": text})
+            result = self.objective_extraction_chain.invoke({"text": text})
             response = result.content
             
             # Parser la réponse
@@ -387,7 +726,45 @@ Si aucun objectif n'est trouvé, répondez : "AUCUN OBJECTIF IDENTIFIÉ"
             return []
     
     def _deduplicate_objectives(self, objectives: List[Dict]) -> List[Dict]:
-        """Supprime les objectifs en double basés sur leur similitude"""
+        """Supprime les objectifs en double par similarité sémantique (embeddings en un lot)"""
+        candidates = [obj for obj in objectives if len(obj.get("objective", "")) >= 10]
+        if not candidates:
+            return []
+        
+        try:
+            texts = [obj["objective"] for obj in candidates]
+            vectors = self._embed_texts_with_store(texts)
+            if any(vector is None for vector in vectors):
+                raise ValueError("embeddings incomplets")
+            
+            return self.deduplicator.deduplicate(candidates, np.asarray(vectors, dtype=np.float32))
+            
+        except Exception as e:
+            print(f"⚠️ Déduplication sémantique indisponible, repli sur les mots-clés: {e}")
+            return self._deduplicate_objectives_by_keywords(objectives)
+    
+    def _embed_texts_with_store(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Calcule les embeddings de textes en réutilisant ceux déjà présents dans le manifeste"""
+        model = self._embedding_identity()
+        hashes = [hash_content(text) for text in texts]
+        known = self.chunk_store.get_embeddings(hashes, model)
+        
+        missing = {}
+        for content_hash, text in zip(hashes, texts):
+            if content_hash not in known:
+                missing[content_hash] = text
+        
+        if missing:
+            computed = self.embedding_batcher.embed(list(missing.values()))
+            new_embeddings = {h: e for h, e in zip(missing.keys(), computed) if e is not None}
+            if new_embeddings:
+                self.chunk_store.put_embeddings(new_embeddings, model)
+            known.update(new_embeddings)
+        
+        return [known.get(content_hash) for content_hash in hashes]
+    
+    def _deduplicate_objectives_by_keywords(self, objectives: List[Dict]) -> List[Dict]:
+        """Supprime les objectifs en double basés sur leurs premiers mots significatifs"""
         if not objectives:
             return []
         
@@ -425,52 +802,76 @@ Si aucun objectif n'est trouvé, répondez : "AUCUN OBJECTIF IDENTIFIÉ"
     def get_all_document_content(self, session_id: str) -> List[Dict]:
         """Récupère tout le contenu des documents d'une session"""
         try:
-            # Utiliser une requête large pour récupérer tous les chunks
-            dummy_embedding = self.embeddings.embed_query("contenu document")
-            
-            results = self.index.query(
-                vector=dummy_embedding,
-                top_k=1000,  # Récupérer beaucoup de chunks
-                include_metadata=True,
-                filter={"session_id": {"$eq": session_id}}
-            )
-            
-            # Organiser par document source
+            # Lecture ordonnée (source, n° de chunk) depuis le manifeste local, sans embedding ni limite
             documents_content = {}
-            for match in results['matches']:
-                source = match['metadata']['source']
-                if source not in documents_content:
-                    documents_content[source] = []
-                
-                documents_content[source].append({
-                    "text": match['metadata']['text'],
-                    "chunk": match['metadata']['chunk'],
-                    "score": match['score']
-                })
+            for source, chunk, _, text in self.chunk_store.get_session_chunks(session_id):
+                documents_content.setdefault(source, []).append(text)
             
-            # Reconstituer le texte complet de chaque document
-            full_documents = []
-            for source, chunks in documents_content.items():
-                # Trier par numéro de chunk
-                sorted_chunks = sorted(chunks, key=lambda x: x['chunk'])
-                full_text = "\n".join([chunk['text'] for chunk in sorted_chunks])
-                
-                full_documents.append({
+            if not documents_content:
+                return self._get_all_document_content_from_index(session_id)
+            
+            return [
+                {
                     "source": source,
-                    "full_text": full_text,
+                    "full_text": "\n".join(chunks),
                     "num_chunks": len(chunks)
-                })
-            
-            return full_documents
+                }
+                for source, chunks in documents_content.items()
+            ]
             
         except Exception as e:
             print(f"❌ Erreur récupération contenu: {e}")
             return []
     
+    def _get_all_document_content_from_index(self, session_id: str) -> List[Dict]:
+        """Ancienne reconstruction via l'index vectoriel, pour les sessions absentes du manifeste local"""
+        print(f"⚠️ Session {session_id[:8]} absente du manifeste local, lecture depuis l'index (max 1000 chunks)")
+        
+        # Utiliser une requête large pour récupérer tous les chunks
+        dummy_embedding = self.query_embedding_cache.embed_query("contenu document")
+        
+        results = self.index.query(
+            vector=dummy_embedding,
+            top_k=1000,  # Récupérer beaucoup de chunks
+            include_metadata=True,
+            filter={"session_id": {"$eq": session_id}}
+        )
+        
+        # Organiser par document source
+        documents_content = {}
+        for match in results['matches']:
+            source = match['metadata']['source']
+            if source not in documents_content:
+                documents_content[source] = []
+            
+            documents_content[source].append({
+                "text": match['metadata']['text'],
+                "chunk": match['metadata']['chunk'],
+                "score": match['score']
+            })
+        
+        # Reconstituer le texte complet de chaque document
+        full_documents = []
+        for source, chunks in documents_content.items():
+            # Trier par numéro de chunk
+            sorted_chunks = sorted(chunks, key=lambda x: x['chunk'])
+            full_text = "\n".join([chunk['text'] for chunk in sorted_chunks])
+            
+            full_documents.append({
+                "source": source,
+                "full_text": full_text,
+                "num_chunks": len(chunks)
+            })
+        
+        return full_documents
+    
     def clear_session_data(self, session_id: str):
         """Supprime tous les documents associés à une session"""
         try:
             self.index.delete(filter={"session_id": {"$eq": session_id}})
+            self.chunk_store.delete_session(session_id)
+            with self._lexical_lock:
+                self.lexical_indexes.pop(session_id, None)
             print(f"🗑️ Données de session {session_id[:8]} supprimées")
         except Exception as e:
             print(f"❌ Erreur suppression: {e}")
@@ -478,7 +879,9 @@ Si aucun objectif n'est trouvé, répondez : "AUCUN OBJECTIF IDENTIFIÉ"
 class EnhancedLearningObjectiveAgent:
     """Agent principal qui coordonne l'analyse des objectifs avec la gestion de documents"""
     
-    def __init__(self, api_key=None, model=None, temperature=None, verbose=None):
+    def __init__(self, api_key=None, model=None, temperature=None, verbose=None, max_concurrency=None,
+                 llm=None, doc_processor=None):
+        # `llm` et `doc_processor` peuvent être partagés entre agents : ils ne portent pas d'état de session
         # Configuration de l'API key
         if api_key:
             os.environ["OPENAI_API_KEY"] = api_key
@@ -491,21 +894,32 @@ class EnhancedLearningObjectiveAgent:
         self.model = model or LLM_MODEL
         self.temperature = temperature if temperature is not None else AGENT_TEMPERATURE
         self.verbose = verbose if verbose is not None else VERBOSE_MODE
+        self.max_concurrency = max_concurrency or PIPELINE_MAX_CONCURRENCY
         
         # Initialisation du modèle LLM
-        self.llm = ChatOpenAI(temperature=self.temperature, model=self.model)
+        self.llm = llm or ChatOpenAI(temperature=self.temperature, model=self.model)
             
-        # Initialisation des composants d'analyse
-        self.extractor = ObjectiveExtractor(self.llm)
-        self.analyzer = ContentAnalyzer(self.llm)
-        self.classifier = BloomClassifier(self.llm)
-        self.formatter = ObjectiveFormatter(self.llm)
-        self.evaluator = DifficultyEvaluator(self.llm)
-        self.recommender = LearningResourceRecommender(self.llm)
-        self.feedback_generator = FeedbackGenerator(self.llm)
+        # Initialisation des composants d'analyse; un seul plafond borne tous leurs appels LLM,
+        # lots d'objectifs compris, quelle que soit l'étape du pipeline qui les lance
+        self.llm_limiter = ConcurrencyLimiter(self.max_concurrency)
+        self.extractor = ObjectiveExtractor(self.llm, limiter=self.llm_limiter)
+        self.analyzer = ContentAnalyzer(self.llm, limiter=self.llm_limiter)
+        # Les objectifs nombreux sont traités par lots pour ne pas tronquer la sortie
+        self.classifier = BloomClassifier(
+            self.llm, OBJECTIVE_SHARD_TOKENS, OBJECTIVE_SHARD_MAX_WORKERS,
+            verb_fast_path=BLOOM_VERB_FAST_PATH, limiter=self.llm_limiter
+        )
+        self.formatter = ObjectiveFormatter(
+            self.llm, OBJECTIVE_SHARD_TOKENS, OBJECTIVE_SHARD_MAX_WORKERS, limiter=self.llm_limiter
+        )
+        self.evaluator = DifficultyEvaluator(
+            self.llm, OBJECTIVE_SHARD_TOKENS, OBJECTIVE_SHARD_MAX_WORKERS, limiter=self.llm_limiter
+        )
+        self.recommender = LearningResourceRecommender(self.llm, limiter=self.llm_limiter)
+        self.feedback_generator = FeedbackGenerator(self.llm, limiter=self.llm_limiter)
         
         # Processeur de documents
-        self.doc_processor = DocumentProcessor()
+        self.doc_processor = doc_processor or DocumentProcessor()
         
         # Session tracking
         self.current_session_id = None
@@ -627,17 +1041,9 @@ Utilisez une approche étape par étape et expliquez clairement votre raisonneme
         try:
             print(f"🚀 Début du traitement - Session: {session_id[:8]}")
             
-            document_texts, document_names = self.doc_processor.process_documents(files, session_id)
+            document_summaries, document_names = self.doc_processor.process_documents(files, session_id)
             
-            self.processed_documents = []
-            for i, (text, name) in enumerate(zip(document_texts, document_names)):
-                self.processed_documents.append({
-                    "name": name,
-                    "text_preview": text[:200] + "..." if len(text) > 200 else text,
-                    "full_text": text,
-                    "word_count": len(text.split()),
-                    "char_count": len(text)
-                })
+            self.processed_documents = document_summaries
             
             # Extraire automatiquement les objectifs des documents uploadés
             print("🔍 Extraction des objectifs depuis les documents...")
@@ -788,19 +1194,119 @@ Utilisez une approche étape par étape et expliquez clairement votre raisonneme
             print(f"⚠️ Erreur feedback: {e}")
             return "Erreur lors de la génération du feedback"
     
-    def process_content_with_documents(self, content: str) -> Dict:
-        """
-        Traite le contenu pédagogique en enrichissant avec les documents uploadés
+    def _collect_document_objectives(self) -> Tuple[List[str], List[Dict]]:
+        """Prépare les objectifs extraits des documents pour l'analyse"""
+        document_objectives = []
+        document_objectives_info = []
         
-        Args:
-            content: Le contenu pédagogique à analyser
-            
-        Returns:
-            Les résultats de l'analyse enrichie
-        """
-        print("🚀 Début de l'analyse complète...")
+        if hasattr(self, 'extracted_document_objectives') and self.extracted_document_objectives:
+            for doc_obj in self.extracted_document_objectives:
+                document_objectives.append(doc_obj['objective'])
+                
+                # Préparer les informations détaillées
+                source_doc = doc_obj.get('document_source', doc_obj.get('source_document', doc_obj.get('source', 'Document inconnu')))
+                
+                document_objectives_info.append({
+                    "objective": doc_obj.get('objective', 'Objectif non spécifié'),
+                    "type": doc_obj.get('type', 'non classifié'),
+                    "source_document": source_doc,
+                    "document_source": source_doc,  # Clé alternative
+                    "source": source_doc,           # Clé de fallback
+                    "source_text": doc_obj.get('source_text', 'Texte non disponible'),
+                    "relevance_score": doc_obj.get('relevance_score', 0.0),
+                    "context": doc_obj.get('context', 'Contexte non disponible')
+                })
+        
+        return document_objectives, document_objectives_info
+    
+    def _extract_bloom_levels(self, objectives: List[str], table: ClassificationTable) -> Dict[str, str]:
+        """Niveau de Bloom de chaque objectif, lu dans le tableau des objectifs classifiés"""
+        return {obj: table.level_of(obj) for obj in objectives}
+    
+    def _extract_classifications(self, table: ClassificationTable) -> Dict[str, str]:
+        """Détail de la classification par objectif pour le feedback"""
+        return {
+            entry.objective: f"Verbe principal: {entry.verb}\nNiveau de Bloom: {entry.level}\nJustification: {entry.justification}"
+            for entry in table
+        }
+    
+    def _build_analysis_graph(self, enriched_content: str, document_objectives: List[str], use_async: bool = False) -> StageGraph:
+        """Construit le graphe de dépendances des étapes d'analyse"""
+        graph = StageGraph(max_concurrency=self.max_concurrency)
+        
+        def llm_stage(message, method, async_method, build_args):
+            """Crée une étape synchrone ou asynchrone selon le mode d'exécution"""
+            if use_async:
+                async def stage(results):
+                    args = build_args(results)
+                    print(message)
+                    return await async_method(*args)
+            else:
+                def stage(results):
+                    args = build_args(results)
+                    print(message)
+                    return method(*args)
+            return stage
         
-        # Enrichir le contenu avec les informations des documents uploadés
+        def combine_objectives(results):
+            all_objectives = results["content_objectives"] + document_objectives
+            print(f"📊 Total: {len(all_objectives)} objectifs à analyser")
+            return all_objectives
+        
+        def recommendation_args(results):
+            print("🌸 Extraction des niveaux de Bloom...")
+            bloom_levels = self._extract_bloom_levels(results["all_objectives"], results["classified_objectives"])
+            return results["all_objectives"], bloom_levels
+        
+        def feedback_args(results):
+            classifications = self._extract_classifications(results["classified_objectives"])
+            return results["all_objectives"], classifications
+        
+        graph.add_stage("content_objectives", llm_stage(
+            "🎯 Extraction des objectifs du contenu...",
+            self.extractor.extract, self.extractor.aextract,
+            lambda results: (enriched_content,)
+        ))
+        graph.add_stage("content_analysis", llm_stage(
+            "🔍 Analyse du contenu...",
+            self.analyzer.analyze, self.analyzer.aanalyze,
+            lambda results: (enriched_content,)
+        ))
+        graph.add_stage("all_objectives", combine_objectives, depends_on=["content_objectives"])
+        graph.add_stage("classification", llm_stage(
+            "🏷️ Classification selon Bloom...",
+            self.classifier.classify, self.classifier.aclassify,
+            lambda results: (results["all_objectives"],)
+        ), depends_on=["all_objectives"])
+        graph.add_stage(
+            "classified_objectives",
+            lambda results: classification_table_from_result(results["classification"]),
+            depends_on=["classification"]
+        )
+        graph.add_stage("formatted_objectives", llm_stage(
+            "✨ Reformulation des objectifs...",
+            self.formatter.format, self.formatter.aformat,
+            lambda results: (results["all_objectives"],)
+        ), depends_on=["all_objectives"])
+        graph.add_stage("difficulty_evaluation", llm_stage(
+            "⚖️ Évaluation de la difficulté...",
+            self.evaluator.evaluate, self.evaluator.aevaluate,
+            lambda results: (results["all_objectives"],)
+        ), depends_on=["all_objectives"])
+        graph.add_stage("recommendations", llm_stage(
+            "📚 Génération des recommandations...",
+            self.recommender.recommend, self.recommender.arecommend,
+            recommendation_args
+        ), depends_on=["classified_objectives"])
+        graph.add_stage("feedback", llm_stage(
+            "💡 Génération du feedback...",
+            self.feedback_generator.generate_feedback, self.feedback_generator.agenerate_feedback,
+            feedback_args
+        ), depends_on=["classified_objectives"])
+        return graph
+    
+    def _enrich_content(self, content: str) -> str:
+        """Enrichit le contenu avec les informations des documents uploadés"""
         enriched_content = content
         
         if self.current_session_id and self.processed_documents:
@@ -825,124 +1331,121 @@ Utilisez une approche étape par étape et expliquez clairement votre raisonneme
                     obj_type = obj.get('type', 'non classifié')
                     enriched_content += f"- {obj['objective']} (Source: {source_doc}, Type: {obj_type})\n"
         
+        return enriched_content
+    
+    def _compile_results(self, stage_results: Dict[str, Any], document_objectives_info: List[Dict], stage_timings: Dict[str, float]) -> Dict:
+        """Assemble les résultats des étapes d'analyse"""
+        all_objectives = stage_results["all_objectives"]
+        content_objectives = stage_results["content_objectives"]
+        
+        return {
+            "objectives": all_objectives,
+            "content_objectives": content_objectives,
+            "document_objectives": document_objectives_info,
+            "content_analysis": stage_results["content_analysis"],
+            "classification": stage_results["classification"],
+            "classified_objectives": stage_results["classified_objectives"].to_records(),
+            "formatted_objectives": stage_results["formatted_objectives"],
+            "difficulty_evaluation": stage_results["difficulty_evaluation"],
+            "recommendations": stage_results["recommendations"],
+            "feedback": stage_results["feedback"],
+            "stats": {
+                "total_objectives": len(all_objectives),
+                "content_objectives_count": len(content_objectives),
+                "document_objectives_count": len(document_objectives_info),
+                "processed_documents": len(self.processed_documents) if self.processed_documents else 0,
+                "session_id": self.current_session_id,
+                "stage_timings": stage_timings,
+                "bloom_fast_path": stage_results["classification"].get("fast_path", {})
+            }
+        }
+    
+    def _error_results(self, error: Exception) -> Dict:
+        """Résultats par défaut en cas d'échec de l'analyse"""
+        error_msg = f"❌ Erreur lors de l'analyse: {str(error)}"
+        print(error_msg)
+        
+        return {
+            "error": str(error),
+            "objectives": [],
+            "content_objectives": [],
+            "document_objectives": [],
+            "content_analysis": {"analysis": "Erreur lors de l'analyse"},
+            "classification": {"classification": "Erreur lors de la classification", "records": {}},
+            "classified_objectives": [],
+            "formatted_objectives": {"formatted_objectives": "Erreur lors de la reformulation"},
+            "difficulty_evaluation": {"difficulty_evaluation": "Erreur lors de l'évaluation", "records": {}},
+            "recommendations": {"recommendations": "Erreur lors des recommandations"},
+            "feedback": {"feedback": "Erreur lors de la génération du feedback"},
+            "stats": {
+                "total_objectives": 0,
+                "content_objectives_count": 0,
+                "document_objectives_count": 0,
+                "processed_documents": 0,
+                "session_id": self.current_session_id
+            }
+        }
+    
+    def process_content_with_documents(self, content: str) -> Dict:
+        """
+        Traite le contenu pédagogique en enrichissant avec les documents uploadés
+        
+        Args:
+            content: Le contenu pédagogique à analyser
+            
+        Returns:
+            Les résultats de l'analyse enrichie
+        """
+        print("🚀 Début de l'analyse complète...")
+        
+        enriched_content = self._enrich_content(content)
+        
         # Traitement direct pour obtenir les résultats structurés
         try:
-            print("🎯 Extraction des objectifs du contenu...")
-            # Extraire les objectifs du contenu fourni
-            content_objectives = self.extractor.extract(enriched_content)
-            
-            # Combiner avec les objectifs extraits des documents
-            all_objectives = content_objectives.copy()
-            document_objectives_info = []
-            
-            if hasattr(self, 'extracted_document_objectives') and self.extracted_document_objectives:
-                print(f"📄 Intégration de {len(self.extracted_document_objectives)} objectifs des documents...")
-                
-                for doc_obj in self.extracted_document_objectives:
-                    # Ajouter à la liste globale
-                    all_objectives.append(doc_obj['objective'])
-                    
-                    # Préparer les informations détaillées
-                    source_doc = doc_obj.get('document_source', doc_obj.get('source_document', doc_obj.get('source', 'Document inconnu')))
-                    
-                    document_objectives_info.append({
-                        "objective": doc_obj.get('objective', 'Objectif non spécifié'),
-                        "type": doc_obj.get('type', 'non classifié'),
-                        "source_document": source_doc,
-                        "document_source": source_doc,  # Clé alternative
-                        "source": source_doc,           # Clé de fallback
-                        "source_text": doc_obj.get('source_text', 'Texte non disponible'),
-                        "relevance_score": doc_obj.get('relevance_score', 0.0),
-                        "context": doc_obj.get('context', 'Contexte non disponible')
-                    })
-            
-            print(f"📊 Total: {len(all_objectives)} objectifs à analyser")
-            
-            # Analyser le contenu enrichi
-            print("🔍 Analyse du contenu...")
-            content_analysis = self.analyzer.analyze(enriched_content)
-            
-            # Classifier tous les objectifs
-            print("🏷️ Classification selon Bloom...")
-            classification_result = self.classifier.classify(all_objectives)
+            document_objectives, document_objectives_info = self._collect_document_objectives()
+            if document_objectives:
+                print(f"📄 Intégration de {len(document_objectives)} objectifs des documents...")
             
-            print("✨ Reformulation des objectifs...")
-            formatted_objectives = self.formatter.format(all_objectives)
+            # Graphe de dépendances : seules les recommandations et le feedback
+            # attendent la classification, le reste s'exécute en parallèle
+            graph = self._build_analysis_graph(enriched_content, document_objectives)
+            stage_results = graph.run()
             
-            print("⚖️ Évaluation de la difficulté...")
-            difficulty_evaluation = self.evaluator.evaluate(all_objectives)
+            results = self._compile_results(stage_results, document_objectives_info, graph.timings)
             
-            # Extraction des niveaux de Bloom
-            print("🌸 Extraction des niveaux de Bloom...")
-            bloom_levels = {}
-            for obj in all_objectives:
-                pattern = re.compile(rf"{re.escape(obj)}.*?Niveau de Bloom: ([a-zéè ]+)", re.DOTALL | re.IGNORECASE)
-                match = pattern.search(classification_result["classification"])
-                if match:
-                    bloom_levels[obj] = match.group(1).strip()
-                else:
-                    bloom_levels[obj] = "non classifié"
-            
-            print("📚 Génération des recommandations...")
-            recommendations = self.recommender.recommend(all_objectives, bloom_levels)
+            print("✅ Analyse terminée avec succès!")
+            return results
             
-            # Extraction des classifications pour le feedback
-            classifications = {}
-            pattern = r"Objectif: (.*?)\n(.*?)(?=Objectif:|$)"
-            matches = re.findall(pattern, classification_result["classification"], re.DOTALL)
-            for obj, classification in matches:
-                obj = obj.strip()
-                classifications[obj] = classification.strip()
+        except Exception as e:
+            return self._error_results(e)
+    
+    async def aprocess_content_with_documents(self, content: str) -> Dict:
+        """
+        Version asynchrone de process_content_with_documents
+        
+        Les appels LLM passent par les méthodes awaitables des composants, ce qui
+        permet à plusieurs sessions de partager la même boucle d'événements.
+        """
+        print("🚀 Début de l'analyse complète (async)...")
+        
+        # La recherche documentaire reste synchrone : on la déporte dans un thread
+        enriched_content = await asyncio.to_thread(self._enrich_content, content)
+        
+        try:
+            document_objectives, document_objectives_info = self._collect_document_objectives()
+            if document_objectives:
+                print(f"📄 Intégration de {len(document_objectives)} objectifs des documents...")
             
-            print("💡 Génération du feedback...")
-            feedback = self.feedback_generator.generate_feedback(all_objectives, classifications)
+            graph = self._build_analysis_graph(enriched_content, document_objectives, use_async=True)
+            stage_results = await graph.arun()
             
-            # Compilation des résultats
-            results = {
-                "objectives": all_objectives,
-                "content_objectives": content_objectives,
-                "document_objectives": document_objectives_info,
-                "content_analysis": content_analysis,
-                "classification": classification_result,
-                "formatted_objectives": formatted_objectives,
-                "difficulty_evaluation": difficulty_evaluation,
-                "recommendations": recommendations,
-                "feedback": feedback,
-                "stats": {
-                    "total_objectives": len(all_objectives),
-                    "content_objectives_count": len(content_objectives),
-                    "document_objectives_count": len(document_objectives_info),
-                    "processed_documents": len(self.processed_documents) if self.processed_documents else 0,
-                    "session_id": self.current_session_id
-                }
-            }
+            results = self._compile_results(stage_results, document_objectives_info, graph.timings)
             
             print("✅ Analyse terminée avec succès!")
             return results
             
         except Exception as e:
-            error_msg = f"❌ Erreur lors de l'analyse: {str(e)}"
-            print(error_msg)
-            
-            return {
-                "error": str(e),
-                "objectives": [],
-                "content_objectives": [],
-                "document_objectives": [],
-                "content_analysis": {"analysis": "Erreur lors de l'analyse"},
-                "classification": {"classification": "Erreur lors de la classification"},
-                "formatted_objectives": {"formatted_objectives": "Erreur lors de la reformulation"},
-                "difficulty_evaluation": {"difficulty_evaluation": "Erreur lors de l'évaluation"},
-                "recommendations": {"recommendations": "Erreur lors des recommandations"},
-                "feedback": {"feedback": "Erreur lors de la génération du feedback"},
-                "stats": {
-                    "total_objectives": 0,
-                    "content_objectives_count": 0,
-                    "document_objectives_count": 0,
-                    "processed_documents": 0,
-                    "session_id": self.current_session_id
-                }
-            }
+            return self._error_results(e)
     
     def get_processed_documents_summary(self) -> List[Dict]:
         """Retourne un résumé des documents traités"""
@@ -961,7 +1464,9 @@ Utilisez une approche étape par étape et expliquez clairement votre raisonneme
             "processed_documents_count": len(self.processed_documents),
             "extracted_objectives_count": len(self.extracted_document_objectives) if hasattr(self, 'extracted_document_objectives') else 0,
             "total_words": sum([doc.get('word_count', 0) for doc in self.processed_documents]),
-            "total_chars": sum([doc.get('char_count', 0) for doc in self.processed_documents])
+            "total_chars": sum([doc.get('char_count', 0) for doc in self.processed_documents]),
+            "query_embedding_cache": self.doc_processor.query_embedding_cache.stats(),
+            "bloom_fast_path_total": self.classifier.fast_path_stats()
         }
     
     def clear_session(self):
@@ -0,0 +1,133 @@
+import math
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# Mots vides français et anglais ignorés par l'index
+STOPWORDS = {
+    "le", "la", "les", "un", "une", "des", "du", "de", "d", "l", "et", "ou", "en", "au", "aux", "a",
+    "ce", "ces", "cet", "cette", "qui", "que", "quoi", "dont", "dans", "par", "pour", "sur", "avec",
+    "sans", "sous", "est", "sont", "etre", "il", "elle", "ils", "elles", "on", "nous", "vous", "se",
+    "sa", "son", "ses", "leur", "leurs", "ne", "pas", "plus", "y", "s", "n", "c", "j", "qu",
+    "the", "an", "and", "or", "of", "to", "in", "on", "for", "with", "by", "is", "are", "be",
+    "this", "that", "these", "those", "it", "as", "at", "from", "will", "can"
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> List[str]:
+    """Découpe un texte en termes normalisés (minuscules, sans accents, codes de cours conservés)"""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    normalized = "".join(c for c in normalized if not unicodedata.combining(c))
+    return [token for token in _TOKEN_PATTERN.findall(normalized) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Index inversé BM25 en mémoire, alimenté incrémentalement"""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self.doc_lengths: Dict[str, int] = {}
+        self.documents: Dict[str, Dict[str, Any]] = {}
+        self.total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def add(self, doc_id: str, text: str, metadata: Optional[Dict[str, Any]] = None):
+        """Ajoute (ou remplace) un document"""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            if doc_id in self.doc_lengths:
+                self._remove_unlocked(doc_id)
+            for term, frequency in terms.items():
+                self.postings[term][doc_id] = frequency
+            length = sum(terms.values())
+            self.doc_lengths[doc_id] = length
+            self.total_length += length
+            self.documents[doc_id] = dict(metadata or {}, text=text)
+
+    def add_many(self, items: Iterable[Tuple[str, str, Dict[str, Any]]]):
+        for doc_id, text, metadata in items:
+            self.add(doc_id, text, metadata)
+
+    def _remove_unlocked(self, doc_id: str):
+        for term in tokenize(self.documents[doc_id]["text"]):
+            postings = self.postings.get(term)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(doc_id)
+        del self.documents[doc_id]
+
+    def remove(self, doc_ids: Iterable[str]):
+        """Retire des documents de l'index"""
+        with self._lock:
+            for doc_id in doc_ids:
+                if doc_id in self.doc_lengths:
+                    self._remove_unlocked(doc_id)
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """Retourne les documents les mieux classés : [{"id", "score", "metadata"}]"""
+        terms = set(tokenize(query))
+        with self._lock:
+            count = len(self.doc_lengths)
+            if not count or not terms:
+                return []
+            average_length = self.total_length / count
+
+            scores: Dict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self.postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * frequency * (self.k1 + 1) / (frequency + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+            return [{"id": doc_id, "score": score, "metadata": self.documents[doc_id]} for doc_id, score in ranked]
+
+
+def reciprocal_rank_fusion(result_lists: List[List[Dict[str, Any]]], k: int = 60, top_k: int = 5) -> List[Dict[str, Any]]:
+    """Fusionne plusieurs classements par RRF : score = somme des 1 / (k + rang)"""
+    fused: Dict[str, float] = defaultdict(float)
+    matches: Dict[str, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, match in enumerate(results, start=1):
+            fused[match["id"]] += 1.0 / (k + rank)
+            matches.setdefault(match["id"], match)
+
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:top_k]
+    return [dict(matches[doc_id], score=score) for doc_id, score in ranked]
+
+
+def benchmark_lexical_search(num_chunks: int = 5000, queries: int = 200) -> dict:
+    """Mesure la latence moyenne d'une requête par mots-clés sur un index synthétique"""
+    import random
+
+    rng = random.Random(0)
+    vocabulary = [f"terme{i}" for i in range(3000)] + [f"INF-{1000 + i}" for i in range(200)]
+    index = BM25Index()
+    for i in range(num_chunks):
+        index.add(f"doc{i}", " ".join(rng.choice(vocabulary) for _ in range(120)), {"source": "synthetique"})
+
+    start = time.perf_counter()
+    for _ in range(queries):
+        index.search(f"{rng.choice(vocabulary)} {rng.choice(vocabulary)}", top_k=5)
+    elapsed = time.perf_counter() - start
+    return {"chunks": num_chunks, "avg_query_ms": round(elapsed / queries * 1000, 3)}
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmark recherche lexicale BM25")
+    print(benchmark_lexical_search())
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class ConcurrencyLimiter:
+    """Plafond d'appels LLM simultanés partagé par toutes les étapes et tous leurs lots
+
+    Les étapes du graphe ne prennent pas de place : seuls les appels au modèle
+    en occupent une, ce qui évite qu'une étape attende des lots bloqués par
+    sa propre place. Le mode thread (`slot`) et le mode asyncio (`aslot`) ont
+    chacun leur compteur; un pipeline n'utilise que l'un des deux à la fois.
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        # Un sémaphore asyncio est lié à sa boucle : un par boucle en cours
+        self._async_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self._async_lock = threading.Lock()
+
+    @contextmanager
+    def slot(self):
+        """Réserve une place pour un appel synchrone"""
+        with self._semaphore:
+            yield
+
+    @asynccontextmanager
+    async def aslot(self):
+        """Réserve une place pour un appel asynchrone"""
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            semaphore = self._async_semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._async_semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        async with semaphore:
+            yield
+
+
+class PipelineStage:
+    """Étape du pipeline d'analyse avec ses dépendances"""
+
+    def __init__(self, name: str, func: Callable[[Dict[str, Any]], Any], depends_on: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.depends_on = list(depends_on)
+
+
+class StageGraph:
+    """Graphe de dépendances des étapes d'analyse, exécuté en parallèle
+
+    Chaque étape reçoit le dictionnaire des résultats déjà calculés et ne
+    démarre que lorsque toutes ses dépendances sont terminées. Les étapes
+    indépendantes s'exécutent simultanément dans la limite de `max_concurrency`,
+    soit dans un pool de threads (`run`), soit sur la boucle asyncio (`arun`).
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.stages: Dict[str, PipelineStage] = {}
+        self.timings: Dict[str, float] = {}
+
+    def add_stage(self, name: str, func: Callable[[Dict[str, Any]], Any], depends_on: Iterable[str] = ()) -> "StageGraph":
+        """Ajoute une étape au graphe"""
+        if name in self.stages:
+            raise ValueError(f"Étape déjà définie: {name}")
+        self.stages[name] = PipelineStage(name, func, depends_on)
+        return self
+
+    def _validate(self):
+        """Vérifie que les dépendances existent et que le graphe est acyclique"""
+        for stage in self.stages.values():
+            for dependency in stage.depends_on:
+                if dependency not in self.stages:
+                    raise ValueError(f"Dépendance inconnue '{dependency}' pour l'étape '{stage.name}'")
+
+        visited, in_progress = set(), set()
+
+        def visit(name: str):
+            if name in visited:
+                return
+            if name in in_progress:
+                raise ValueError(f"Cycle détecté dans le pipeline autour de l'étape '{name}'")
+            in_progress.add(name)
+            for dependency in self.stages[name].depends_on:
+                visit(dependency)
+            in_progress.discard(name)
+            visited.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _ready_stages(self, done: Dict[str, Any], started: set) -> List[PipelineStage]:
+        """Retourne les étapes dont toutes les dépendances sont satisfaites"""
+        return [
+            stage for name, stage in self.stages.items()
+            if name not in started and all(dep in done for dep in stage.depends_on)
+        ]
+
+    def _timed(self, stage: PipelineStage, results: Dict[str, Any]) -> Any:
+        """Exécute une étape en mesurant sa durée"""
+        start = time.perf_counter()
+        try:
+            return stage.func(results)
+        finally:
+            self.timings[stage.name] = round(time.perf_counter() - start, 3)
+
+    def run(self, initial: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Exécute le graphe dans un pool de threads et retourne tous les résultats"""
+        self._validate()
+        results: Dict[str, Any] = dict(initial or {})
+        started = set(results)
+        pending = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while True:
+                for stage in self._ready_stages(results, started):
+                    started.add(stage.name)
+                    pending[executor.submit(self._timed, stage, dict(results))] = stage.name
+
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = pending.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception:
+                        for other in pending:
+                            other.cancel()
+                        raise
+
+        return results
+
+    async def _atimed(self, stage: PipelineStage, results: Dict[str, Any], semaphore: asyncio.Semaphore) -> Any:
+        """Exécute une étape asynchrone (ou synchrone dans un thread) en mesurant sa durée"""
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if asyncio.iscoroutinefunction(stage.func):
+                    return await stage.func(results)
+                return await asyncio.to_thread(stage.func, results)
+            finally:
+                self.timings[stage.name] = round(time.perf_counter() - start, 3)
+
+    async def arun(self, initial: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Exécute le graphe sur la boucle asyncio sans la bloquer"""
+        self._validate()
+        results: Dict[str, Any] = dict(initial or {})
+        started = set(results)
+        pending = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        while True:
+            for stage in self._ready_stages(results, started):
+                started.add(stage.name)
+                task = asyncio.create_task(self._atimed(stage, dict(results), semaphore))
+                pending[task] = stage.name
+
+            if not pending:
+                break
+
+            finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                name = pending.pop(task)
+                try:
+                    results[name] = task.result()
+                except Exception:
+                    for other in pending:
+                        other.cancel()
+                    raise
+
+        return results
@@ -0,0 +1,93 @@
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+import numpy as np
+
+
+def normalize_query(text: str) -> str:
+    """Normalise une requête pour la clé de cache (Unicode NFC, minuscules, espaces réduits)"""
+    return " ".join(unicodedata.normalize("NFC", text).lower().split())
+
+
+class QueryEmbeddingCache:
+    """Cache des embeddings de requêtes : LRU en mémoire puis fichiers float32 sur disque
+
+    La clé est (modèle, texte normalisé). S'utilise à la place de l'objet d'embeddings
+    pour `embed_query`.
+    """
+
+    def __init__(self, embeddings, model: str, cache_dir: str = "./embedding_cache", max_entries: int = 1024):
+        self.embeddings = embeddings
+        self.model = model
+        self.max_entries = max(1, max_entries)
+        self.directory = os.path.join(cache_dir, "queries", re.sub(r"[^A-Za-z0-9_.-]", "_", model))
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def _key(self, text: str) -> str:
+        material = f"{self.model}\n{normalize_query(text)}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()[:32]
+
+    def _remember(self, key: str, vector: List[float]):
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        """Retourne l'embedding de la requête depuis le cache, ou le calcule et le mémorise"""
+        key = self._key(text)
+
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return vector
+
+        path = os.path.join(self.directory, f"{key}.npy")
+        try:
+            if os.path.exists(path):
+                vector = np.load(path).tolist()
+                with self._lock:
+                    self.disk_hits += 1
+                self._remember(key, vector)
+                return vector
+        except Exception as e:
+            print(f"⚠️ Erreur lecture cache d'embedding de requête: {e}")
+
+        vector = list(self.embeddings.embed_query(text))
+        with self._lock:
+            self.misses += 1
+        self._remember(key, vector)
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = path + ".tmp.npy"
+            np.save(tmp_path, np.asarray(vector, dtype=np.float32))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"⚠️ Erreur écriture cache d'embedding de requête: {e}")
+
+        return vector
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du cache"""
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "entries_in_memory": len(self._memory)
+            }
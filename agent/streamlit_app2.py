@@ -5,7 +5,14 @@ import re
 import os
 import json
 import uuid
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire racine pour le package shared
+sys.path.append(str(Path(__file__).parent.parent))
+
 from enhanced_agent import EnhancedLearningObjectiveAgent
+from shared.utils.classification_parser import classification_table_from_result
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -409,22 +416,21 @@ if 'processed_documents' not in st.session_state:
     st.session_state.processed_documents = []
 
 # Fonctions utilitaires pour l'extraction de données
-def extract_difficulty_level(difficulty_text, objective):
+def extract_difficulty_level(difficulty_result, objective):
     """Extrait le niveau de difficulté d'un objectif"""
+    record = difficulty_result.get("records", {}).get(objective)
+    if record:
+        return int(record["level"])
+    # Résultats antérieurs sans enregistrements structurés
     pattern = re.compile(rf"{re.escape(objective)}.*?niveau de difficulté.*?(\d)", re.DOTALL | re.IGNORECASE)
-    match = pattern.search(difficulty_text)
+    match = pattern.search(difficulty_result.get("difficulty_evaluation", ""))
     if match:
         return int(match.group(1))
     return 3  # Niveau moyen par défaut
 
-def extract_bloom_level(classification_text, objective):
+def extract_bloom_level(classified_objectives, objective):
     """Extrait le niveau de Bloom d'un objectif"""
-    pattern = re.compile(rf"{re.escape(objective)}.*?Niveau de Bloom: ([a-zéè ]+)", re.DOTALL | re.IGNORECASE)
-    match = pattern.search(classification_text)
-    if match:
-        level = match.group(1).strip().lower()
-        return level
-    return "non classifié"
+    return classified_objectives.level_of(objective)
 
 def create_bloom_distribution_chart(objectives_with_levels):
     """Crée le graphique de distribution des niveaux de Bloom"""
@@ -1087,11 +1093,14 @@ def display_results():
     objectives_with_levels = {}
     objectives_with_difficulty = {}
     
+    # Tableau des objectifs classifiés calculé par l'agent (ou analysé une seule fois)
+    classified_objectives = classification_table_from_result(results)
+    
     for obj in all_objectives:
-        bloom_level = extract_bloom_level(classification, obj)
+        bloom_level = extract_bloom_level(classified_objectives, obj)
         objectives_with_levels[obj] = bloom_level
         
-        difficulty_level = extract_difficulty_level(difficulty_evaluation, obj)
+        difficulty_level = extract_difficulty_level(results["difficulty_evaluation"], obj)
         objectives_with_difficulty[obj] = difficulty_level
     
     # Calculs pour les métriques
@@ -1524,23 +1533,19 @@ def display_results():
         # Détails de classification par objectif
         st.subheader("📋 Classification Détaillée")
         
-        # Parser la classification pour extraire les informations par objectif
         classification_text = classification
         
-        # Diviser la classification en sections par objectif
-        if "Objectif:" in classification_text:
-            # Pattern pour extraire chaque section d'objectif
-            pattern = r"Objectif:\s*(.*?)\n(.*?)(?=Objectif:|$)"
-            matches = re.findall(pattern, classification_text, re.DOTALL)
-            
+        # Une section par objectif du tableau des objectifs classifiés
+        if len(classified_objectives):
             colors = {
                 "se souvenir": "#ef4444", "comprendre": "#3b82f6", "appliquer": "#10b981",
                 "analyser": "#f59e0b", "évaluer": "#8b5cf6", "créer": "#ec4899"
             }
             
-            for i, (obj_text, obj_details) in enumerate(matches, 1):
-                obj_text = obj_text.strip()
-                level = objectives_with_levels.get(obj_text, "non classifié")
+            for i, entry in enumerate(classified_objectives, 1):
+                obj_text = entry.objective
+                obj_details = f"Verbe principal: {entry.verb}\nNiveau de Bloom: {entry.level}\nJustification: {entry.justification}"
+                level = entry.level
                 color = colors.get(level, "#6b7280")
                 
                 st.markdown(f"""
@@ -0,0 +1,240 @@
+import random
+import threading
+import time
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+ENCODING_NAME = "cl100k_base"
+
+_encoder = None
+_encoder_failed = False
+_encoder_lock = threading.Lock()
+
+
+def get_encoder():
+    """Retourne l'encodeur tiktoken partagé par le processus (chargé une seule fois)"""
+    global _encoder, _encoder_failed
+    if _encoder is not None or _encoder_failed:
+        return _encoder
+
+    with _encoder_lock:
+        if _encoder is None and not _encoder_failed:
+            try:
+                _encoder = tiktoken.get_encoding(ENCODING_NAME)
+            except Exception as e:
+                print(f"⚠️ Encodeur {ENCODING_NAME} indisponible, comptage approximatif par mots: {e}")
+                _encoder_failed = True
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """Calcule la longueur d'un texte en tokens"""
+    encoder = get_encoder()
+    if encoder is None:
+        return len(text.split())
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+def count_tokens_batch(texts: Sequence[str]) -> List[int]:
+    """Calcule la longueur en tokens de plusieurs textes en un seul appel (encode_batch)"""
+    if not texts:
+        return []
+    encoder = get_encoder()
+    if encoder is None:
+        return [len(text.split()) for text in texts]
+    return [len(tokens) for tokens in encoder.encode_batch(list(texts), disallowed_special=())]
+
+
+class TokenAwareTextSplitter:
+    """Découpe un texte en chunks d'au plus `chunk_size` tokens avec chevauchement
+
+    Même principe que RecursiveCharacterTextSplitter (séparateurs essayés dans
+    l'ordre), mais chaque fragment n'est encodé qu'une seule fois : les tailles
+    sont additionnées au fil de la fusion au lieu de ré-encoder chaque fenêtre
+    candidate. Le dernier recours découpe directement sur les tokens.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 400,
+        chunk_overlap: int = 80,
+        separators: Optional[List[str]] = None,
+        batch_length_function: Callable[[Sequence[str]], List[int]] = count_tokens_batch
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap doit être inférieur à chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = separators if separators is not None else ["\n\n", "\n", ". ", " ", ""]
+        self.batch_length_function = batch_length_function
+
+    def split_text(self, text: str) -> List[str]:
+        """Retourne les chunks du texte"""
+        if not text:
+            return []
+        return self._split(text, self.separators)
+
+    def split_stream(self, segments: Iterable[str], buffer_tokens: Optional[int] = None) -> Iterator[str]:
+        """Découpe un flux de segments (pages, paragraphes) sans jamais assembler le texte complet
+
+        Les segments sont accumulés jusqu'à `buffer_tokens` environ, découpés, puis
+        tous les chunks sauf le dernier sont émis; le dernier est reporté en tête
+        du tampon suivant pour ne pas couper le texte à la frontière d'un segment.
+        """
+        buffer_tokens = buffer_tokens or self.chunk_size * 8
+        buffer: List[str] = []
+        buffered = 0
+
+        for segment in segments:
+            buffer.append(segment)
+            buffered += len(segment) // 4
+            if buffered < buffer_tokens:
+                continue
+
+            chunks = self.split_text("\n\n".join(buffer))
+            for chunk in chunks[:-1]:
+                yield chunk
+            buffer = chunks[-1:]
+            buffered = sum(len(part) // 4 for part in buffer)
+
+        if buffer:
+            for chunk in self.split_text("\n\n".join(buffer)):
+                yield chunk
+
+    def _split(self, text: str, separators: List[str]) -> List[str]:
+        separator = separators[-1]
+        remaining = []
+        for i, candidate in enumerate(separators):
+            if candidate == "" or candidate in text:
+                separator = candidate
+                remaining = separators[i + 1:]
+                break
+
+        if separator == "":
+            return self._split_on_tokens(text)
+
+        # Le séparateur reste attaché à la fin de chaque fragment pour préserver le texte
+        parts = text.split(separator)
+        pieces = [part + separator for part in parts[:-1]] + [parts[-1]]
+        pieces = [piece for piece in pieces if piece]
+        sizes = self.batch_length_function(pieces)
+
+        chunks: List[str] = []
+        pending: List[Tuple[str, int]] = []
+        for piece, size in zip(pieces, sizes):
+            if size > self.chunk_size:
+                if pending:
+                    chunks.extend(self._merge(pending))
+                    pending = []
+                chunks.extend(self._split(piece, remaining) if remaining else self._split_on_tokens(piece))
+            else:
+                pending.append((piece, size))
+
+        if pending:
+            chunks.extend(self._merge(pending))
+        return chunks
+
+    def _merge(self, pieces: List[Tuple[str, int]]) -> List[str]:
+        """Fusionne des fragments consécutifs en chunks en cumulant leurs tailles déjà calculées"""
+        chunks = []
+        window: List[Tuple[str, int]] = []
+        total = 0
+
+        for piece, size in pieces:
+            if window and total + size > self.chunk_size:
+                chunk = "".join(p for p, _ in window).strip()
+                if chunk:
+                    chunks.append(chunk)
+                # Conserver la fin de la fenêtre comme chevauchement du chunk suivant
+                while window and (total > self.chunk_overlap or total + size > self.chunk_size):
+                    total -= window.pop(0)[1]
+            window.append((piece, size))
+            total += size
+
+        chunk = "".join(p for p, _ in window).strip()
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _split_on_tokens(self, text: str) -> List[str]:
+        """Dernier recours : découpe directe sur les tokens d'un fragment trop long"""
+        encoder = get_encoder()
+        if encoder is None:
+            words = text.split()
+            step = self.chunk_size - self.chunk_overlap
+            return [" ".join(words[i:i + self.chunk_size]) for i in range(0, len(words), step)]
+
+        tokens = encoder.encode(text, disallowed_special=())
+        step = self.chunk_size - self.chunk_overlap
+        chunks = []
+        for start in range(0, len(tokens), step):
+            chunks.append(encoder.decode(tokens[start:start + self.chunk_size]))
+            if start + self.chunk_size >= len(tokens):
+                break
+        return chunks
+
+
+def _synthetic_french_text(num_paragraphs: int, seed: int = 42) -> str:
+    """Génère un long texte pédagogique français synthétique"""
+    rng = random.Random(seed)
+    subjects = ["L'apprenant", "L'étudiant", "Le participant", "Chaque stagiaire"]
+    verbs = ["sera capable d'analyser", "devra expliquer", "saura appliquer", "pourra évaluer", "apprendra à concevoir"]
+    topics = [
+        "les structures de données élémentaires", "les principes de la programmation orientée objet",
+        "les méthodes d'évaluation formative", "les bases de la statistique descriptive",
+        "la gestion de projet pédagogique", "les architectures de réseaux informatiques"
+    ]
+    paragraphs = []
+    for _ in range(num_paragraphs):
+        sentences = [
+            f"{rng.choice(subjects)} {rng.choice(verbs)} {rng.choice(topics)} dans un contexte professionnel."
+            for _ in range(rng.randint(3, 8))
+        ]
+        paragraphs.append(" ".join(sentences))
+    return "\n\n".join(paragraphs)
+
+
+def benchmark_splitters(num_paragraphs: int = 2000) -> dict:
+    """Compare le découpage historique (encodeur rechargé à chaque mesure) et TokenAwareTextSplitter"""
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    text = _synthetic_french_text(num_paragraphs)
+    get_encoder()
+
+    def legacy_len(value: str) -> int:
+        return len(tiktoken.get_encoding(ENCODING_NAME).encode(value, disallowed_special=()))
+
+    legacy_splitter = RecursiveCharacterTextSplitter(
+        chunk_size=400,
+        chunk_overlap=80,
+        length_function=legacy_len,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+    start = time.perf_counter()
+    legacy_chunks = legacy_splitter.split_text(text)
+    legacy_time = time.perf_counter() - start
+
+    splitter = TokenAwareTextSplitter(chunk_size=400, chunk_overlap=80)
+    start = time.perf_counter()
+    chunks = splitter.split_text(text)
+    new_time = time.perf_counter() - start
+
+    sizes = count_tokens_batch(chunks)
+    return {
+        "characters": len(text),
+        "legacy_seconds": round(legacy_time, 3),
+        "legacy_chunks": len(legacy_chunks),
+        "token_aware_seconds": round(new_time, 3),
+        "token_aware_chunks": len(chunks),
+        "max_chunk_tokens": max(sizes) if sizes else 0,
+        "speedup": round(legacy_time / new_time, 1) if new_time else None
+    }
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmark découpage en chunks (texte français synthétique)")
+    print(benchmark_splitters())
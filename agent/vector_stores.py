@@ -0,0 +1,441 @@
+import json
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class VectorStore:
+    """Interface commune des index vectoriels (API calquée sur un index Pinecone)
+
+    - upsert(vectors=[{"id", "values", "metadata"}])
+    - query(vector, top_k, include_metadata, filter) -> {"matches": [{"id", "score", "metadata"}]}
+    - delete(filter=..., ids=...)
+    """
+
+    def upsert(self, vectors: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def query(self, vector: List[float], top_k: int = 10, include_metadata: bool = True,
+              filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def delete(self, filter: Optional[Dict[str, Any]] = None, ids: Optional[List[str]] = None):
+        raise NotImplementedError
+
+    def query_many(self, vectors: List[List[float]], top_k: int = 10, include_metadata: bool = True,
+                   filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Exécute plusieurs requêtes avec le même filtre (une réponse par vecteur)"""
+        return [self.query(vector, top_k=top_k, include_metadata=include_metadata, filter=filter) for vector in vectors]
+
+
+def match_to_dict(match: Any) -> Dict[str, Any]:
+    """Convertit un résultat Pinecone (ScoredVector) en dict simple {"id", "score", "metadata"}"""
+    return {
+        "id": match["id"],
+        "score": match["score"],
+        "metadata": dict(match.get("metadata") or {})
+    }
+
+
+class PineconeIndexStore(VectorStore):
+    """Index serverless Pinecone distant"""
+
+    def __init__(self, api_key: str, index_name: str = "learn-obj", dimension: int = 1536):
+        from pinecone import Pinecone, ServerlessSpec
+
+        pc = Pinecone(api_key=api_key)
+
+        existing_indexes = pc.list_indexes()
+        index_names = [idx.name for idx in existing_indexes]
+
+        if index_name not in index_names:
+            pc.create_index(
+                name=index_name,
+                dimension=dimension,
+                metric='cosine',
+                spec=ServerlessSpec(cloud="aws", region="us-east-1")
+            )
+
+        self.index = pc.Index(index_name)
+        self.index_name = index_name
+
+    def upsert(self, vectors: List[Dict[str, Any]]):
+        return self.index.upsert(vectors=vectors)
+
+    def query(self, vector: List[float], top_k: int = 10, include_metadata: bool = True,
+              filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        response = self.index.query(vector=vector, top_k=top_k, include_metadata=include_metadata, filter=filter)
+        return {"matches": [match_to_dict(match) for match in response["matches"]]}
+
+    def delete(self, filter: Optional[Dict[str, Any]] = None, ids: Optional[List[str]] = None):
+        if ids is not None:
+            return self.index.delete(ids=ids)
+        return self.index.delete(filter=filter)
+
+    def query_many(self, vectors: List[List[float]], top_k: int = 10, include_metadata: bool = True,
+                   filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Envoie les requêtes simultanément : la latence totale est celle d'un seul aller-retour"""
+        if not vectors:
+            return []
+        with ThreadPoolExecutor(max_workers=min(len(vectors), 16)) as executor:
+            return list(executor.map(
+                lambda vector: self.query(vector, top_k=top_k, include_metadata=include_metadata, filter=filter),
+                vectors
+            ))
+
+
+def _matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """Évalue un filtre de métadonnées au format Pinecone ($eq, $ne, $in, $nin)"""
+    if not filter:
+        return True
+
+    for key, condition in filter.items():
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for operator, expected in condition.items():
+            if operator == "$eq" and value != expected:
+                return False
+            if operator == "$ne" and value == expected:
+                return False
+            if operator == "$in" and value not in expected:
+                return False
+            if operator == "$nin" and value in expected:
+                return False
+    return True
+
+
+def _session_from_filter(filter: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Extrait la session ciblée par un filtre, si elle est fixée par égalité"""
+    if not filter or "session_id" not in filter:
+        return None
+    condition = filter["session_id"]
+    if isinstance(condition, dict):
+        return condition.get("$eq")
+    return condition
+
+
+class LocalVectorStore(VectorStore):
+    """Index vectoriel local : une matrice float32 normalisée par session
+
+    Chaque session est stockée dans son propre dossier : `vectors.f32` (lignes float32
+    brutes ouvertes en mémoire mappée), `records.jsonl` (une ligne par écriture :
+    ligne de la matrice, id et métadonnées) et `meta.json` (dimension). Les ajouts
+    sont écrits en fin de fichier et les remplacements en place, sans réécrire la
+    session. La recherche est un cosinus exact obtenu par un unique produit matriciel.
+    """
+
+    DEFAULT_PARTITION = "_default"
+    VECTORS_FILE = "vectors.f32"
+    RECORDS_FILE = "records.jsonl"
+    META_FILE = "meta.json"
+
+    def __init__(self, root_dir: str = "./vector_store"):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._partitions: Dict[str, Dict[str, Any]] = {}
+
+    def _partition_dir(self, partition: str) -> Path:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", partition)
+        return self.root_dir / safe_name
+
+    def _read_records(self, records_path: Path) -> Dict[str, Any]:
+        """Relit le journal des enregistrements ; une dernière ligne tronquée (arrêt brutal) est ignorée"""
+        ids: List[str] = []
+        metadata: List[Dict[str, Any]] = []
+        valid_bytes = 0
+        with open(records_path, "rb") as f:
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(raw)
+                except json.JSONDecodeError:
+                    break
+                row = record["row"]
+                if row == len(ids):
+                    ids.append(record["id"])
+                    metadata.append(record.get("metadata") or {})
+                elif row < len(ids):
+                    metadata[row] = record.get("metadata") or {}
+                else:
+                    break
+                valid_bytes += len(raw)
+        return {"ids": ids, "metadata": metadata, "records_bytes": valid_bytes}
+
+    def _load_partition(self, partition: str) -> Dict[str, Any]:
+        """Charge (ou retourne depuis la mémoire) la matrice et les métadonnées d'une session"""
+        if partition in self._partitions:
+            return self._partitions[partition]
+
+        directory = self._partition_dir(partition)
+        records_path = directory / self.RECORDS_FILE
+        meta_path = directory / self.META_FILE
+        legacy_vectors = directory / "vectors.npy"
+        legacy_records = directory / "records.json"
+
+        legacy = False
+        if records_path.exists() and meta_path.exists():
+            with open(meta_path, "r", encoding="utf-8") as f:
+                dim = json.load(f)["dim"]
+            records = self._read_records(records_path)
+            count = len(records["ids"])
+            if count:
+                # Des lignes écrites sans enregistrement (arrêt brutal) sont ignorées
+                matrix = np.memmap(directory / self.VECTORS_FILE, dtype=np.float32, mode="r", shape=(count, dim))
+            else:
+                matrix = np.zeros((0, dim), dtype=np.float32)
+        elif legacy_vectors.exists() and legacy_records.exists():
+            # Ancien format (matrice .npy + records.json), converti à la prochaine écriture
+            matrix = np.load(legacy_vectors, mmap_mode="r")
+            with open(legacy_records, "r", encoding="utf-8") as f:
+                records = json.load(f)
+            records["records_bytes"] = 0
+            dim = matrix.shape[1] if matrix.ndim == 2 else 0
+            legacy = True
+        else:
+            matrix = np.zeros((0, 0), dtype=np.float32)
+            records = {"ids": [], "metadata": [], "records_bytes": 0}
+            dim = 0
+
+        data = {
+            "matrix": matrix,
+            "dim": dim,
+            "ids": records["ids"],
+            "metadata": records["metadata"],
+            "positions": {vector_id: i for i, vector_id in enumerate(records["ids"])},
+            "records_bytes": records["records_bytes"],
+            "legacy": legacy
+        }
+        self._partitions[partition] = data
+        return data
+
+    def _save_partition(self, partition: str, matrix: np.ndarray, ids: List[str], metadata: List[Dict[str, Any]]):
+        """Réécrit entièrement une session sur disque de façon atomique (suppressions, conversion)"""
+        directory = self._partition_dir(partition)
+        self._partitions.pop(partition, None)
+
+        if not ids:
+            shutil.rmtree(directory, ignore_errors=True)
+            return
+
+        directory.mkdir(parents=True, exist_ok=True)
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+        tmp_vectors = directory / "vectors.tmp.f32"
+        tmp_records = directory / "records.tmp.jsonl"
+        tmp_meta = directory / "meta.tmp.json"
+        with open(tmp_vectors, "wb") as f:
+            f.write(matrix.tobytes())
+        with open(tmp_records, "wb") as f:
+            f.write(self._encode_records(
+                {"row": i, "id": vector_id, "metadata": meta}
+                for i, (vector_id, meta) in enumerate(zip(ids, metadata))
+            ))
+        with open(tmp_meta, "w", encoding="utf-8") as f:
+            json.dump({"dim": int(matrix.shape[1])}, f)
+        os.replace(tmp_vectors, directory / self.VECTORS_FILE)
+        os.replace(tmp_meta, directory / self.META_FILE)
+        os.replace(tmp_records, directory / self.RECORDS_FILE)
+        for legacy_file in ("vectors.npy", "records.json"):
+            (directory / legacy_file).unlink(missing_ok=True)
+
+    @staticmethod
+    def _encode_records(records) -> bytes:
+        return b"".join(
+            json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+            for record in records
+        )
+
+    def _append_partition(self, partition: str, data: Dict[str, Any], dim: int,
+                          appended: List[np.ndarray], replaced: List[tuple], records: List[Dict[str, Any]]):
+        """Ajoute les nouvelles lignes en fin de fichier et remplace les autres en place"""
+        directory = self._partition_dir(partition)
+        directory.mkdir(parents=True, exist_ok=True)
+        meta_path = directory / self.META_FILE
+        if not meta_path.exists():
+            tmp_meta = directory / "meta.tmp.json"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump({"dim": dim}, f)
+            os.replace(tmp_meta, meta_path)
+
+        count = len(data["ids"])
+        vectors_path = directory / self.VECTORS_FILE
+        row_bytes = dim * np.dtype(np.float32).itemsize
+        with open(vectors_path, "r+b" if vectors_path.exists() else "wb") as f:
+            # Les lignes orphelines d'une écriture interrompue sont écrasées
+            f.truncate(count * row_bytes)
+            f.seek(count * row_bytes)
+            if appended:
+                f.write(np.ascontiguousarray(np.asarray(appended, dtype=np.float32)).tobytes())
+
+        if replaced:
+            total = count + len(appended)
+            matrix = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(total, dim))
+            for position, row in replaced:
+                matrix[position] = row
+            matrix.flush()
+            del matrix
+
+        # Le journal est écrit en dernier : une ligne n'existe qu'une fois son vecteur sur disque
+        records_path = directory / self.RECORDS_FILE
+        payload = self._encode_records(records)
+        with open(records_path, "r+b" if records_path.exists() else "wb") as f:
+            f.truncate(data["records_bytes"])
+            f.seek(data["records_bytes"])
+            f.write(payload)
+
+        # Mise à jour de la session en mémoire sans relire le journal
+        for record in records:
+            if record["row"] == len(data["ids"]):
+                data["positions"][record["id"]] = record["row"]
+                data["ids"].append(record["id"])
+                data["metadata"].append(record["metadata"])
+            else:
+                data["metadata"][record["row"]] = record["metadata"]
+        data["records_bytes"] += len(payload)
+        data["dim"] = dim
+        data["matrix"] = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(len(data["ids"]), dim))
+
+    @staticmethod
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return (matrix / norms).astype(np.float32)
+
+    def upsert(self, vectors: List[Dict[str, Any]]):
+        """Ajoute ou remplace des vecteurs, regroupés par session (écriture incrémentale)"""
+        by_partition: Dict[str, List[Dict[str, Any]]] = {}
+        for vector in vectors:
+            metadata = vector.get("metadata") or {}
+            partition = metadata.get("session_id") or self.DEFAULT_PARTITION
+            by_partition.setdefault(partition, []).append(vector)
+
+        with self._lock:
+            for partition, items in by_partition.items():
+                data = self._load_partition(partition)
+                if data["legacy"]:
+                    self._save_partition(partition, data["matrix"], data["ids"], data["metadata"])
+                    data = self._load_partition(partition)
+
+                new_rows = self._normalize(np.asarray([item["values"] for item in items], dtype=np.float32))
+                dim = new_rows.shape[1]
+                if data["ids"] and data["dim"] != dim:
+                    raise ValueError(f"Dimension {dim} incompatible avec la session {partition} ({data['dim']})")
+
+                positions = dict(data["positions"])
+                appended: List[np.ndarray] = []
+                replaced: Dict[int, np.ndarray] = {}
+                records = []
+                for row, item in zip(new_rows, items):
+                    position = positions.get(item["id"])
+                    if position is None:
+                        position = positions[item["id"]] = len(data["ids"]) + len(appended)
+                        appended.append(row)
+                    elif position >= len(data["ids"]):
+                        appended[position - len(data["ids"])] = row
+                    else:
+                        replaced[position] = row
+                    records.append({"row": position, "id": item["id"], "metadata": item.get("metadata") or {}})
+
+                self._append_partition(partition, data, dim, appended, list(replaced.items()), records)
+
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector: List[float], top_k: int = 10, include_metadata: bool = True,
+              filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Recherche exacte des top_k vecteurs les plus proches (similarité cosinus)"""
+        return self.query_many([vector], top_k=top_k, include_metadata=include_metadata, filter=filter)[0]
+
+    def query_many(self, vectors: List[List[float]], top_k: int = 10, include_metadata: bool = True,
+                   filter: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Recherche exacte pour plusieurs vecteurs via un unique produit matriciel par session"""
+        if not len(vectors):
+            return []
+
+        session_id = _session_from_filter(filter)
+
+        with self._lock:
+            if session_id is not None:
+                partitions = [session_id]
+            else:
+                partitions = [p.name for p in self.root_dir.iterdir() if p.is_dir()]
+            loaded = [self._load_partition(partition) for partition in partitions]
+
+        query_matrix = self._normalize(np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1))
+        remaining_filter = {k: v for k, v in (filter or {}).items() if k != "session_id" or session_id is None}
+
+        candidates: List[List[tuple]] = [[] for _ in range(len(query_matrix))]
+        for data in loaded:
+            if not data["ids"]:
+                continue
+
+            # (n_vecteurs_session, dim) x (dim, n_requêtes) -> scores de toutes les requêtes
+            matrix = data["matrix"]
+            scores = np.asarray(matrix @ query_matrix.T).T
+            if remaining_filter:
+                # Limité aux lignes de la matrice lue (un ajout concurrent peut allonger les métadonnées)
+                mask = np.array([_matches_filter(m, remaining_filter) for m in data["metadata"][:matrix.shape[0]]], dtype=bool)
+                scores = np.where(mask[np.newaxis, :], scores, -np.inf)
+
+            k = min(top_k, scores.shape[1])
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            for q, row in enumerate(top):
+                for i in row:
+                    if np.isfinite(scores[q, i]):
+                        candidates[q].append((float(scores[q, i]), data["ids"][i], data["metadata"][i]))
+
+        responses = []
+        for query_candidates in candidates:
+            query_candidates.sort(key=lambda item: item[0], reverse=True)
+            matches = []
+            for score, vector_id, metadata in query_candidates[:top_k]:
+                match = {"id": vector_id, "score": score}
+                if include_metadata:
+                    match["metadata"] = metadata
+                matches.append(match)
+            responses.append({"matches": matches})
+        return responses
+
+    def delete(self, filter: Optional[Dict[str, Any]] = None, ids: Optional[List[str]] = None):
+        """Supprime une session entière (filtre session_id) ou des vecteurs précis"""
+        with self._lock:
+            session_id = _session_from_filter(filter)
+            if ids is None and session_id is not None and len(filter) == 1:
+                self._partitions.pop(session_id, None)
+                shutil.rmtree(self._partition_dir(session_id), ignore_errors=True)
+                return
+
+            partitions = [session_id] if session_id is not None else [p.name for p in self.root_dir.iterdir() if p.is_dir()]
+            id_set = set(ids or [])
+            for partition in partitions:
+                data = self._load_partition(partition)
+                keep = [
+                    i for i, (vector_id, metadata) in enumerate(zip(data["ids"], data["metadata"]))
+                    if not ((ids is None or vector_id in id_set) and (ids is not None or _matches_filter(metadata, filter)))
+                ]
+                if len(keep) == len(data["ids"]):
+                    continue
+                matrix = np.array(data["matrix"], dtype=np.float32)[keep] if keep else np.zeros((0, 0), dtype=np.float32)
+                self._save_partition(
+                    partition,
+                    matrix,
+                    [data["ids"][i] for i in keep],
+                    [data["metadata"][i] for i in keep]
+                )
+
+
+def create_vector_store(backend: str = "pinecone", index_name: str = "learn-obj", **kwargs) -> VectorStore:
+    """Instancie le backend vectoriel demandé ("pinecone" ou "local")"""
+    backend = (backend or "pinecone").lower()
+    if backend == "local":
+        return LocalVectorStore(kwargs.get("root_dir") or "./vector_store")
+    if backend == "pinecone":
+        return PineconeIndexStore(kwargs.get("api_key"), index_name=index_name)
+    raise ValueError(f"Backend vectoriel inconnu: {backend}")
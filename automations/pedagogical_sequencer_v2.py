@@ -4,6 +4,8 @@ import json
 import re
 from typing import Dict, List, Any
 
+from shared.utils.classification_parser import ClassificationTable, classification_table_from_result
+
 class PedagogicalSequencerV2:
     def __init__(self, api_key: str):
         """Initialise le générateur spécialisé avec la clé API OpenAI"""
@@ -55,9 +57,10 @@ class PedagogicalSequencerV2:
         }
         
         # Analyser la classification
-        if 'classification' in input_data and 'classification' in input_data['classification']:
+        if input_data.get('classified_objectives') or 'classification' in input_data and 'classification' in input_data['classification']:
+            # Tableau calculé par l'agent si disponible, sinon une seule analyse du texte
             analysis['objectives'] = self._extract_objectives_from_classification(
-                input_data['classification']['classification']
+                classification_table_from_result(input_data)
             )
             analysis['bloom_distribution'] = self._analyze_bloom_distribution(analysis['objectives'])
         
@@ -81,33 +84,17 @@ class PedagogicalSequencerV2:
         
         return analysis
     
-    def _extract_objectives_from_classification(self, classification_text: str) -> List[Dict[str, str]]:
-        """Extrait les objectifs détaillés de la classification"""
-        objectives = []
-        
-        # Diviser par les séparateurs "---"
-        objective_blocks = classification_text.split('---')
-        
-        for block in objective_blocks:
-            if block.strip():
-                objective = {}
-                lines = block.strip().split('\n')
-                
-                for line in lines:
-                    line = line.strip()
-                    if line.startswith('Objectif:'):
-                        objective['objectif'] = line.replace('Objectif:', '').strip()
-                    elif line.startswith('Verbe principal:'):
-                        objective['verbe'] = line.replace('Verbe principal:', '').strip()
-                    elif line.startswith('Niveau de Bloom:'):
-                        objective['bloom'] = line.replace('Niveau de Bloom:', '').strip()
-                    elif line.startswith('Justification:'):
-                        objective['justification'] = line.replace('Justification:', '').strip()
-                
-                if objective.get('objectif'):
-                    objectives.append(objective)
-        
-        return objectives
+    def _extract_objectives_from_classification(self, table: ClassificationTable) -> List[Dict[str, str]]:
+        """Convertit le tableau des objectifs classifiés au format du séquenceur"""
+        return [
+            {
+                'objectif': entry.objective,
+                'verbe': entry.verb,
+                'bloom': entry.level,
+                'justification': entry.justification
+            }
+            for entry in table
+        ]
     
     def _analyze_bloom_distribution(self, objectives: List[Dict[str, str]]) -> Dict[str, int]:
         """Analyse la distribution des niveaux de Bloom"""
@@ -5,6 +5,14 @@ from datetime import datetime
 from openai import OpenAI
 from typing import Dict, List, Any
 import io
+import sys
+from pathlib import Path
+
+if __name__ == "__main__":
+    # Lancé directement (streamlit run) : ajouter le répertoire racine pour le package shared
+    sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from shared.utils.llm_cache import get_llm_cache
 
 # Configuration de la page
 st.set_page_config(
@@ -14,15 +22,50 @@ st.set_page_config(
 )
 
 class ScriptGenerator:
-    def __init__(self, api_key: str):
-        """Initialise le générateur de scripts avec la clé API OpenAI"""
-        self.client = OpenAI(api_key=api_key)
+    def __init__(self, api_key: str, model: str = "gpt-4o", temperature: float = 0.7, max_tokens: int = 2000, client: OpenAI = None):
+        """Initialise le générateur de scripts avec la clé API OpenAI (ou un client partagé)"""
+        self.client = client or OpenAI(api_key=api_key)
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
     
-    def generate_script(self, activity_data: Dict, activity_type: str) -> str:
-        """Génère un script pédagogique pour une activité spécifique"""
+    def generate_script(self, activity_data: Dict, activity_type: str, raise_errors: bool = False,
+                        regenerate: bool = False) -> str:
+        """Génère un script pédagogique pour une activité spécifique
+        
+        Avec raise_errors=True, les erreurs d'API sont propagées au lieu d'être
+        renvoyées sous forme de texte, afin que l'appelant puisse réessayer.
+        Avec regenerate=True, le script en cache est ignoré et remplacé par un nouveau.
+        """
+        prompts = self._get_prompts()
+        
+        if activity_type not in prompts:
+            return f"Type d'activité '{activity_type}' non supporté"
         
-        # Prompts spécialisés par type d'activité
-        prompts = {
+        context = self._build_context(activity_data, activity_type)
+        
+        try:
+            return get_llm_cache().get_or_compute(
+                self.model, self.temperature, prompts[activity_type], context,
+                lambda: self._request_completion(prompts[activity_type], context),
+                refresh=regenerate
+            )
+            
+        except Exception as e:
+            if raise_errors:
+                raise
+            return f"Erreur lors de la génération : {str(e)}"
+    
+    def estimate_request_tokens(self, activity_data: Dict, activity_type: str) -> int:
+        """Estime le nombre de tokens consommés par un appel (prompt + complétion maximale)"""
+        system_prompt = self._get_prompts().get(activity_type, "")
+        context = self._build_context(activity_data, activity_type)
+        # Approximation usuelle : ~4 caractères par token
+        return (len(system_prompt) + len(context)) // 4 + self.max_tokens
+    
+    def _get_prompts(self) -> Dict[str, str]:
+        """Prompts spécialisés par type d'activité"""
+        return {
             'text': self._get_text_prompt(),
             'quiz': self._get_quiz_prompt(),
             'accordion': self._get_accordion_prompt(),
@@ -30,12 +73,10 @@ class ScriptGenerator:
             'image': self._get_image_prompt(),
             'flash-card': self._get_flashcard_prompt()
         }
-        
-        if activity_type not in prompts:
-            return f"Type d'activité '{activity_type}' non supporté"
-        
-        # Préparation du contexte
-        context = f"""
+    
+    def _build_context(self, activity_data: Dict, activity_type: str) -> str:
+        """Prépare le contexte utilisateur décrivant l'activité"""
+        return f"""
         ACTIVITÉ À SCRIPTER :
         
         Numéro d'écran : {activity_data.get('num_ecran', 'Non défini')}
@@ -51,22 +92,20 @@ class ScriptGenerator:
         
         Générez le script pédagogique détaillé pour cette activité de type "{activity_type}".
         """
+    
+    def _request_completion(self, system_prompt: str, context: str) -> str:
+        """Appelle l'API OpenAI pour générer un script"""
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": context}
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
         
-        try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": prompts[activity_type]},
-                    {"role": "user", "content": context}
-                ],
-                temperature=0.7,
-                max_tokens=2000
-            )
-            
-            return response.choices[0].message.content
-            
-        except Exception as e:
-            return f"Erreur lors de la génération : {str(e)}"
+        return response.choices[0].message.content
     
     def _get_text_prompt(self) -> str:
         return """
@@ -343,6 +382,11 @@ def main():
                 default=activity_options[:3] if len(activity_options) >= 3 else activity_options
             )
             
+            regenerate = st.checkbox(
+                "🔁 Nouvelle génération",
+                help="Ignore les scripts déjà en cache et en génère de nouveaux"
+            )
+            
             if st.button("🚀 Générer les Scripts", type="primary"):
                 if selected_activities:
                     generator = ScriptGenerator(api_key)
@@ -359,7 +403,8 @@ def main():
                             # Générer le script
                             script = generator.generate_script(
                                 activity, 
-                                activity.get('type_activite', 'text')
+                                activity.get('type_activite', 'text'),
+                                regenerate=regenerate
                             )
                             
                             script_id = f"{activity.get('num_ecran', f'Act{activity_index+1}')}_{activity.get('type_activite', 'unknown')}"
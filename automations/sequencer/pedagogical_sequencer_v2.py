@@ -2,16 +2,25 @@ from openai import OpenAI
 import streamlit as st
 import json
 import re
-from typing import Dict, List, Any
+from typing import Dict, Iterator, List, Any
+
+from shared.utils.llm_cache import get_llm_cache
+from shared.utils.classification_parser import ClassificationTable, classification_table_from_result
+from shared.utils.json_stream import JSONArrayStreamParser
 
 class PedagogicalSequencerV2:
-    def __init__(self, api_key: str):
-        """Initialise le générateur spécialisé avec la clé API OpenAI"""
-        self.client = OpenAI(api_key=api_key)
-        
-    def generate_sequencer(self, input_data: Dict[str, Any]) -> List[Dict[str, str]]:
+    def __init__(self, api_key: str, model: str = "gpt-4o-mini", temperature: float = 0.7, max_tokens: int = 4000, client: OpenAI = None):
+        """Initialise le générateur spécialisé avec la clé API OpenAI (ou un client partagé)"""
+        self.client = client or OpenAI(api_key=api_key)
+        self.model = model
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        
+    def generate_sequencer(self, input_data: Dict[str, Any], regenerate: bool = False) -> List[Dict[str, str]]:
         """
         Génère un séquenceur pédagogique à partir du nouveau format de données
+        
+        Avec regenerate=True, la réponse en cache est ignorée et remplacée par une nouvelle.
         """
         # Analyser les données d'entrée
         analysis = self._analyze_input_data(input_data)
@@ -19,19 +28,16 @@ class PedagogicalSequencerV2:
         # Créer le prompt spécialisé
         prompt = self._create_specialized_prompt(input_data, analysis)
         
+        system_prompt = self._get_specialized_system_prompt()
+        
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": self._get_specialized_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=4000
+            content = get_llm_cache().get_or_compute(
+                self.model, self.temperature, system_prompt, prompt,
+                lambda: self._request_completion(system_prompt, prompt),
+                refresh=regenerate
             )
             
             # Parser la réponse pour extraire le JSON
-            content = response.choices[0].message.content
             sequencer_data = self._parse_response(content)
             
             # Enrichir avec les métadonnées analysées
@@ -43,6 +49,62 @@ class PedagogicalSequencerV2:
             st.error(f"Erreur lors de la génération : {str(e)}")
             return []
     
+    def iter_sequencer(self, input_data: Dict[str, Any], regenerate: bool = False) -> Iterator[Dict[str, str]]:
+        """
+        Version en flux de generate_sequencer : chaque écran est produit dès que son objet JSON
+        est complet dans la réponse du modèle, sans attendre la fin du tableau.
+        
+        Contrairement à generate_sequencer, les erreurs sont propagées à l'appelant.
+        """
+        analysis = self._analyze_input_data(input_data)
+        prompt = self._create_specialized_prompt(input_data, analysis)
+        system_prompt = self._get_specialized_system_prompt()
+        
+        parser = JSONArrayStreamParser()
+        produced = 0
+        for chunk in get_llm_cache().get_or_stream(
+            self.model, self.temperature, system_prompt, prompt,
+            lambda: self._stream_completion(system_prompt, prompt),
+            refresh=regenerate
+        ):
+            for item in parser.feed(chunk):
+                if isinstance(item, dict):
+                    produced += 1
+                    yield self._enrich_with_metadata([item], analysis)[0]
+        
+        # Réponse hors du format tableau attendu : analyse complète en dernier recours
+        if not produced:
+            yield from self._enrich_with_metadata(self._parse_response(parser.text), analysis)
+    
+    def _stream_completion(self, system_prompt: str, prompt: str) -> Iterator[str]:
+        """Appelle l'API OpenAI en mode flux et produit le texte au fil de la génération"""
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    
+    def _request_completion(self, system_prompt: str, prompt: str) -> str:
+        """Appelle l'API OpenAI pour générer le séquenceur"""
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            max_tokens=self.max_tokens
+        )
+        return response.choices[0].message.content
+    
     def _analyze_input_data(self, input_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyse approfondie des données d'entrée du nouveau format"""
         analysis = {
@@ -55,9 +117,10 @@ class PedagogicalSequencerV2:
         }
         
         # Analyser la classification
-        if 'classification' in input_data and 'classification' in input_data['classification']:
+        if input_data.get('classified_objectives') or 'classification' in input_data and 'classification' in input_data['classification']:
+            # Tableau calculé par l'agent si disponible, sinon une seule analyse du texte
             analysis['objectives'] = self._extract_objectives_from_classification(
-                input_data['classification']['classification']
+                classification_table_from_result(input_data)
             )
             analysis['bloom_distribution'] = self._analyze_bloom_distribution(analysis['objectives'])
         
@@ -81,33 +144,17 @@ class PedagogicalSequencerV2:
         
         return analysis
     
-    def _extract_objectives_from_classification(self, classification_text: str) -> List[Dict[str, str]]:
-        """Extrait les objectifs détaillés de la classification"""
-        objectives = []
-        
-        # Diviser par les séparateurs "---"
-        objective_blocks = classification_text.split('---')
-        
-        for block in objective_blocks:
-            if block.strip():
-                objective = {}
-                lines = block.strip().split('\n')
-                
-                for line in lines:
-                    line = line.strip()
-                    if line.startswith('Objectif:'):
-                        objective['objectif'] = line.replace('Objectif:', '').strip()
-                    elif line.startswith('Verbe principal:'):
-                        objective['verbe'] = line.replace('Verbe principal:', '').strip()
-                    elif line.startswith('Niveau de Bloom:'):
-                        objective['bloom'] = line.replace('Niveau de Bloom:', '').strip()
-                    elif line.startswith('Justification:'):
-                        objective['justification'] = line.replace('Justification:', '').strip()
-                
-                if objective.get('objectif'):
-                    objectives.append(objective)
-        
-        return objectives
+    def _extract_objectives_from_classification(self, table: ClassificationTable) -> List[Dict[str, str]]:
+        """Convertit le tableau des objectifs classifiés au format du séquenceur"""
+        return [
+            {
+                'objectif': entry.objective,
+                'verbe': entry.verb,
+                'bloom': entry.level,
+                'justification': entry.justification
+            }
+            for entry in table
+        ]
     
     def _analyze_bloom_distribution(self, objectives: List[Dict[str, str]]) -> Dict[str, int]:
         """Analyse la distribution des niveaux de Bloom"""
@@ -5,6 +5,8 @@ import io
 import re
 from typing import Dict, List, Any, Tuple
 
+from shared.utils.classification_parser import classification_table_from_result, parse_classification
+
 def load_json_file(uploaded_file) -> Dict[str, Any]:
     """Charge et valide un fichier JSON"""
     try:
@@ -60,19 +62,11 @@ def validate_new_format_data(data: Dict[str, Any]) -> Tuple[bool, List[str], Dic
     
     # Analyse de la classification si présente
     if 'classification' in data and 'classification' in data['classification']:
-        classification_text = data['classification']['classification']
-        
-        # Compter les objectifs (séparés par ---)
-        objectives = classification_text.split('---')
-        stats['objectives_count'] = len([obj for obj in objectives if obj.strip()])
+        classified_objectives = classification_table_from_result(data)
         
-        # Compter les niveaux de Bloom uniques
-        bloom_levels = set()
-        for line in classification_text.split('\n'):
-            if 'Niveau de Bloom:' in line:
-                level = line.split('Niveau de Bloom:')[1].strip()
-                bloom_levels.add(level.lower())
-        stats['bloom_levels'] = len(bloom_levels)
+        # Compter les objectifs et les niveaux de Bloom uniques
+        stats['objectives_count'] = len(classified_objectives)
+        stats['bloom_levels'] = len(set(classified_objectives.levels()))
     
     # Analyse des objectifs formatés
     if 'formatted_objectives' in data and 'formatted_objectives' in data['formatted_objectives']:
@@ -107,18 +101,7 @@ def validate_new_format_data(data: Dict[str, Any]) -> Tuple[bool, List[str], Dic
 
 def extract_bloom_progression(classification_text: str) -> List[str]:
     """Extrait la progression des niveaux de Bloom dans l'ordre"""
-    bloom_progression = []
-    
-    objectives = classification_text.split('---')
-    for obj in objectives:
-        if obj.strip():
-            for line in obj.split('\n'):
-                if 'Niveau de Bloom:' in line:
-                    level = line.split('Niveau de Bloom:')[1].strip()
-                    bloom_progression.append(level)
-                    break
-    
-    return bloom_progression
+    return parse_classification(classification_text).levels()
 
 def extract_temporal_sequence(formatted_objectives: str) -> List[Dict[str, str]]:
     """Extrait la séquence temporelle des objectifs"""
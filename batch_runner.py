@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Ajouter le répertoire racine au PYTHONPATH
+ROOT_DIR = Path(__file__).parent
+sys.path.insert(0, str(ROOT_DIR))
+
+def parse_args(argv=None):
+    """Arguments de la ligne de commande"""
+    from shared.config.settings import settings
+
+    parser = argparse.ArgumentParser(
+        description="Génère un lot de cours à partir d'un fichier JSONL (un cours par ligne)"
+    )
+    parser.add_argument("input", help="Fichier JSONL des cours (course_subject, target_audience, ...)")
+    parser.add_argument("-c", "--concurrency", type=int, default=settings.BATCH_MAX_CONCURRENCY,
+                        help="Nombre maximal de workflows simultanés")
+    parser.add_argument("-o", "--output-dir", default=str(settings.OUTPUTS_DIR), help="Dossier des sorties JSON")
+    parser.add_argument("--db-path", default="educational_platform.db", help="Base SQLite des sessions")
+    parser.add_argument("--retry-failed", action="store_true", help="Relancer aussi les cours en échec")
+    return parser.parse_args(argv)
+
+def main(argv=None) -> int:
+    """Point d'entrée du mode lot"""
+    args = parse_args(argv)
+
+    from shared.config.settings import settings
+    from orchestrator.simple_orchestrator import create_educational_orchestrator
+    from orchestrator.batch_runner import load_batch_jobs, run_batch, save_batch_report
+
+    if not settings.OPENAI_API_KEY:
+        print("❌ OPENAI_API_KEY non configuré")
+        return 1
+
+    try:
+        jobs = load_batch_jobs(args.input)
+    except OSError as e:
+        print(f"❌ Lecture du fichier impossible : {e}")
+        return 1
+
+    if not jobs:
+        print("ℹ️ Aucun cours valide dans le fichier")
+        return 0
+
+    async def run() -> dict:
+        # Les sorties encore en file d'écriture sont terminées avant le rapport
+        async with create_educational_orchestrator(settings.OPENAI_API_KEY, args.output_dir, args.db_path) as orchestrator:
+            return await run_batch(orchestrator, jobs, args.concurrency, args.retry_failed)
+
+    report = asyncio.run(run())
+    report_path = save_batch_report(report, args.output_dir, args.input)
+
+    print("")
+    print(f"🎉 Lot terminé en {report['duration_seconds']:.1f}s : "
+          f"{report['completed']} réussis, {report['failed']} échoués, "
+          f"{report['skipped_completed']} déjà terminés")
+    if report_path:
+        print(f"📁 Rapport : {report_path}")
+
+    return 0 if report["failed"] == 0 else 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 import os
 
 try:
-from .models import Base, WorkflowSession, AgentAnalysis, SequencerData, ScriptData, WorkflowStats
+    from .models import Base, WorkflowSession, AgentAnalysis, SequencerData, ScriptData, WorkflowStats
 except ImportError:
     from database.models import Base, WorkflowSession, AgentAnalysis, SequencerData, ScriptData, WorkflowStats
 
@@ -75,6 +75,44 @@ class DatabaseManager:
         finally:
             self.close_session(session)
     
+    def ensure_workflow_session(self, session_id: str, user_input: Dict[str, Any], status: str = 'pending') -> Optional[str]:
+        """Crée la session si elle n'existe pas encore et retourne son statut actuel"""
+        session = self.get_session()
+        try:
+            workflow_session = session.query(WorkflowSession).filter_by(session_id=session_id).first()
+            if workflow_session:
+                return workflow_session.status
+            
+            session.add(WorkflowSession(session_id=session_id, user_input=user_input, status=status))
+            session.commit()
+            return status
+            
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Erreur enregistrement session : {e}")
+            return None
+        finally:
+            self.close_session(session)
+    
+    def get_workflow_statuses(self, session_ids: List[str]) -> Dict[str, str]:
+        """Retourne le statut de chaque session existante parmi celles fournies"""
+        session = self.get_session()
+        try:
+            statuses = {}
+            # Par tranches pour rester sous la limite de paramètres SQLite
+            for start in range(0, len(session_ids), 500):
+                rows = session.query(WorkflowSession.session_id, WorkflowSession.status)\
+                              .filter(WorkflowSession.session_id.in_(session_ids[start:start + 500]))\
+                              .all()
+                statuses.update({session_id: status for session_id, status in rows})
+            return statuses
+            
+        except Exception as e:
+            print(f"❌ Erreur récupération statuts : {e}")
+            return {}
+        finally:
+            self.close_session(session)
+    
     def update_workflow_session(self, session_id: str, **kwargs) -> bool:
         """Met à jour une session de workflow"""
         session = self.get_session()
@@ -108,6 +146,8 @@ class DatabaseManager:
         """Sauvegarde les résultats de l'agent"""
         session = self.get_session()
         try:
+            # Une seule analyse par session : un nouveau passage remplace le point de reprise précédent
+            session.query(AgentAnalysis).filter_by(session_id=session_id).delete()
             agent_analysis = AgentAnalysis(
                 session_id=session_id,
                 objectives=analysis_data.get('objectives', []),
@@ -139,6 +179,7 @@ class DatabaseManager:
         """Sauvegarde les activités du séquenceur"""
         session = self.get_session()
         try:
+            session.query(SequencerData).filter_by(session_id=session_id).delete()
             for activity in sequencer_activities:
                 sequencer_item = SequencerData(
                     session_id=session_id,
@@ -171,19 +212,22 @@ class DatabaseManager:
     # SCRIPTS DATA
     # ===========================================
     
+    def _upsert_script(self, session, session_id: str, script_id: str, script_info: Dict[str, Any]):
+        """Ajoute un script ou remplace celui qui porte le même identifiant"""
+        script_item = session.query(ScriptData).filter_by(session_id=session_id, script_id=script_id).first()
+        if not script_item:
+            script_item = ScriptData(session_id=session_id, script_id=script_id)
+            session.add(script_item)
+        script_item.activity_data = script_info.get('activite', {})
+        script_item.script_content = script_info.get('script', '')
+        script_item.script_type = script_info.get('activite', {}).get('type_activite', '')
+    
     def save_scripts_data(self, session_id: str, scripts_data: Dict[str, Any]) -> bool:
         """Sauvegarde les scripts générés"""
         session = self.get_session()
         try:
             for script_id, script_info in scripts_data.items():
-                script_item = ScriptData(
-                    session_id=session_id,
-                    script_id=script_id,
-                    activity_data=script_info.get('activite', {}),
-                    script_content=script_info.get('script', ''),
-                    script_type=script_info.get('activite', {}).get('type_activite', '')
-                )
-                session.add(script_item)
+                self._upsert_script(session, session_id, script_id, script_info)
             
             session.commit()
             print(f"✅ Scripts sauvegardés : {len(scripts_data)} scripts")
@@ -196,6 +240,21 @@ class DatabaseManager:
         finally:
             self.close_session(session)
     
+    def save_script_checkpoint(self, session_id: str, script_id: str, script_info: Dict[str, Any]) -> bool:
+        """Sauvegarde un script dès sa génération (point de reprise)"""
+        session = self.get_session()
+        try:
+            self._upsert_script(session, session_id, script_id, script_info)
+            session.commit()
+            return True
+            
+        except Exception as e:
+            session.rollback()
+            print(f"❌ Erreur sauvegarde script {script_id} : {e}")
+            return False
+        finally:
+            self.close_session(session)
+    
     # ===========================================
     # STATISTICS
     # ===========================================
@@ -255,6 +314,86 @@ class DatabaseManager:
         finally:
             self.close_session(session)
     
+    def get_agent_analysis(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Récupère l'analyse de l'agent d'une session"""
+        session = self.get_session()
+        try:
+            analysis = session.query(AgentAnalysis)\
+                              .filter_by(session_id=session_id)\
+                              .order_by(AgentAnalysis.id.desc())\
+                              .first()
+            
+            if analysis:
+                return {
+                    'objectives': analysis.objectives or [],
+                    'content_analysis': analysis.content_analysis or {},
+                    'classification': analysis.classification or {},
+                    'formatted_objectives': analysis.formatted_objectives or {},
+                    'difficulty_evaluation': analysis.difficulty_evaluation or {},
+                    'recommendations': analysis.recommendations or {},
+                    'feedback': analysis.feedback or {},
+                    'stats': analysis.statistics or {}
+                }
+            return None
+            
+        except Exception as e:
+            print(f"❌ Erreur récupération analyse : {e}")
+            return None
+        finally:
+            self.close_session(session)
+    
+    def get_sequencer_data(self, session_id: str) -> List[Dict[str, Any]]:
+        """Récupère les activités du séquenceur d'une session, dans l'ordre"""
+        session = self.get_session()
+        try:
+            activities = session.query(SequencerData)\
+                                .filter_by(session_id=session_id)\
+                                .order_by(SequencerData.id)\
+                                .all()
+            
+            return [{
+                'sequence': a.sequence_name,
+                'num_ecran': a.num_ecran,
+                'titre_ecran': a.titre_ecran,
+                'sous_titre': a.sous_titre,
+                'resume_contenu': a.resume_contenu,
+                'type_activite': a.type_activite,
+                'niveau_bloom': a.niveau_bloom,
+                'difficulte': a.difficulte,
+                'duree_estimee': a.duree_estimee,
+                'objectif_lie': a.objectif_lie,
+                'commentaire': a.commentaire
+            } for a in activities]
+            
+        except Exception as e:
+            print(f"❌ Erreur récupération séquenceur : {e}")
+            return []
+        finally:
+            self.close_session(session)
+    
+    def get_scripts_data(self, session_id: str) -> Dict[str, Any]:
+        """Récupère les scripts déjà générés d'une session"""
+        session = self.get_session()
+        try:
+            scripts = session.query(ScriptData)\
+                             .filter_by(session_id=session_id)\
+                             .order_by(ScriptData.id)\
+                             .all()
+            
+            return {
+                s.script_id: {
+                    'activite': s.activity_data or {},
+                    'script': s.script_content,
+                    'generated_at': s.created_at.isoformat() if s.created_at else None
+                } for s in scripts
+            }
+            
+        except Exception as e:
+            print(f"❌ Erreur récupération scripts : {e}")
+            return {}
+        finally:
+            self.close_session(session)
+    
     def get_recent_sessions(self, limit: int = 10) -> List[Dict]:
         """Récupère les sessions récentes"""
         session = self.get_session()
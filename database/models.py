@@ -12,7 +12,7 @@ class WorkflowSession(Base):
     id = Column(Integer, primary_key=True)
     session_id = Column(String(255), unique=True, nullable=False, index=True)
     user_input = Column(JSON, nullable=False)
-    status = Column(String(50), default='pending')  # pending, in_progress, completed, failed
+    status = Column(String(50), default='pending')  # pending, in_progress, partial, completed, failed
     start_time = Column(DateTime, default=func.now())
     end_time = Column(DateTime)
     duration_seconds = Column(Float)
@@ -156,6 +156,11 @@ def main():
             help="L'IA extraira automatiquement les objectifs de vos documents"
         )
         
+        regenerate = st.checkbox(
+            "🔁 Nouvelle génération",
+            help="Ignore les réponses déjà en cache pour ce cours et génère un nouveau séquenceur et de nouveaux scripts"
+        )
+        
         # Bouton de soumission
         submitted = st.form_submit_button("🚀 Lancer l'Analyse Complète", type="primary")
     
@@ -170,7 +175,8 @@ def main():
             "course_subject": course_subject,
             "target_audience": target_audience,
             "learning_objectives": learning_objectives,
-            "source_text": source_text
+            "source_text": source_text,
+            "regenerate": regenerate
         }
         
         # Lancer le workflow
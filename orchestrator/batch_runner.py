@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Statuts de workflow_sessions qui ne sont pas relancés par défaut
+FINISHED_STATUSES = ("completed",)
+
+
+@dataclass
+class BatchJob:
+    """Un cours à générer, lu depuis une ligne du fichier JSONL"""
+    session_id: str
+    course_data: Dict[str, Any]
+    line_number: int
+
+
+def job_session_id(course_data: Dict[str, Any]) -> str:
+    """Identifiant stable d'un cours : relancer le même fichier retrouve les mêmes sessions"""
+    canonical = json.dumps(course_data, sort_keys=True, ensure_ascii=False)
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"educational-batch:{canonical}"))
+
+
+def load_batch_jobs(path: str) -> List[BatchJob]:
+    """Lit un fichier JSONL de cours (une entrée par ligne, `session_id` optionnel)"""
+    jobs: List[BatchJob] = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                course_data = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"⚠️ Ligne {line_number} ignorée (JSON invalide) : {e}")
+                continue
+            if not isinstance(course_data, dict) or not course_data.get("course_subject"):
+                print(f"⚠️ Ligne {line_number} ignorée : champ 'course_subject' manquant")
+                continue
+
+            session_id = course_data.pop("session_id", None) or job_session_id(course_data)
+            if session_id in seen:
+                print(f"⚠️ Ligne {line_number} ignorée : cours en double ({session_id[:8]})")
+                continue
+            seen.add(session_id)
+            jobs.append(BatchJob(session_id=session_id, course_data=course_data, line_number=line_number))
+    return jobs
+
+
+async def run_batch(
+    orchestrator,
+    jobs: List[BatchJob],
+    max_concurrency: int = 3,
+    retry_failed: bool = False
+) -> Dict[str, Any]:
+    """Exécute les workflows d'un lot sur une seule boucle d'événements avec une limite globale de concurrence
+
+    Le statut de chaque cours est conservé dans workflow_sessions : après une interruption,
+    relancer le même lot reprend les cours non terminés (et les échecs avec `retry_failed`)
+    à partir de leurs points de reprise.
+    """
+    db_manager = orchestrator.db_manager
+    statuses = db_manager.get_workflow_statuses([job.session_id for job in jobs])
+
+    to_run: List[BatchJob] = []
+    resumable = set()
+    skipped = {"completed": 0, "failed": 0}
+    for job in jobs:
+        status = statuses.get(job.session_id)
+        if status in FINISHED_STATUSES:
+            skipped["completed"] += 1
+        elif status == "failed" and not retry_failed:
+            skipped["failed"] += 1
+        else:
+            # Les cours sont enregistrés avant l'exécution pour être repris après un arrêt
+            if status is None:
+                db_manager.ensure_workflow_session(job.session_id, job.course_data, status="pending")
+            elif status != "pending":
+                # Interrompu, partiel ou en échec : les étapes déjà produites sont reprises
+                resumable.add(job.session_id)
+            to_run.append(job)
+
+    print(f"📦 Lot de {len(jobs)} cours : {len(to_run)} à exécuter (dont {len(resumable)} repris), "
+          f"{skipped['completed']} déjà terminés, {skipped['failed']} en échec ignorés")
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    finished = 0
+    start = time.perf_counter()
+
+    async def run_job(job: BatchJob) -> Dict[str, Any]:
+        nonlocal finished
+        async with semaphore:
+            job_start = time.perf_counter()
+            try:
+                if job.session_id in resumable:
+                    state = await orchestrator.resume_workflow(job.session_id, dict(job.course_data))
+                else:
+                    state = await orchestrator.run_complete_workflow(dict(job.course_data), job.session_id)
+                status, error = state.status.value, state.error_message
+            except Exception as e:
+                status, error = "failed", f"Erreur critique: {e}"
+                db_manager.update_workflow_session(job.session_id, status="failed", error_message=error)
+
+        finished += 1
+        icon = "✅" if status == "completed" else "❌"
+        print(f"{icon} [{finished}/{len(to_run)}] {job.course_data.get('course_subject', '')[:50]} ({job.session_id[:8]})")
+        return {
+            "session_id": job.session_id,
+            "line": job.line_number,
+            "course_subject": job.course_data.get("course_subject"),
+            "status": status,
+            "error": error,
+            "duration_seconds": round(time.perf_counter() - job_start, 2)
+        }
+
+    results = await asyncio.gather(*(run_job(job) for job in to_run))
+
+    return {
+        "total": len(jobs),
+        "executed": len(results),
+        "completed": sum(1 for result in results if result["status"] == "completed"),
+        "failed": sum(1 for result in results if result["status"] != "completed"),
+        "skipped_completed": skipped["completed"],
+        "skipped_failed": skipped["failed"],
+        "duration_seconds": round(time.perf_counter() - start, 2),
+        "jobs": results
+    }
+
+
+def save_batch_report(report: Dict[str, Any], output_directory: str, input_path: str) -> Optional[str]:
+    """Sauvegarde le rapport du lot à côté des sorties des workflows"""
+    try:
+        path = Path(output_directory) / f"batch_report_{Path(input_path).stem}_{int(time.time())}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False, default=str)
+        return str(path)
+    except Exception as e:
+        print(f"⚠️ Erreur sauvegarde rapport du lot: {e}")
+        return None
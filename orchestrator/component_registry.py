@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+def _api_key_fingerprint(api_key: Optional[str]) -> str:
+    """Empreinte courte de la clé API (la clé elle-même n'est jamais conservée dans les clés du registre)"""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class ComponentRegistry:
+    """Registre des composants coûteux à construire, partagé par le processus
+
+    Chaque composant est identifié par (type, modèle, température, empreinte de la clé API) et
+    construit au premier accès seulement. Un verrou par clé permet de construire des composants
+    différents en parallèle tout en garantissant une seule construction par clé.
+    """
+
+    def __init__(self):
+        self._instances: Dict[Tuple[Hashable, ...], Any] = {}
+        self._build_seconds: Dict[Tuple[Hashable, ...], float] = {}
+        self._key_locks: Dict[Tuple[Hashable, ...], threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(kind: str, model: Optional[str], temperature: Optional[float], api_key: Optional[str]) -> Tuple[Hashable, ...]:
+        return kind, model, temperature, _api_key_fingerprint(api_key)
+
+    def get_or_create(
+        self,
+        kind: str,
+        model: Optional[str],
+        temperature: Optional[float],
+        api_key: Optional[str],
+        factory: Callable[[], Any]
+    ) -> Tuple[Any, Optional[float]]:
+        """Retourne (composant, durée de construction en secondes, ou None s'il était déjà construit)"""
+        key = self.make_key(kind, model, temperature, api_key)
+
+        with self._lock:
+            if key in self._instances:
+                self.hits += 1
+                return self._instances[key], None
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # Un autre thread a pu terminer la construction pendant l'attente du verrou
+            with self._lock:
+                if key in self._instances:
+                    self.hits += 1
+                    return self._instances[key], None
+
+            start = time.perf_counter()
+            instance = factory()
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._instances[key] = instance
+                self._build_seconds[key] = elapsed
+                self.misses += 1
+            return instance, elapsed
+
+    def invalidate(self, kind: Optional[str] = None):
+        """Oublie les composants d'un type (ou tous) pour forcer leur reconstruction"""
+        with self._lock:
+            for key in [key for key in self._instances if kind is None or key[0] == kind]:
+                del self._instances[key]
+                self._build_seconds.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Composants construits et temps de démarrage à froid de chacun"""
+        with self._lock:
+            return {
+                "components": len(self._instances),
+                "hits": self.hits,
+                "misses": self.misses,
+                "cold_start_seconds": {
+                    f"{kind}:{model}:{temperature}": round(seconds, 3)
+                    for (kind, model, temperature, _), seconds in self._build_seconds.items()
+                }
+            }
+
+
+_default_registry: Optional[ComponentRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_component_registry() -> ComponentRegistry:
+    """Retourne le registre de composants partagé par le processus"""
+    global _default_registry
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = ComponentRegistry()
+        return _default_registry
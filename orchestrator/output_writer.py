@@ -0,0 +1,140 @@
+import gzip
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+# Extension ajoutée au nom du fichier JSON selon la compression
+COMPRESSION_SUFFIXES = {
+    "none": "",
+    "gzip": ".gz",
+    "zstd": ".zst"
+}
+
+
+def _zstd():
+    """Module zstandard (dépendance optionnelle)"""
+    import zstandard
+    return zstandard
+
+
+def resolve_compression(compression: Optional[str]) -> str:
+    """Normalise le mode de compression ; zstd sans le paquet `zstandard` retombe sur gzip"""
+    compression = (compression or "none").strip().lower()
+    if compression in ("", "false", "off"):
+        compression = "none"
+    if compression == "gz":
+        compression = "gzip"
+    if compression not in COMPRESSION_SUFFIXES:
+        print(f"⚠️ Compression inconnue '{compression}', sorties non compressées")
+        return "none"
+    if compression == "zstd":
+        try:
+            _zstd()
+        except ImportError:
+            print("⚠️ Paquet zstandard non installé, compression gzip utilisée")
+            return "gzip"
+    return compression
+
+
+def encode_json(data: Any, compression: str = "none") -> bytes:
+    """Sérialise en JSON compact (UTF-8) puis compresse si demandé"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    if compression == "gzip":
+        return gzip.compress(payload, compresslevel=6)
+    if compression == "zstd":
+        return _zstd().ZstdCompressor(level=3).compress(payload)
+    return payload
+
+
+def read_json_output(path: str) -> Any:
+    """Relit une sortie JSON, compressée ou non (déduit de l'extension)"""
+    with open(path, "rb") as f:
+        payload = f.read()
+    if path.endswith(".gz"):
+        payload = gzip.decompress(payload)
+    elif path.endswith(".zst"):
+        payload = _zstd().ZstdDecompressor().decompressobj().decompress(payload)
+    return json.loads(payload.decode("utf-8"))
+
+
+def find_json_output(directory: str, filename: str) -> Optional[str]:
+    """Chemin de la sortie `filename` sous l'une de ses formes (brute, .gz, .zst), la plus récente d'abord"""
+    candidates = [
+        os.path.join(directory, filename + suffix)
+        for suffix in COMPRESSION_SUFFIXES.values()
+    ]
+    existing = [path for path in candidates if os.path.exists(path)]
+    if not existing:
+        return None
+    return max(existing, key=os.path.getmtime)
+
+
+class OutputWriter:
+    """Écrit les sorties JSON dans un thread dédié, hors de la boucle d'événements
+
+    Chaque fichier est écrit dans un fichier temporaire du même dossier puis renommé
+    (os.replace) : un lecteur ne voit jamais de fichier à moitié écrit. Un seul thread
+    d'écriture garantit que les écritures successives d'un même fichier restent ordonnées.
+    Le thread est (re)créé à la première écriture suivant un `close()`.
+    """
+
+    def __init__(self, output_directory: str, compression: Optional[str] = None):
+        self.output_directory = output_directory
+        self.compression = resolve_compression(compression)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.files_written = 0
+        self.bytes_written = 0
+
+    def path_for(self, filename: str) -> str:
+        """Chemin final d'une sortie (extension de compression comprise)"""
+        return os.path.join(self.output_directory, filename + COMPRESSION_SUFFIXES[self.compression])
+
+    def _write(self, data: Any, filename: str) -> str:
+        path = self.path_for(filename)
+        payload = encode_json(data, self.compression)
+
+        os.makedirs(self.output_directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        # Une version d'un autre format laissée par une exécution précédente serait relue à tort
+        for suffix in COMPRESSION_SUFFIXES.values():
+            stale = os.path.join(self.output_directory, filename + suffix)
+            if stale != path and os.path.exists(stale):
+                os.remove(stale)
+
+        with self._lock:
+            self.files_written += 1
+            self.bytes_written += len(payload)
+        return path
+
+    def submit(self, data: Any, filename: str) -> Future:
+        """Planifie l'écriture ; le futur renvoie le chemin écrit"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="output-writer")
+            return self._executor.submit(self._write, data, filename)
+
+    def close(self):
+        """Attend la fin des écritures en cours puis arrête le thread d'écriture"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "compression": self.compression,
+                "files_written": self.files_written,
+                "bytes_written": self.bytes_written
+            }
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+# Budgets par défaut (requêtes/min, tokens/min) par modèle OpenAI
+DEFAULT_MODEL_RATE_LIMITS: Dict[str, Dict[str, int]] = {
+    "gpt-4o": {"requests_per_minute": 500, "tokens_per_minute": 30000},
+    "gpt-4o-mini": {"requests_per_minute": 500, "tokens_per_minute": 200000},
+    "gpt-3.5-turbo": {"requests_per_minute": 500, "tokens_per_minute": 200000},
+}
+
+
+class AsyncRateLimiter:
+    """Limiteur de débit à fenêtre glissante d'une minute (requêtes et tokens)
+
+    Le verrou (threading, utilisable depuis plusieurs boucles d'événements) ne protège que
+    le calcul de l'attente : l'attente elle-même se fait hors verrou, sans bloquer les
+    appels qui tiennent déjà dans le budget.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, window_seconds: float = 60.0):
+        self.requests_per_minute = max(1, int(requests_per_minute))
+        self.tokens_per_minute = max(1, int(tokens_per_minute))
+        self.window_seconds = window_seconds
+        self._events: Deque[Tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float):
+        """Retire les appels sortis de la fenêtre"""
+        while self._events and now - self._events[0][0] >= self.window_seconds:
+            _, tokens = self._events.popleft()
+            self._tokens_in_window -= tokens
+
+    async def acquire(self, tokens: int = 0) -> float:
+        """Attend qu'un appel de `tokens` tokens tienne dans les budgets; retourne le temps d'attente"""
+        # Une requête plus grosse que le budget total passe seule dans une fenêtre vide
+        tokens = min(int(tokens), self.tokens_per_minute)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._prune(now)
+
+                if (len(self._events) < self.requests_per_minute
+                        and self._tokens_in_window + tokens <= self.tokens_per_minute):
+                    self._events.append((now, tokens))
+                    self._tokens_in_window += tokens
+                    return waited
+
+                delay = max(0.05, self._events[0][0] + self.window_seconds - now)
+
+            waited += delay
+            await asyncio.sleep(delay)
+
+
+def build_rate_limiter(model: str, overrides: Optional[Dict[str, Dict[str, int]]] = None) -> AsyncRateLimiter:
+    """Crée le limiteur correspondant aux budgets d'un modèle"""
+    limits = dict(DEFAULT_MODEL_RATE_LIMITS.get(model, DEFAULT_MODEL_RATE_LIMITS["gpt-4o"]))
+    if overrides and model in overrides:
+        limits.update(overrides[model])
+    return AsyncRateLimiter(limits["requests_per_minute"], limits["tokens_per_minute"])
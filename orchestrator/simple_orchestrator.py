@@ -1,7 +1,10 @@
-import json
 import asyncio
+import random
+import time
 import uuid
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 from enum import Enum
@@ -19,6 +22,12 @@ except ImportError:
         def create_workflow_session(self, session_id: str, user_input: dict) -> bool:
             return True
         
+        def ensure_workflow_session(self, session_id: str, user_input: dict, status: str = 'pending') -> str:
+            return status
+        
+        def get_workflow_statuses(self, session_ids: list) -> dict:
+            return {}
+        
         def save_agent_analysis(self, session_id: str, analysis_data: dict) -> bool:
             return True
         
@@ -28,18 +37,43 @@ except ImportError:
         def save_scripts_data(self, session_id: str, scripts_data: dict) -> bool:
             return True
         
+        def save_script_checkpoint(self, session_id: str, script_id: str, script_info: dict) -> bool:
+            return True
+        
         def update_workflow_session(self, session_id: str, **kwargs) -> bool:
             return True
+        
+        def get_workflow_session(self, session_id: str):
+            return None
+        
+        def get_agent_analysis(self, session_id: str):
+            return None
+        
+        def get_sequencer_data(self, session_id: str) -> list:
+            return []
+        
+        def get_scripts_data(self, session_id: str) -> dict:
+            return {}
 
 # Ajouter les chemins pour importer les composants
 sys.path.append(str(Path(__file__).parent.parent / "agent"))
 sys.path.append(str(Path(__file__).parent.parent / "automations"))
 sys.path.append(str(Path(__file__).parent.parent))  # Ajouter le répertoire racine
 
+from orchestrator.rate_limiter import build_rate_limiter
+from orchestrator.component_registry import get_component_registry
+from orchestrator.output_writer import OutputWriter, find_json_output, read_json_output
+from shared.config.settings import settings
+
+# Modèle de l'agent d'analyse des objectifs (LLM_MODEL et AGENT_TEMPERATURE)
+AGENT_MODEL = settings.LLM_MODEL
+AGENT_TEMPERATURE = settings.AGENT_TEMPERATURE
+
 class WorkflowStatus(Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
+    PARTIAL = "partial"  # Scripts manquants : à compléter par resume_workflow
     FAILED = "failed"
 
 @dataclass
@@ -56,53 +90,138 @@ class SimpleWorkflowState:
     execution_log: List[str] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    completed_stages: List[str] = None  # Étapes terminées (points de reprise)
+    output_files: Dict[str, str] = None  # Étape -> fichier de sortie déjà écrit
     
     def __post_init__(self):
         if self.execution_log is None:
             self.execution_log = []
+        if self.completed_stages is None:
+            self.completed_stages = []
+        if self.output_files is None:
+            self.output_files = {}
         if self.start_time is None:
             self.start_time = datetime.now()
 
 class SimpleEducationalOrchestrator:
     """Orchestrateur simplifié pour l'IA éducative"""
     
-    def __init__(self, openai_api_key: str, output_directory: str = "./outputs", db_path: str = "educational_platform.db"):
+    # Étape -> (préfixe du fichier de sortie, attribut de l'état)
+    STAGE_OUTPUTS = {
+        "agent_analysis": ("agent_analysis", "agent_analysis"),
+        "sequencer": ("sequencer", "sequencer_data"),
+        "scripts": ("scripts", "scripts_data")
+    }
+    
+    def __init__(
+        self,
+        openai_api_key: str,
+        output_directory: str = "./outputs",
+        db_path: str = "educational_platform.db",
+        max_script_workers: Optional[int] = None,
+        script_max_retries: Optional[int] = None,
+        rate_limits: Optional[Dict[str, Dict[str, int]]] = None,
+        stream_sequencer: Optional[bool] = None,
+        output_compression: Optional[str] = None
+    ):
         self.openai_api_key = openai_api_key
         self.output_directory = output_directory
         os.makedirs(output_directory, exist_ok=True)
         
+        # Écriture des sorties en arrière-plan (JSON compact, compression gzip/zstd optionnelle)
+        self.output_writer = OutputWriter(
+            output_directory,
+            output_compression if output_compression is not None else os.getenv("OUTPUT_COMPRESSION", "none")
+        )
+        
+        # Génération concurrente des scripts
+        self.max_script_workers = max_script_workers or int(os.getenv("SCRIPT_MAX_CONCURRENCY", 5))
+        self.script_max_retries = script_max_retries or int(os.getenv("SCRIPT_MAX_RETRIES", 3))
+        self.script_retry_base_delay = float(os.getenv("SCRIPT_RETRY_BASE_DELAY", 2.0))
+        self.rate_limits = rate_limits
+        
+        # Séquenceur en flux : les scripts démarrent dès le premier écran reçu
+        if stream_sequencer is None:
+            stream_sequencer = os.getenv("SEQUENCER_STREAMING", "true").lower() == "true"
+        self.stream_sequencer = stream_sequencer
+        
         # 🗄️ INITIALISER LA BASE DE DONNÉES
         self.db_manager = DatabaseManager(db_path)
         
-        # Composants
-        self.agent = None
+        # Composants partagés (sans état de session) ; l'agent est construit pour chaque workflow
+        self.agent_llm = None
+        self.document_processor = None
         self.sequencer = None
         self.script_generator = None
         
         print("🚀 Orchestrateur avec base de données initialisé")
     
     async def initialize_components(self, state: SimpleWorkflowState) -> SimpleWorkflowState:
-        """Initialise les composants"""
+        """Récupère les composants depuis le registre partagé (construits une seule fois par processus)"""
         try:
-            state.execution_log.append("🔧 Initialisation des composants...")
             state.current_step = 1
             
-            # Initialiser l'agent
-            from enhanced_agent import EnhancedLearningObjectiveAgent
-            self.agent = EnhancedLearningObjectiveAgent(
-                api_key=self.openai_api_key,
-                model="gpt-4o-mini",
-                temperature=0.2,
-                verbose=True
+            # Démarrage à chaud : composants déjà attachés à cet orchestrateur
+            if self.agent_llm and self.document_processor and self.sequencer and self.script_generator:
+                state.execution_log.append("♻️ Composants réutilisés (démarrage à chaud)")
+                return state
+            
+            state.execution_log.append("🔧 Initialisation des composants...")
+            registry = get_component_registry()
+            
+            def build_agent_llm():
+                from langchain_openai import ChatOpenAI
+                return ChatOpenAI(openai_api_key=self.openai_api_key, model=AGENT_MODEL, temperature=AGENT_TEMPERATURE)
+            
+            def build_document_processor():
+                from enhanced_agent import DocumentProcessor
+                # Les embeddings utilisent la clé de cet orchestrateur, qui fait partie de la clé du registre
+                return DocumentProcessor(openai_api_key=self.openai_api_key)
+            
+            def build_openai_client():
+                from openai import OpenAI
+                return OpenAI(api_key=self.openai_api_key)
+            
+            # Le client OpenAI (et son pool de connexions) est partagé par le séquenceur et les scripts
+            client, client_seconds = await asyncio.to_thread(
+                registry.get_or_create, "openai_client", None, None, self.openai_api_key, build_openai_client
             )
             
-            # Initialiser le séquenceur
-            from sequencer.pedagogical_sequencer_v2 import PedagogicalSequencerV2
-            self.sequencer = PedagogicalSequencerV2(api_key=self.openai_api_key)
+            def build_sequencer():
+                from sequencer.pedagogical_sequencer_v2 import PedagogicalSequencerV2
+                return PedagogicalSequencerV2(api_key=self.openai_api_key, client=client)
+            
+            def build_script_generator():
+                from scripts.script_generator import ScriptGenerator
+                return ScriptGenerator(api_key=self.openai_api_key, client=client)
+            
+            # Construction en parallèle hors de la boucle d'événements
+            (
+                (self.agent_llm, llm_seconds),
+                (self.document_processor, documents_seconds),
+                (self.sequencer, sequencer_seconds),
+                (self.script_generator, scripts_seconds)
+            ) = await asyncio.gather(
+                asyncio.to_thread(registry.get_or_create, "agent_llm", AGENT_MODEL, AGENT_TEMPERATURE, self.openai_api_key, build_agent_llm),
+                asyncio.to_thread(registry.get_or_create, "document_processor", None, None, self.openai_api_key, build_document_processor),
+                asyncio.to_thread(registry.get_or_create, "sequencer", "gpt-4o-mini", 0.7, self.openai_api_key, build_sequencer),
+                asyncio.to_thread(registry.get_or_create, "script_generator", "gpt-4o", 0.7, self.openai_api_key, build_script_generator)
+            )
             
-            # Initialiser le générateur de scripts
-            from scripts.script_generator import ScriptGenerator
-            self.script_generator = ScriptGenerator(api_key=self.openai_api_key)
+            cold_starts = {
+                name: seconds for name, seconds in (
+                    ("client OpenAI", client_seconds),
+                    ("LLM de l'agent", llm_seconds),
+                    ("processeur de documents", documents_seconds),
+                    ("séquenceur", sequencer_seconds),
+                    ("générateur de scripts", scripts_seconds)
+                ) if seconds is not None
+            }
+            if cold_starts:
+                details = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in cold_starts.items())
+                state.execution_log.append(f"🧊 Démarrage à froid ({sum(cold_starts.values()):.2f}s cumulées) : {details}")
+            else:
+                state.execution_log.append("♻️ Composants du registre réutilisés (démarrage à chaud)")
             
             state.execution_log.append("✅ Tous les composants initialisés")
             
@@ -113,6 +232,22 @@ class SimpleEducationalOrchestrator:
         
         return state
     
+    def create_agent(self):
+        """Construit un agent neuf pour un workflow à partir des composants partagés
+        
+        L'agent garde l'état de sa session (documents traités, objectifs extraits) :
+        il n'est jamais partagé entre workflows concurrents.
+        """
+        from enhanced_agent import EnhancedLearningObjectiveAgent
+        return EnhancedLearningObjectiveAgent(
+            api_key=self.openai_api_key,
+            model=AGENT_MODEL,
+            temperature=AGENT_TEMPERATURE,
+            verbose=True,
+            llm=self.agent_llm,
+            doc_processor=self.document_processor
+        )
+    
     async def run_agent_analysis(self, state: SimpleWorkflowState) -> SimpleWorkflowState:
         """Exécute l'analyse avec l'agent"""
         try:
@@ -134,15 +269,14 @@ class SimpleEducationalOrchestrator:
             
             content = "\n".join(content_parts)
             
-            # Exécution de l'analyse
-            analysis_results = self.agent.process_content_with_documents(content)
+            # Exécution de l'analyse (non bloquante pour la boucle d'événements)
+            agent = await asyncio.to_thread(self.create_agent)
+            analysis_results = await agent.aprocess_content_with_documents(content)
             state.agent_analysis = analysis_results
+            state.completed_stages.append("agent_analysis")
             
             # Sauvegarde
-            await self.save_json_output(
-                analysis_results, 
-                f"agent_analysis_{state.session_id[:8]}.json"
-            )
+            await self.save_stage_output(state, "agent_analysis")
             
             state.execution_log.append("✅ Analyse terminée")
             
@@ -162,17 +296,18 @@ class SimpleEducationalOrchestrator:
             if not state.agent_analysis:
                 raise ValueError("Résultats d'analyse manquants")
             
-            sequencer_data = self.sequencer.generate_sequencer(state.agent_analysis)
+            # Appel bloquant exécuté hors de la boucle d'événements (workflows concurrents)
+            sequencer_data = await asyncio.to_thread(
+                self.sequencer.generate_sequencer, state.agent_analysis, self._regenerate(state)
+            )
             
             if not sequencer_data:
                 raise ValueError("Échec de la génération du séquenceur")
             
             state.sequencer_data = sequencer_data
+            state.completed_stages.append("sequencer")
             
-            await self.save_json_output(
-                sequencer_data,
-                f"sequencer_{state.session_id[:8]}.json"
-            )
+            await self.save_stage_output(state, "sequencer")
             
             state.execution_log.append(f"✅ Séquenceur généré ({len(sequencer_data)} activités)")
             
@@ -185,8 +320,112 @@ class SimpleEducationalOrchestrator:
     
 
     
+    def _get_rate_limiter(self, model: str):
+        """Retourne le limiteur de débit d'un modèle, partagé par tous les orchestrateurs du processus
+        
+        Les budgets sont ceux de la clé API : le premier orchestrateur à créer le limiteur fixe ses limites.
+        """
+        limiter, _ = get_component_registry().get_or_create(
+            "rate_limiter", model, None, self.openai_api_key,
+            lambda: build_rate_limiter(model, self.rate_limits)
+        )
+        return limiter
+    
+    @staticmethod
+    def _regenerate(state: SimpleWorkflowState) -> bool:
+        """Régénération demandée (user_input["regenerate"]) : les réponses LLM en cache sont remplacées"""
+        return bool(state.user_input.get("regenerate"))
+    
+    @staticmethod
+    def _script_id(i: int, activity: Dict[str, Any]) -> str:
+        """Identifiant du script d'une activité selon la structure demandée"""
+        num_ecran = activity.get('num_ecran', f"{i+1:02d}")
+        sequence = activity.get('sequence', f"Seq{i+1}")
+        return f"{num_ecran}-{sequence}_{activity.get('type_activite', 'text')}"
+    
+    def _format_script_entry(self, i: int, activity: Dict[str, Any], script_content: str) -> tuple:
+        """Construit l'identifiant et l'entrée de script selon la structure demandée"""
+        activity_type = activity.get('type_activite', 'text')
+        sequence = activity.get('sequence', f"Seq{i+1}")
+        script_id = self._script_id(i, activity)
+        
+        # Formater l'activité selon la structure demandée
+        formatted_activity = {
+            "sequence": activity.get('sequence', f"Séquence {i+1}"),
+            "num_ecran": activity.get('num_ecran', f"{i+1:02d}-{sequence}"),
+            "titre_ecran": activity.get('titre_ecran', f"Écran {i+1}"),
+            "sous_titre": activity.get('sous_titre', ""),
+            "resume_contenu": activity.get('resume_contenu', ""),
+            "type_activite": activity_type,
+            "niveau_bloom": activity.get('niveau_bloom', 'Comprendre'),
+            "difficulte": activity.get('difficulte', 'facile'),
+            "duree_estimee": activity.get('duree_estimee', 10),
+            "objectif_lie": activity.get('objectif_lie', ""),
+            "commentaire": activity.get('commentaire', "")
+        }
+        
+        return script_id, {
+            'activite': formatted_activity,
+            'script': script_content,
+            'generated_at': datetime.now().isoformat()
+        }
+    
+    async def _generate_activity_script(
+        self,
+        i: int,
+        activity: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        executor: ThreadPoolExecutor,
+        regenerate: bool = False
+    ) -> Dict[str, Any]:
+        """Génère le script d'une activité avec limitation de débit et reprise exponentielle"""
+        activity_type = activity.get('type_activite', 'text')
+        limiter = self._get_rate_limiter(self.script_generator.model)
+        estimated_tokens = self.script_generator.estimate_request_tokens(activity, activity_type)
+        
+        async with semaphore:
+            start = time.perf_counter()
+            for attempt in range(1, self.script_max_retries + 1):
+                await limiter.acquire(estimated_tokens)
+                try:
+                    script_content = await asyncio.get_running_loop().run_in_executor(
+                        executor,
+                        partial(self.script_generator.generate_script, activity, activity_type, True, regenerate)
+                    )
+                    return {
+                        "script": script_content,
+                        "latency": time.perf_counter() - start,
+                        "attempts": attempt
+                    }
+                except Exception as e:
+                    if attempt == self.script_max_retries:
+                        return {
+                            "error": e,
+                            "latency": time.perf_counter() - start,
+                            "attempts": attempt
+                        }
+                    delay = self.script_retry_base_delay * (2 ** (attempt - 1))
+                    await asyncio.sleep(delay + random.uniform(0, self.script_retry_base_delay))
+    
+    async def _generate_and_checkpoint_script(
+        self,
+        state: SimpleWorkflowState,
+        i: int,
+        activity: Dict[str, Any],
+        semaphore: asyncio.Semaphore,
+        executor: ThreadPoolExecutor
+    ) -> Dict[str, Any]:
+        """Génère le script d'une activité et l'enregistre en base dès qu'il est prêt"""
+        outcome = await self._generate_activity_script(i, activity, semaphore, executor, self._regenerate(state))
+        if "error" not in outcome:
+            outcome["script_id"], outcome["entry"] = self._format_script_entry(i, activity, outcome["script"])
+            await asyncio.to_thread(
+                self.db_manager.save_script_checkpoint, state.session_id, outcome["script_id"], outcome["entry"]
+            )
+        return outcome
+    
     async def generate_scripts(self, state: SimpleWorkflowState) -> SimpleWorkflowState:
-        """Génère les scripts"""
+        """Génère en parallèle les scripts manquants avec un nombre borné de requêtes simultanées"""
         try:
             state.execution_log.append("📝 Génération des scripts...")
             state.current_step = 4
@@ -194,52 +433,140 @@ class SimpleEducationalOrchestrator:
             if not state.sequencer_data:
                 raise ValueError("Données séquenceur manquantes")
             
-            scripts = {}
+            # Les scripts déjà générés (reprise) ne sont pas redemandés
+            existing = state.scripts_data or {}
+            pending = [
+                (i, activity) for i, activity in enumerate(state.sequencer_data)
+                if self._script_id(i, activity) not in existing
+            ]
+            if existing:
+                state.execution_log.append(
+                    f"♻️ {len(state.sequencer_data) - len(pending)} scripts repris, {len(pending)} à générer"
+                )
             
-            for i, activity in enumerate(state.sequencer_data):
-                try:
-                    activity_type = activity.get('type_activite', 'text')
-                    script_content = self.script_generator.generate_script(activity, activity_type)
-                    
-                    # Formater l'ID selon la structure demandée
-                    num_ecran = activity.get('num_ecran', f"{i+1:02d}")
-                    sequence = activity.get('sequence', f"Seq{i+1}")
-                    script_id = f"{num_ecran}-{sequence}_{activity_type}"
-                    
-                    # Formater l'activité selon la structure demandée
-                    formatted_activity = {
-                        "sequence": activity.get('sequence', f"Séquence {i+1}"),
-                        "num_ecran": activity.get('num_ecran', f"{i+1:02d}-{sequence}"),
-                        "titre_ecran": activity.get('titre_ecran', f"Écran {i+1}"),
-                        "sous_titre": activity.get('sous_titre', ""),
-                        "resume_contenu": activity.get('resume_contenu', ""),
-                        "type_activite": activity_type,
-                        "niveau_bloom": activity.get('niveau_bloom', 'Comprendre'),
-                        "difficulte": activity.get('difficulte', 'facile'),
-                        "duree_estimee": activity.get('duree_estimee', 10),
-                        "objectif_lie": activity.get('objectif_lie', ""),
-                        "commentaire": activity.get('commentaire', "")
-                    }
-                    
-                    scripts[script_id] = {
-                        'activite': formatted_activity,
-                        'script': script_content,
-                        'generated_at': datetime.now().isoformat()
-                    }
-                    
-                except Exception as script_error:
-                    state.execution_log.append(f"⚠️ Erreur script {i+1}: {script_error}")
-                    continue
+            semaphore = asyncio.Semaphore(self.max_script_workers)
+            with ThreadPoolExecutor(max_workers=self.max_script_workers) as executor:
+                outcomes = await asyncio.gather(*[
+                    self._generate_and_checkpoint_script(state, i, activity, semaphore, executor)
+                    for i, activity in pending
+                ])
             
-            state.scripts_data = scripts
+            await self._collect_scripts(state, pending, outcomes, existing)
             
-            # Sauvegarder localement
-            await self.save_json_output(
-                scripts,
-                f"scripts_{state.session_id[:8]}.json"
+        except Exception as e:
+            state.status = WorkflowStatus.FAILED
+            state.error_message = f"Erreur scripts : {str(e)}"
+            state.execution_log.append(f"❌ Erreur : {e}")
+        
+        return state
+    
+    async def _collect_scripts(
+        self,
+        state: SimpleWorkflowState,
+        pending: List[tuple],
+        outcomes: List[Dict[str, Any]],
+        existing: Dict[str, Any]
+    ):
+        """Assemble les scripts générés et repris dans l'ordre du séquenceur puis les sauvegarde"""
+        generated = {}
+        for (i, activity), outcome in zip(pending, outcomes):
+            if "error" in outcome:
+                state.execution_log.append(
+                    f"⚠️ Erreur script {i+1} après {outcome['attempts']} tentative(s): {outcome['error']}"
+                )
+                continue
+            
+            generated[outcome["script_id"]] = outcome["entry"]
+            state.execution_log.append(
+                f"⏱️ Script {i+1} ({outcome['script_id']}) : {outcome['latency']:.1f}s, {outcome['attempts']} tentative(s)"
             )
+        
+        # Assemblage dans l'ordre du séquenceur pour des clés déterministes
+        scripts = {}
+        for i, activity in enumerate(state.sequencer_data):
+            script_id = self._script_id(i, activity)
+            if script_id in generated:
+                scripts[script_id] = generated[script_id]
+            elif script_id in existing:
+                scripts[script_id] = existing[script_id]
+        
+        state.scripts_data = scripts
+        expected = len({self._script_id(i, activity) for i, activity in enumerate(state.sequencer_data)})
+        if len(scripts) == expected:
+            state.completed_stages.append("scripts")
+        else:
+            # Session non terminée : une reprise ne génère que les scripts manquants
+            state.status = WorkflowStatus.PARTIAL
+            state.error_message = f"{expected - len(scripts)} script(s) manquant(s) sur {expected}"
+            state.execution_log.append(f"⚠️ {state.error_message}")
+        
+        # Sauvegarder localement
+        await self.save_stage_output(state, "scripts")
+        
+        state.execution_log.append(f"✅ {len(scripts)} scripts générés")
+    
+    async def generate_sequencer_streaming(self, state: SimpleWorkflowState) -> SimpleWorkflowState:
+        """Génère le séquenceur en flux et lance le script de chaque écran dès qu'il est reçu"""
+        try:
+            state.execution_log.append("📚 Génération du séquenceur (flux) et des scripts...")
+            state.current_step = 3
+            
+            if not state.agent_analysis:
+                raise ValueError("Résultats d'analyse manquants")
             
-            state.execution_log.append(f"✅ {len(scripts)} scripts générés")
+            loop = asyncio.get_running_loop()
+            queue: asyncio.Queue = asyncio.Queue()
+            
+            def produce():
+                # Le flux OpenAI est synchrone : il est consommé dans un thread et relayé à la boucle
+                try:
+                    for activity in self.sequencer.iter_sequencer(state.agent_analysis, self._regenerate(state)):
+                        loop.call_soon_threadsafe(queue.put_nowait, activity)
+                finally:
+                    loop.call_soon_threadsafe(queue.put_nowait, None)
+            
+            start = time.perf_counter()
+            producer = asyncio.ensure_future(asyncio.to_thread(produce))
+            activities: List[Dict[str, Any]] = []
+            tasks: List[asyncio.Task] = []
+            
+            semaphore = asyncio.Semaphore(self.max_script_workers)
+            with ThreadPoolExecutor(max_workers=self.max_script_workers) as executor:
+                while True:
+                    activity = await queue.get()
+                    if activity is None:
+                        break
+                    if not activities:
+                        state.execution_log.append(f"⚡ Premier écran reçu après {time.perf_counter() - start:.1f}s")
+                    tasks.append(asyncio.ensure_future(self._generate_and_checkpoint_script(
+                        state, len(activities), activity, semaphore, executor
+                    )))
+                    activities.append(activity)
+                
+                try:
+                    await producer
+                    if not activities:
+                        raise ValueError("Échec de la génération du séquenceur")
+                except Exception as e:
+                    for task in tasks:
+                        task.cancel()
+                    await asyncio.gather(*tasks, return_exceptions=True)
+                    state.status = WorkflowStatus.FAILED
+                    state.error_message = f"Erreur séquenceur : {str(e)}"
+                    state.execution_log.append(f"❌ Erreur : {e}")
+                    return state
+                
+                state.sequencer_data = activities
+                state.completed_stages.append("sequencer")
+                state.execution_log.append(
+                    f"✅ Séquenceur généré ({len(activities)} activités) en {time.perf_counter() - start:.1f}s"
+                )
+                await self.save_stage_output(state, "sequencer")
+                
+                state.current_step = 4
+                outcomes = await asyncio.gather(*tasks)
+            
+            await self._collect_scripts(state, list(enumerate(activities)), outcomes, {})
             
         except Exception as e:
             state.status = WorkflowStatus.FAILED
@@ -255,6 +582,12 @@ class SimpleEducationalOrchestrator:
             state.current_step = 5
             state.end_time = datetime.now()
             
+            # Les étapes reprises depuis la base n'ont pas encore de fichier de sortie
+            for stage, (_, attribute) in self.STAGE_OUTPUTS.items():
+                if getattr(state, attribute) is not None and stage not in state.output_files:
+                    await self.save_stage_output(state, stage)
+            
+            # Le résultat final référence les fichiers des étapes au lieu de les recopier
             final_results = {
                 "workflow_metadata": {
                     "session_id": state.session_id,
@@ -265,9 +598,9 @@ class SimpleEducationalOrchestrator:
                     "status": "completed"
                 },
                 "user_input": state.user_input,
-                "agent_analysis": state.agent_analysis,
-                "sequencer_data": state.sequencer_data,
-                "scripts_data": state.scripts_data,
+                "stage_files": {
+                    stage: os.path.basename(path) for stage, path in state.output_files.items()
+                },
                 "execution_log": state.execution_log,
                 "statistics": {
                     "objectives_analyzed": len(state.agent_analysis.get("objectives", [])) if state.agent_analysis else 0,
@@ -291,29 +624,79 @@ class SimpleEducationalOrchestrator:
         
         return state
     
-    async def save_json_output(self, data: Dict[str, Any], filename: str):
-        """Sauvegarde JSON"""
+    async def save_json_output(self, data: Any, filename: str) -> Optional[str]:
+        """Sauvegarde JSON en arrière-plan (écriture atomique) et retourne le chemin écrit"""
         try:
-            filepath = os.path.join(self.output_directory, filename)
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            filepath = await asyncio.wrap_future(self.output_writer.submit(data, filename))
             print(f"📁 Sauvegardé : {filepath}")
+            return filepath
         except Exception as e:
             print(f"⚠️ Erreur sauvegarde {filename}: {e}")
+            return None
     
-    async def run_complete_workflow(self, user_input: Dict[str, Any], session_id: str = None) -> SimpleWorkflowState:
-        """Exécute le workflow complet avec sauvegarde en base"""
-        if not session_id:
-            session_id = str(uuid.uuid4())
+    def _stage_filename(self, stage: str, session_id: str) -> str:
+        return f"{self.STAGE_OUTPUTS[stage][0]}_{session_id[:8]}.json"
+    
+    async def save_stage_output(self, state: SimpleWorkflowState, stage: str):
+        """Sauvegarde la sortie d'une étape et mémorise son fichier dans l'état"""
+        data = getattr(state, self.STAGE_OUTPUTS[stage][1])
+        filepath = await self.save_json_output(data, self._stage_filename(stage, state.session_id))
+        if filepath:
+            state.output_files[stage] = filepath
+    
+    def _load_stage_output(self, state: SimpleWorkflowState, stage: str) -> Optional[Any]:
+        """Relit la sortie d'une étape déjà écrite, compressée ou non (None si absente ou illisible)"""
+        filename = self._stage_filename(stage, state.session_id)
+        filepath = find_json_output(self.output_directory, filename)
+        if not filepath:
+            return None
+        try:
+            data = read_json_output(filepath)
+        except Exception as e:
+            print(f"⚠️ Erreur lecture {filename}: {e}")
+            return None
+        state.output_files[stage] = filepath
+        return data
+    
+    def load_checkpoints(self, state: SimpleWorkflowState) -> SimpleWorkflowState:
+        """Recharge les étapes déjà produites pour la session (sorties JSON, sinon base de données)"""
+        analysis = self._load_stage_output(state, "agent_analysis") or self.db_manager.get_agent_analysis(state.session_id)
+        if analysis:
+            state.agent_analysis = analysis
+            state.completed_stages.append("agent_analysis")
+            state.execution_log.append("♻️ Analyse reprise")
         
-        print(f"🚀 Workflow avec DB - Session: {session_id[:8]}")
+        # Le séquenceur n'est réutilisable que si l'analyse dont il dépend l'est aussi
+        sequencer_data = None
+        if state.agent_analysis:
+            sequencer_data = self._load_stage_output(state, "sequencer") or self.db_manager.get_sequencer_data(state.session_id)
+        if not sequencer_data:
+            return state
         
-        # 🗄️ CRÉER LA SESSION EN BASE
-        self.db_manager.create_workflow_session(session_id, user_input)
+        state.sequencer_data = sequencer_data
+        state.completed_stages.append("sequencer")
+        state.execution_log.append(f"♻️ Séquenceur repris ({len(sequencer_data)} activités)")
         
-        state = SimpleWorkflowState(
-            user_input=user_input,
-            session_id=session_id
+        # Scripts : points de reprise en base (un par script), complétés par la sortie JSON
+        scripts = self._load_stage_output(state, "scripts") or {}
+        scripts.update(self.db_manager.get_scripts_data(state.session_id))
+        if scripts:
+            state.scripts_data = scripts
+        
+        return state
+    
+    async def _run_stages(self, state: SimpleWorkflowState) -> SimpleWorkflowState:
+        """Exécute les étapes non terminées du workflow et met à jour la session en base"""
+        session_id = state.session_id
+        
+        # 🗄️ CRÉER LA SESSION EN BASE (ou la reprendre si elle existe déjà)
+        self.db_manager.ensure_workflow_session(session_id, state.user_input, status='in_progress')
+        self.db_manager.update_workflow_session(
+            session_id,
+            status='in_progress',
+            start_time=state.start_time,
+            end_time=None,
+            error_message=None
         )
         
         try:
@@ -321,25 +704,30 @@ class SimpleEducationalOrchestrator:
             if state.status != WorkflowStatus.FAILED:
                 state = await self.initialize_components(state)
             
-            if state.status != WorkflowStatus.FAILED:
+            if state.status != WorkflowStatus.FAILED and "agent_analysis" not in state.completed_stages:
                 state = await self.run_agent_analysis(state)
                 # 🗄️ SAUVEGARDER L'ANALYSE EN BASE
                 if state.agent_analysis:
                     self.db_manager.save_agent_analysis(session_id, state.agent_analysis)
             
-            if state.status != WorkflowStatus.FAILED:
-                state = await self.generate_sequencer(state)
+            if state.status != WorkflowStatus.FAILED and "sequencer" not in state.completed_stages:
+                # En mode flux, les scripts sont générés pendant la réception du séquenceur
+                if self.stream_sequencer and hasattr(self.sequencer, "iter_sequencer"):
+                    state = await self.generate_sequencer_streaming(state)
+                else:
+                    state = await self.generate_sequencer(state)
                 # 🗄️ SAUVEGARDER LE SÉQUENCEUR EN BASE
                 if state.sequencer_data:
                     self.db_manager.save_sequencer_data(session_id, state.sequencer_data)
             
-            if state.status != WorkflowStatus.FAILED:
+            if state.status != WorkflowStatus.FAILED and "scripts" not in state.completed_stages:
                 state = await self.generate_scripts(state)
-                # 🗄️ SAUVEGARDER LES SCRIPTS EN BASE
-                if state.scripts_data:
-                    self.db_manager.save_scripts_data(session_id, state.scripts_data)
             
-            if state.status != WorkflowStatus.FAILED:
+            # 🗄️ SAUVEGARDER LES SCRIPTS EN BASE
+            if state.status != WorkflowStatus.FAILED and state.scripts_data:
+                self.db_manager.save_scripts_data(session_id, state.scripts_data)
+            
+            if state.status != WorkflowStatus.FAILED and "scripts" in state.completed_stages:
                 state = await self.finalize_workflow(state)
             
             # 🗄️ METTRE À JOUR LE STATUT EN BASE
@@ -353,6 +741,15 @@ class SimpleEducationalOrchestrator:
                 )
                 print(f"🎉 Workflow terminé et sauvegardé!")
                 print(f"📊 Durée: {(state.end_time - state.start_time).total_seconds():.1f}s")
+            elif state.status == WorkflowStatus.PARTIAL:
+                self.db_manager.update_workflow_session(
+                    session_id,
+                    status='partial',
+                    end_time=datetime.now(),
+                    error_message=state.error_message,
+                    execution_log=state.execution_log
+                )
+                print(f"⚠️ Workflow partiel sauvegardé ({state.error_message})")
             else:
                 self.db_manager.update_workflow_session(
                     session_id,
@@ -379,6 +776,51 @@ class SimpleEducationalOrchestrator:
             state.error_message = f"Erreur critique: {str(e)}"
             state.end_time = datetime.now()
             return state
+    
+    async def run_complete_workflow(self, user_input: Dict[str, Any], session_id: str = None) -> SimpleWorkflowState:
+        """Exécute le workflow complet avec sauvegarde en base"""
+        if not session_id:
+            session_id = str(uuid.uuid4())
+        
+        print(f"🚀 Workflow avec DB - Session: {session_id[:8]}")
+        
+        state = SimpleWorkflowState(
+            user_input=user_input,
+            session_id=session_id
+        )
+        return await self._run_stages(state)
+    
+    async def resume_workflow(self, session_id: str, user_input: Optional[Dict[str, Any]] = None) -> SimpleWorkflowState:
+        """Reprend un workflow interrompu : les étapes terminées sont rechargées, seuls les scripts manquants sont générés"""
+        print(f"🔁 Reprise du workflow - Session: {session_id[:8]}")
+        
+        if user_input is None:
+            session = self.db_manager.get_workflow_session(session_id)
+            user_input = (session or {}).get('user_input') or {}
+        
+        state = self.load_checkpoints(SimpleWorkflowState(
+            user_input=user_input,
+            session_id=session_id
+        ))
+        
+        if "agent_analysis" not in state.completed_stages and not user_input.get("course_subject"):
+            state.status = WorkflowStatus.FAILED
+            state.error_message = "Aucun point de reprise ni données de cours pour cette session"
+            state.end_time = datetime.now()
+            print(f"❌ {state.error_message}")
+            return state
+        
+        return await self._run_stages(state)
+    
+    async def close(self):
+        """Attend la fin des écritures de sorties en attente (l'orchestrateur reste réutilisable)"""
+        await asyncio.to_thread(self.output_writer.close)
+    
+    async def __aenter__(self) -> "SimpleEducationalOrchestrator":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
 
 # Fonctions utilitaires compatibles
 def create_educational_orchestrator(openai_api_key: str, output_directory: str = "./outputs", db_path: str = "educational_platform.db") -> SimpleEducationalOrchestrator:
@@ -401,4 +843,6 @@ async def run_educational_pipeline(
     if uploaded_files:
         user_input["uploaded_files"] = uploaded_files
     
-    return await orchestrator.run_complete_workflow(user_input, session_id)
\ No newline at end of file
+    # La boucle d'événements de l'appelant peut être fermée juste après : les sorties sont écrites avant
+    async with orchestrator:
+        return await orchestrator.run_complete_workflow(user_input, session_id)
\ No newline at end of file
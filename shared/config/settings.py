@@ -27,6 +27,9 @@ class Settings:
     AGENT_TEMPERATURE = float(os.getenv('AGENT_TEMPERATURE', 0.2))
     SEQUENCER_TEMPERATURE = float(os.getenv('SEQUENCER_TEMPERATURE', 0.7))
     
+    # Mode lot (batch_runner.py) : workflows simultanés
+    BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', 3))
+    
     # Interface
     STREAMLIT_PORT = int(os.getenv('STREAMLIT_PORT', 8501))
     
@@ -0,0 +1,188 @@
+import re
+import time
+import unicodedata
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Une ligne « Libellé : valeur », tolérante au Markdown (puces, numéros, gras) produit par les LLM
+_FIELD_LINE = re.compile(
+    r"^[ \t>#*\-\d.)]*\**[ \t]*(?P<label>[A-Za-zÀ-ÿ' ]{2,40}?)[ \t]*\**[ \t]*:[ \t]*\**[ \t]*(?P<value>.*?)[ \t*]*$",
+    re.MULTILINE
+)
+
+# Libellés reconnus dans une classification de Bloom -> champ du tableau
+CLASSIFICATION_FIELDS = {
+    "verbe principal": "verb",
+    "verbe": "verb",
+    "niveau de bloom": "level",
+    "niveau bloom": "level",
+    "justification": "justification"
+}
+
+UNCLASSIFIED = "non classifié"
+
+
+def normalize_objective(text: str) -> str:
+    """Clé de rapprochement d'un objectif (NFC, minuscules, sans ponctuation de mise en forme)"""
+    text = unicodedata.normalize("NFC", text).lower().strip(" \t*-_.:\"'«»")
+    return " ".join(text.split())
+
+
+def iter_objective_blocks(text: str) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Parcourt le texte en un seul passage et produit (objectif, {libellé en minuscules: valeur})
+
+    Chaque ligne « Objectif: » ouvre un nouveau bloc; les lignes « Libellé: valeur » suivantes
+    lui sont rattachées. Les séparateurs (« --- », lignes vides, numérotation) sont ignorés.
+    """
+    objective = None
+    fields: Dict[str, str] = {}
+    for match in _FIELD_LINE.finditer(text):
+        label = match.group("label").strip().lower()
+        if label == "objectif":
+            if objective:
+                yield objective, fields
+            objective, fields = match.group("value"), {}
+        elif objective is not None:
+            fields.setdefault(label, match.group("value"))
+    if objective:
+        yield objective, fields
+
+
+@dataclass
+class ClassifiedObjective:
+    """Un objectif classifié selon la taxonomie de Bloom"""
+    objective: str
+    verb: str = ""
+    level: str = UNCLASSIFIED
+    justification: str = ""
+    position: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class ClassificationTable:
+    """Tableau des objectifs classifiés, ordonné et indexé par objectif"""
+
+    def __init__(self, entries: Optional[List[ClassifiedObjective]] = None):
+        self.entries: List[ClassifiedObjective] = []
+        self._by_objective: Dict[str, ClassifiedObjective] = {}
+        for entry in entries or []:
+            self.add(entry)
+
+    def add(self, entry: ClassifiedObjective):
+        entry.position = len(self.entries)
+        self.entries.append(entry)
+        self._by_objective.setdefault(normalize_objective(entry.objective), entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __iter__(self) -> Iterator[ClassifiedObjective]:
+        return iter(self.entries)
+
+    def get(self, objective: str) -> Optional[ClassifiedObjective]:
+        """Retrouve un objectif par son texte (comparaison normalisée)"""
+        return self._by_objective.get(normalize_objective(objective))
+
+    def level_of(self, objective: str) -> str:
+        entry = self.get(objective)
+        return entry.level if entry else UNCLASSIFIED
+
+    def levels(self) -> List[str]:
+        """Niveaux de Bloom dans l'ordre des objectifs"""
+        return [entry.level for entry in self.entries]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """Forme sérialisable (JSON) du tableau"""
+        return [entry.to_dict() for entry in self.entries]
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "ClassificationTable":
+        return cls([
+            ClassifiedObjective(
+                objective=record.get("objective", ""),
+                verb=record.get("verb", ""),
+                level=(record.get("level") or UNCLASSIFIED).strip().lower(),
+                justification=record.get("justification", "")
+            )
+            for record in records
+        ])
+
+
+def parse_classification(text: str) -> ClassificationTable:
+    """Construit le tableau des objectifs classifiés à partir du texte de classification"""
+    table = ClassificationTable()
+    for objective, fields in iter_objective_blocks(text or ""):
+        values: Dict[str, str] = {}
+        for label, value in fields.items():
+            field = CLASSIFICATION_FIELDS.get(label)
+            if field:
+                values.setdefault(field, value)
+        table.add(ClassifiedObjective(
+            objective=objective,
+            verb=values.get("verb", ""),
+            level=values.get("level", "").strip().lower() or UNCLASSIFIED,
+            justification=values.get("justification", "")
+        ))
+    return table
+
+
+def classification_table_from_result(result: Dict[str, Any]) -> ClassificationTable:
+    """Tableau d'une analyse : `classified_objectives` déjà calculé, enregistrements structurés, ou texte"""
+    if result.get("classified_objectives"):
+        return ClassificationTable.from_records(result["classified_objectives"])
+
+    classification = result.get("classification", result)
+    if isinstance(classification, dict):
+        records = classification.get("records")
+        if records:
+            return ClassificationTable.from_records(list(records.values()))
+        classification = classification.get("classification", "")
+    return parse_classification(classification if isinstance(classification, str) else "")
+
+
+def _synthetic_classification(num_objectives: int) -> str:
+    """Classification synthétique au format produit par le BloomClassifier"""
+    levels = ["Se souvenir", "Comprendre", "Appliquer", "Analyser", "Évaluer", "Créer"]
+    verbs = ["citer", "expliquer", "utiliser", "comparer", "juger", "concevoir"]
+    blocks = []
+    for i in range(num_objectives):
+        blocks.append(
+            f"Objectif: L'apprenant sera capable de {verbs[i % 6]} la notion n°{i} du module {i // 10}.\n"
+            f"Verbe principal: {verbs[i % 6]}\n"
+            f"Niveau de Bloom: {levels[i % 6]}\n"
+            f"Justification: Le verbe « {verbs[i % 6]} » correspond au niveau {levels[i % 6].lower()} de la taxonomie."
+        )
+    return "\n\n---\n\n".join(blocks)
+
+
+def benchmark_classification_parser(num_objectives: int = 500) -> Dict[str, Any]:
+    """Compare l'analyse en un passage à l'ancienne recherche par expression régulière par objectif"""
+    text = _synthetic_classification(num_objectives)
+
+    start = time.perf_counter()
+    table = parse_classification(text)
+    levels = {entry.objective: table.level_of(entry.objective) for entry in table}
+    single_pass = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = {}
+    for objective in levels:
+        pattern = re.compile(rf"{re.escape(objective)}.*?Niveau de Bloom: ([a-zéè ]+)", re.DOTALL | re.IGNORECASE)
+        match = pattern.search(text)
+        legacy[objective] = match.group(1).strip().lower() if match else UNCLASSIFIED
+    per_objective = time.perf_counter() - start
+
+    return {
+        "objectives": len(table),
+        "single_pass_ms": round(single_pass * 1000, 2),
+        "per_objective_regex_ms": round(per_objective * 1000, 2),
+        "speedup": round(per_objective / single_pass, 1) if single_pass else None,
+        "same_levels": all(legacy[obj] == level for obj, level in levels.items())
+    }
+
+
+if __name__ == "__main__":
+    print("🧪 Benchmark analyse de la classification")
+    print(benchmark_classification_parser())
@@ -0,0 +1,90 @@
+import json
+from typing import Any, Iterable, Iterator, List
+
+
+class JSONArrayStreamParser:
+    """Analyse incrémentale d'un tableau JSON d'objets reçu par morceaux
+
+    Chaque objet de premier niveau est décodé dès que son accolade fermante arrive,
+    sans attendre la fin du tableau. Le texte avant le premier `[` (balises Markdown,
+    phrase d'introduction) est ignoré.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._in_array = False
+        self._closed = False
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._object_start = None
+        self.text_parts: List[str] = []
+        self.errors = 0
+
+    @property
+    def text(self) -> str:
+        """Texte complet reçu jusqu'ici"""
+        return "".join(self.text_parts)
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Ajoute un morceau de texte et retourne les objets complets qu'il a terminés"""
+        if not chunk:
+            return []
+        self.text_parts.append(chunk)
+        if self._closed:
+            return []
+        self._buffer += chunk
+        items = []
+
+        buffer = self._buffer
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+
+            if not self._in_array:
+                if char == "[":
+                    self._in_array = True
+                continue
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0 and char == "{":
+                    self._object_start = pos
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # Fin du tableau de premier niveau : la suite est ignorée
+                    self._closed = True
+                    break
+                self._depth -= 1
+                if self._depth == 0 and self._object_start is not None:
+                    try:
+                        items.append(json.loads(buffer[self._object_start:pos + 1]))
+                    except json.JSONDecodeError:
+                        self.errors += 1
+                    self._object_start = None
+
+        # On ne conserve que l'objet en cours de réception
+        keep_from = self._object_start if self._object_start is not None else len(buffer)
+        self._buffer = buffer[keep_from:]
+        self._pos = len(buffer) - keep_from
+        if self._object_start is not None:
+            self._object_start = 0
+        return items
+
+
+def iter_json_array_items(chunks: Iterable[str]) -> Iterator[Any]:
+    """Produit les objets d'un tableau JSON au fil des morceaux reçus"""
+    parser = JSONArrayStreamParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+
+class CacheBackend:
+    """Interface d'un stockage de réponses LLM (clé -> texte)"""
+
+    def get(self, key: str) -> Optional[str]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: str):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def info(self) -> Dict[str, Any]:
+        return {}
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Cache persistant dans un fichier SQLite avec TTL et éviction LRU par taille"""
+
+    def __init__(self, db_path: str, max_size_bytes: int = 256 * 1024 * 1024, ttl_seconds: Optional[float] = None):
+        self.db_path = str(db_path)
+        self.max_size_bytes = max_size_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_access ON llm_cache(last_access)")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Connexion dans une transaction (validée ou annulée), fermée à la sortie du bloc"""
+        with closing(sqlite3.connect(self.db_path, timeout=30)) as conn:
+            with conn:
+                yield conn
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            row = conn.execute("SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+
+            value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+
+            conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            return value
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, size, created_at, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float):
+        """Supprime les entrées expirées puis les moins récemment utilisées au-delà de la taille maximale"""
+        if self.ttl_seconds is not None:
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+
+        total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+        if total_size <= self.max_size_bytes:
+            return
+
+        excess = total_size - self.max_size_bytes
+        freed = 0
+        keys_to_delete = []
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC"):
+            keys_to_delete.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM llm_cache WHERE key = ?", keys_to_delete)
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def info(self) -> Dict[str, Any]:
+        with self._lock, self._connect() as conn:
+            entries, total_size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return {
+            "backend": "sqlite",
+            "path": self.db_path,
+            "entries": entries,
+            "size_bytes": total_size,
+            "max_size_bytes": self.max_size_bytes,
+            "ttl_seconds": self.ttl_seconds
+        }
+
+
+class LLMCache:
+    """Cache adressé par contenu pour les réponses LLM
+
+    La clé est un hash de (modèle, température, prompt système, contenu utilisateur).
+    Le stockage est délégué à un `CacheBackend` interchangeable.
+    """
+
+    def __init__(self, backend: CacheBackend, enabled: bool = True, bypass_nondeterministic: bool = False):
+        self.backend = backend
+        self.enabled = enabled
+        # Si activé, les appels à température > 0 ne sont jamais servis depuis le cache
+        self.bypass_nondeterministic = bypass_nondeterministic
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, temperature: Optional[float], system_prompt: str, user_payload: Any) -> str:
+        """Calcule la clé de cache d'un appel LLM"""
+        material = json.dumps(
+            {
+                "model": model,
+                "temperature": temperature,
+                "system": system_prompt,
+                "payload": user_payload
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def _should_bypass(self, temperature: Optional[float], bypass: bool) -> bool:
+        if bypass or not self.enabled:
+            return True
+        return self.bypass_nondeterministic and bool(temperature)
+
+    def _count(self, counter: str):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _lookup(self, key: str) -> Optional[str]:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            print(f"⚠️ Erreur lecture cache LLM: {e}")
+            return None
+
+    def _store(self, key: str, value: str):
+        try:
+            self.backend.set(key, value)
+        except Exception as e:
+            print(f"⚠️ Erreur écriture cache LLM: {e}")
+
+    def get_or_compute(
+        self,
+        model: str,
+        temperature: Optional[float],
+        system_prompt: str,
+        user_payload: Any,
+        compute: Callable[[], str],
+        bypass: bool = False,
+        refresh: bool = False
+    ) -> str:
+        """Retourne la réponse en cache ou l'obtient via `compute` puis la stocke
+
+        `bypass` ignore le cache (ni lecture ni écriture); `refresh` force un nouvel appel
+        dont la réponse remplace celle en cache (régénération explicite).
+        """
+        if self._should_bypass(temperature, bypass):
+            self._count("bypassed")
+            return compute()
+
+        key = self.make_key(model, temperature, system_prompt, user_payload)
+        cached = None if refresh else self._lookup(key)
+        if cached is not None:
+            self._count("hits")
+            return cached
+
+        self._count("misses")
+        value = compute()
+        if isinstance(value, str):
+            self._store(key, value)
+        return value
+
+    async def aget_or_compute(
+        self,
+        model: str,
+        temperature: Optional[float],
+        system_prompt: str,
+        user_payload: Any,
+        compute: Callable[[], Awaitable[str]],
+        bypass: bool = False,
+        refresh: bool = False
+    ) -> str:
+        """Version asynchrone de get_or_compute
+
+        Les accès au stockage (verrou et fichier SQLite) se font dans un thread pour ne
+        pas bloquer la boucle d'événements.
+        """
+        if self._should_bypass(temperature, bypass):
+            self._count("bypassed")
+            return await compute()
+
+        key = self.make_key(model, temperature, system_prompt, user_payload)
+        cached = None if refresh else await asyncio.to_thread(self._lookup, key)
+        if cached is not None:
+            self._count("hits")
+            return cached
+
+        self._count("misses")
+        value = await compute()
+        if isinstance(value, str):
+            await asyncio.to_thread(self._store, key, value)
+        return value
+
+    def get_or_stream(
+        self,
+        model: str,
+        temperature: Optional[float],
+        system_prompt: str,
+        user_payload: Any,
+        stream: Callable[[], Iterator[str]],
+        bypass: bool = False,
+        refresh: bool = False
+    ) -> Iterator[str]:
+        """Produit la réponse en morceaux : en un seul morceau depuis le cache, sinon au fil du flux
+
+        La réponse complète n'est stockée qu'une fois le flux entièrement consommé.
+        """
+        if self._should_bypass(temperature, bypass):
+            self._count("bypassed")
+            yield from stream()
+            return
+
+        key = self.make_key(model, temperature, system_prompt, user_payload)
+        cached = None if refresh else self._lookup(key)
+        if cached is not None:
+            self._count("hits")
+            yield cached
+            return
+
+        self._count("misses")
+        parts = []
+        for chunk in stream():
+            parts.append(chunk)
+            yield chunk
+        self._store(key, "".join(parts))
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiques d'utilisation du cache"""
+        lookups = self.hits + self.misses
+        stats = {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+        try:
+            stats.update(self.backend.info())
+        except Exception:
+            pass
+        return stats
+
+
+_default_cache: Optional[LLMCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> LLMCache:
+    """Retourne le cache LLM partagé par le processus, configuré par variables d'environnement"""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            default_path = Path(__file__).parent.parent.parent / "llm_cache.db"
+            ttl_hours = float(os.getenv("LLM_CACHE_TTL_HOURS", 24 * 7))
+            backend = SQLiteCacheBackend(
+                os.getenv("LLM_CACHE_PATH", str(default_path)),
+                max_size_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", 256)) * 1024 * 1024),
+                ttl_seconds=ttl_hours * 3600 if ttl_hours > 0 else None
+            )
+            _default_cache = LLMCache(
+                backend,
+                enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+                bypass_nondeterministic=os.getenv("LLM_CACHE_BYPASS_NONDETERMINISTIC", "false").lower() == "true"
+            )
+        return _default_cache
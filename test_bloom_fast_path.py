@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests de la classification locale des verbes d'action (taxonomie de Bloom)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent / "agent"))
+
+from bloom_taxonomy import BloomTaxonomy
+
+
+@pytest.mark.parametrize("objective, expected", [
+    ("L'apprenant sera capable de lister les modules d'un ERP", ("lister", "se souvenir")),
+    ("L'apprenant listera les étapes d'une migration", ("lister", "se souvenir")),
+    ("Concevoir un plan de formation", ("concevoir", "créer")),
+    ("Les étudiants devront donner des exemples de KPI", ("donner des exemples", "comprendre")),
+    ("L'apprenant sera capable de résoudre une équation", ("résoudre", "appliquer")),
+])
+def test_unambiguous_verbs_are_classified_locally(objective, expected):
+    assert BloomTaxonomy.pre_classify(objective) == expected
+
+
+@pytest.mark.parametrize("objective, verb", [
+    ("L'apprenant sera capable d'identifier les risques", "identifier"),
+    ("L'apprenant sera capable de les comparer", "comparer"),
+    ("Expliquer le rôle d'un ERP", "expliquer"),
+])
+def test_ambiguous_verbs_are_left_to_the_llm(objective, verb):
+    found, levels = BloomTaxonomy.extract_action_verb(objective)
+
+    assert found == verb
+    assert len(levels) > 1
+    assert BloomTaxonomy.pre_classify(objective) is None
+
+
+def test_unknown_verb_is_left_to_the_llm():
+    assert BloomTaxonomy.extract_action_verb("L'apprenant sera capable de nager 50 mètres") is None
+    assert BloomTaxonomy.pre_classify("") is None
+
+
+def test_levels_for_verb_ignores_accents_and_case():
+    assert BloomTaxonomy.levels_for_verb("Reconnaitre") == ["se souvenir"]
+    assert BloomTaxonomy.levels_for_verb("différencier") == ["comprendre", "analyser"]
+    assert BloomTaxonomy.levels_for_verb("nager") == []
+
+
+def test_classifier_reports_fast_path_counts_per_call(tmp_path, monkeypatch):
+    """Seuls les objectifs ambigus partent au LLM ; chaque résultat porte les compteurs de son appel"""
+    components = pytest.importorskip("components")
+    fake_chat_models = pytest.importorskip("langchain_core.language_models.fake_chat_models")
+    from shared.utils.llm_cache import LLMCache, SQLiteCacheBackend
+
+    cache = LLMCache(SQLiteCacheBackend(str(tmp_path / "llm_cache.db")), enabled=False)
+    monkeypatch.setattr(components, "get_llm_cache", lambda: cache)
+    llm = fake_chat_models.FakeListChatModel(responses=[
+        "Objectif: L'apprenant sera capable d'identifier les risques\n"
+        "Verbe principal: identifier\n"
+        "Niveau de Bloom: Analyser\n"
+        "Justification: Décomposer une situation."
+    ])
+    classifier = components.BloomClassifier(llm, shard_tokens=0)
+    mixed = ["L'apprenant sera capable de lister les modules", "L'apprenant sera capable d'identifier les risques"]
+
+    result = classifier.classify(mixed)
+
+    assert list(result["records"]) == mixed
+    assert result["records"][mixed[0]]["level"] == "se souvenir"
+    assert result["records"][mixed[1]]["level"] == "analyser"
+    assert result["fast_path"]["objectives"] == 2
+    assert result["fast_path"]["local"] == 1
+    assert result["fast_path"]["llm_calls"] == 1
+
+    local_only = classifier.classify(mixed[:1])
+    assert local_only["fast_path"]["llm_calls"] == 0
+    assert local_only["fast_path"]["llm_calls_avoided"] == 1
+
+    # Le cumul n'apparaît que dans les statistiques du composant
+    assert classifier.fast_path_stats()["objectives"] == 3
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests de l'analyse en un passage du texte de classification de Bloom
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from shared.utils.classification_parser import (
+    UNCLASSIFIED,
+    ClassificationTable,
+    classification_table_from_result,
+    parse_classification
+)
+
+CLASSIFICATION = """
+Voici la classification demandée :
+
+1. **Objectif :** L'apprenant sera capable d'identifier les modules d'un ERP.
+   - **Verbe principal :** identifier
+   - **Niveau de Bloom :** Se souvenir
+   - **Justification :** Il s'agit de reconnaître des éléments.
+
+---
+
+Objectif: L'apprenant sera capable de concevoir un plan de migration
+Verbe: concevoir
+Niveau de Bloom: CRÉER
+Justification: Production d'un livrable original.
+Niveau de Bloom: Analyser
+
+Objectif: Comprendre la gestion des stocks
+"""
+
+
+def test_parses_markdown_and_plain_blocks_in_order():
+    table = parse_classification(CLASSIFICATION)
+
+    assert len(table) == 3
+    first, second, third = table
+    assert first.objective == "L'apprenant sera capable d'identifier les modules d'un ERP."
+    assert first.verb == "identifier"
+    assert first.level == "se souvenir"
+    assert first.justification == "Il s'agit de reconnaître des éléments."
+    assert [entry.position for entry in table] == [0, 1, 2]
+
+
+def test_first_value_wins_and_levels_are_normalized():
+    second = parse_classification(CLASSIFICATION).entries[1]
+
+    assert second.verb == "concevoir"
+    assert second.level == "créer"
+
+
+def test_objective_without_fields_is_unclassified():
+    table = parse_classification(CLASSIFICATION)
+
+    assert table.entries[2].level == UNCLASSIFIED
+    assert table.levels()[-1] == UNCLASSIFIED
+
+
+def test_lookup_ignores_case_and_formatting():
+    table = parse_classification(CLASSIFICATION)
+
+    assert table.level_of("  **l'apprenant sera capable de concevoir un plan de migration.** ") == "créer"
+    assert table.level_of("Objectif inconnu") == UNCLASSIFIED
+
+
+def test_text_without_objective_gives_empty_table():
+    assert len(parse_classification("")) == 0
+    assert len(parse_classification("Niveau de Bloom: Appliquer")) == 0
+    assert len(parse_classification(None)) == 0
+
+
+def test_records_round_trip():
+    table = parse_classification(CLASSIFICATION)
+
+    restored = ClassificationTable.from_records(table.to_records())
+
+    assert restored.to_records() == table.to_records()
+
+
+def test_table_from_result_prefers_structured_records():
+    records = {"a": {"objective": "Analyser un bilan", "verb": "analyser", "level": "Analyser", "justification": ""}}
+
+    table = classification_table_from_result({"classification": {"classification": CLASSIFICATION, "records": records}})
+    assert table.levels() == ["analyser"]
+
+    table = classification_table_from_result({"classification": {"classification": CLASSIFICATION}})
+    assert len(table) == 3
+
+    table = classification_table_from_result({"classification": CLASSIFICATION})
+    assert len(table) == 3
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Tests du calcul des embeddings par lots (hors ligne, avec FakeEmbeddings)
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent / "agent"))
+
+from embedding_batcher import EmbeddingBatcher, FakeEmbeddings
+
+
+class RecordingEmbeddings(FakeEmbeddings):
+    """FakeEmbeddings qui garde les lots reçus et peut faire échouer ou ralentir certains lots"""
+
+    def __init__(self, fail_on=None, slow_on=None):
+        super().__init__(dimension=8, latency_per_call=0)
+        self.fail_on = fail_on
+        self.slow_on = slow_on
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def embed_documents(self, texts):
+        with self._lock:
+            self.batches.append(list(texts))
+        if self.fail_on in texts:
+            raise RuntimeError("quota dépassé")
+        if self.slow_on in texts:
+            time.sleep(0.1)
+        return super().embed_documents(texts)
+
+
+def test_batches_respect_token_budget_and_size():
+    batcher = EmbeddingBatcher(FakeEmbeddings(dimension=8, latency_per_call=0), max_batch_tokens=10,
+                               max_batch_size=3, token_counter=len)
+
+    assert batcher.make_batches(["aaaa", "bbbb", "cc", "dddddd", "e", "f", "g", "h"]) == [[0, 1, 2], [3, 4, 5], [6, 7]]
+
+
+def test_oversized_text_gets_its_own_batch():
+    batcher = EmbeddingBatcher(FakeEmbeddings(dimension=8, latency_per_call=0), max_batch_tokens=5, token_counter=len)
+
+    assert batcher.make_batches(["ab", "x" * 20, "cd"]) == [[0], [1], [2]]
+
+
+def test_batch_token_counter_is_called_once():
+    calls = []
+
+    def count_all(texts):
+        calls.append(len(texts))
+        return [len(text) for text in texts]
+
+    batcher = EmbeddingBatcher(FakeEmbeddings(dimension=8, latency_per_call=0), max_batch_tokens=6,
+                               batch_token_counter=count_all)
+
+    assert batcher.make_batches(["abc", "def", "ghi"]) == [[0, 1], [2]]
+    assert calls == [3]
+
+
+def test_embeddings_keep_input_order_when_batches_finish_out_of_order():
+    texts = [f"chunk {i}" for i in range(10)]
+    embeddings = RecordingEmbeddings(slow_on="chunk 0")
+    batcher = EmbeddingBatcher(embeddings, max_batch_size=2, max_workers=4)
+
+    vectors = batcher.embed(texts)
+
+    assert len(embeddings.batches) == 5
+    assert vectors == [FakeEmbeddings(dimension=8)._vector(text) for text in texts]
+
+
+def test_failed_batch_leaves_none_and_keeps_other_batches():
+    texts = [f"chunk {i}" for i in range(6)]
+    progress = []
+    batcher = EmbeddingBatcher(RecordingEmbeddings(fail_on="chunk 2"), max_batch_size=2, max_workers=2)
+
+    vectors = batcher.embed(texts, progress_callback=lambda done, total: progress.append((done, total)))
+
+    assert vectors[2] is None and vectors[3] is None
+    assert all(vector is not None for i, vector in enumerate(vectors) if i not in (2, 3))
+    # Le lot en échec compte dans la progression
+    assert sorted(progress)[-1] == (6, 6)
+
+
+def test_empty_input_makes_no_call():
+    embeddings = RecordingEmbeddings()
+
+    assert EmbeddingBatcher(embeddings).embed([]) == []
+    assert embeddings.batches == []
+
+
+def test_document_ingestion_with_fake_embeddings(tmp_path, monkeypatch):
+    """Ingestion complète hors ligne : découpage, embeddings par lots, index local et manifeste"""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test")
+    enhanced_agent = pytest.importorskip("enhanced_agent")
+    from chunk_store import ChunkStore
+    from vector_stores import LocalVectorStore
+
+    monkeypatch.setattr(enhanced_agent, "EMBEDDING_CACHE_DIR", str(tmp_path / "embedding_cache"))
+    embeddings = RecordingEmbeddings()
+    processor = enhanced_agent.DocumentProcessor(
+        embeddings=embeddings,
+        vector_store=LocalVectorStore(str(tmp_path / "vector_store")),
+        chunk_store=ChunkStore(str(tmp_path / "chunk_store.db"))
+    )
+    processor.ingest_process_workers = 1
+
+    class UploadedFile:
+        def __init__(self, name, data):
+            self.name = name
+            self._data = data
+
+        def getvalue(self):
+            return self._data
+
+    text = " ".join(f"Le module {i} présente la gestion des stocks dans un ERP." for i in range(300))
+    summaries, names = processor.process_documents([UploadedFile("cours.txt", text.encode("utf-8"))], "session-1")
+
+    assert names == ["cours.txt"]
+    assert summaries[0]["chunk_count"] > 1
+    embedded = [chunk for batch in embeddings.batches for chunk in batch if chunk not in enhanced_agent.OBJECTIVE_KEYWORDS]
+    assert len(embedded) == summaries[0]["chunk_count"]
+
+    # Un second envoi du même fichier ne recalcule aucun embedding
+    calls = len(embeddings.batches)
+    processor.process_documents([UploadedFile("cours.txt", text.encode("utf-8"))], "session-1")
+    assert len(embeddings.batches) == calls
+
+    results = processor.search_relevant_content("module 42 stocks", "session-1", top_k=1, mode="lexical")
+    assert results and results[0].startswith("Source: cours.txt")
+
+
+def test_document_processor_embeds_with_the_given_api_key(tmp_path, monkeypatch):
+    """La clé passée par l'orchestrateur (et utilisée dans la clé du registre) sert aux embeddings"""
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-env")
+    enhanced_agent = pytest.importorskip("enhanced_agent")
+    from chunk_store import ChunkStore
+    from vector_stores import LocalVectorStore
+
+    monkeypatch.setattr(enhanced_agent, "EMBEDDING_CACHE_DIR", str(tmp_path / "embedding_cache"))
+    processor = enhanced_agent.DocumentProcessor(
+        vector_store=LocalVectorStore(str(tmp_path / "vector_store")),
+        chunk_store=ChunkStore(str(tmp_path / "chunk_store.db")),
+        openai_api_key="sk-orchestrateur"
+    )
+
+    assert processor.embeddings.openai_api_key.get_secret_value() == "sk-orchestrateur"
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests de l'analyse incrémentale d'un tableau JSON reçu par morceaux
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+
+from shared.utils.json_stream import JSONArrayStreamParser, iter_json_array_items
+
+SCREENS = [
+    {"num_ecran": "01-Intro-01", "titre_ecran": "Accolades { et } dans un titre", "type_activite": "text"},
+    {"num_ecran": "02-Seq-01", "titre_ecran": "Crochets ] [ et \"guillemets\"", "details": {"bloom": ["comprendre"]}},
+    {"num_ecran": "03-Quiz-01", "titre_ecran": "Antislash \\ final\\", "questions": [{"q": "}{", "r": "]"}]},
+    {"num_ecran": "04-Seq-02", "titre_ecran": "Écran accentué — ça marche ✓", "duree_estimee": 5}
+]
+
+RESPONSE = "Voici le séquenceur :\n```json\n" + json.dumps(SCREENS, ensure_ascii=False, indent=2) + "\n```\nBonne formation !"
+
+
+def _random_chunks(text, seed):
+    rng = random.Random(seed)
+    chunks, position = [], 0
+    while position < len(text):
+        size = rng.randint(1, 12)
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_items_are_identical_for_any_chunk_boundaries(seed):
+    assert list(iter_json_array_items(_random_chunks(RESPONSE, seed))) == SCREENS
+
+
+def test_character_by_character_stream():
+    assert list(iter_json_array_items(RESPONSE)) == SCREENS
+
+
+def test_each_item_is_emitted_as_soon_as_it_is_closed():
+    parser = JSONArrayStreamParser()
+    first_end = RESPONSE.index('"type_activite": "text"\n  }') + len('"type_activite": "text"\n  }')
+
+    assert parser.feed(RESPONSE[:first_end - 1]) == []
+    assert parser.feed(RESPONSE[first_end - 1:first_end]) == SCREENS[:1]
+    assert parser.feed(RESPONSE[first_end:]) == SCREENS[1:]
+
+
+def test_text_after_the_array_is_ignored_but_kept():
+    parser = JSONArrayStreamParser()
+    items = parser.feed('[{"a": 1}] puis [{"b": 2}]')
+    items += parser.feed(' et {"c": 3}')
+
+    assert items == [{"a": 1}]
+    assert parser.text == '[{"a": 1}] puis [{"b": 2}] et {"c": 3}'
+
+
+def test_invalid_item_is_counted_and_skipped():
+    parser = JSONArrayStreamParser()
+
+    items = parser.feed('[{"a": 1}, {"b": tru}, {"c": 3}]')
+
+    assert items == [{"a": 1}, {"c": 3}]
+    assert parser.errors == 1
+
+
+def test_no_array_gives_no_item():
+    parser = JSONArrayStreamParser()
+
+    assert parser.feed("Je ne peux pas générer ce séquenceur.") == []
+    assert parser.feed("") == []
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests de la recherche lexicale BM25 et de la fusion RRF (recherche hybride)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent / "agent"))
+
+from lexical_index import BM25Index, reciprocal_rank_fusion, tokenize
+from vector_stores import PineconeIndexStore
+
+
+def _index():
+    index = BM25Index()
+    index.add("a", "Introduction aux systèmes ERP et à la gestion des stocks", {"source": "cours.pdf"})
+    index.add("b", "Le module INF-1010 couvre les bases de données relationnelles", {"source": "plan.docx"})
+    index.add("c", "Gestion de projet agile : sprints, backlog et rétrospectives", {"source": "agile.txt"})
+    return index
+
+
+def test_tokenize_ignores_accents_and_stopwords():
+    assert tokenize("Les Systèmes de l'ERP") == ["systemes", "erp"]
+    assert "inf-1010" in tokenize("Cours INF-1010")
+
+
+def test_bm25_ranks_matching_document_first():
+    results = _index().search("systèmes ERP", top_k=2)
+    assert results[0]["id"] == "a"
+    assert results[0]["metadata"]["source"] == "cours.pdf"
+    assert all(result["score"] > 0 for result in results)
+
+
+def test_bm25_finds_course_code():
+    assert [result["id"] for result in _index().search("INF-1010")] == ["b"]
+
+
+def test_bm25_replace_and_remove():
+    index = _index()
+    index.add("a", "Programmation Python", {"source": "python.md"})
+    assert index.search("ERP") == []
+    assert index.search("python")[0]["metadata"]["source"] == "python.md"
+
+    index.remove(["a", "inconnu"])
+    assert len(index) == 2
+    assert index.search("python") == []
+
+
+def test_rrf_rewards_documents_ranked_by_both_lists():
+    dense = [{"id": "x", "score": 0.9, "metadata": {}}, {"id": "y", "score": 0.8, "metadata": {}}]
+    lexical = [{"id": "y", "score": 7.0, "metadata": {}}, {"id": "z", "score": 3.0, "metadata": {}}]
+
+    fused = reciprocal_rank_fusion([dense, lexical], k=60, top_k=3)
+
+    assert [match["id"] for match in fused] == ["y", "x", "z"]
+    assert fused[0]["score"] == pytest.approx(1 / 62 + 1 / 61)
+    # Les résultats d'entrée ne sont pas modifiés
+    assert dense[1]["score"] == 0.8
+
+
+def test_rrf_fuses_pinecone_matches():
+    """Les résultats Pinecone (ScoredVector) sont convertis en dicts avant la fusion"""
+    models = pytest.importorskip("pinecone.core.openapi.db_data.models")
+
+    class FakeIndex:
+        def query(self, **kwargs):
+            return {"matches": [
+                models.ScoredVector(id="a", score=0.91, metadata={"source": "cours.pdf", "text": "ERP"}),
+                models.ScoredVector(id="d", score=0.52, metadata={"source": "annexe.pdf", "text": "Stocks"})
+            ]}
+
+    store = PineconeIndexStore.__new__(PineconeIndexStore)
+    store.index = FakeIndex()
+    dense = store.query([0.1, 0.2], top_k=2, filter={"session_id": {"$eq": "s1"}})["matches"]
+    assert dense[0] == {"id": "a", "score": 0.91, "metadata": {"source": "cours.pdf", "text": "ERP"}}
+
+    lexical = _index().search("systèmes ERP", top_k=2)
+    fused = reciprocal_rank_fusion([dense, lexical], top_k=3)
+
+    assert fused[0]["id"] == "a"
+    assert fused[0]["metadata"]["source"] == "cours.pdf"
+    assert {match["id"] for match in fused} >= {"a", "d"}
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests du cache des réponses LLM
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from shared.utils.llm_cache import LLMCache, SQLiteCacheBackend
+
+
+def _cache(tmp_path, **kwargs):
+    return LLMCache(SQLiteCacheBackend(str(tmp_path / "llm_cache.db")), **kwargs)
+
+
+def test_second_call_is_served_from_cache(tmp_path):
+    cache = _cache(tmp_path)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "réponse"
+
+    assert cache.get_or_compute("gpt-4o", 0, "système", {"q": 1}, compute) == "réponse"
+    assert cache.get_or_compute("gpt-4o", 0, "système", {"q": 1}, compute) == "réponse"
+    assert cache.get_or_compute("gpt-4o", 0, "système", {"q": 2}, compute) == "réponse"
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_async_lookup_does_not_block_the_event_loop(tmp_path):
+    """Un verrou du cache tenu par un autre thread ne doit pas figer les autres coroutines"""
+    cache = _cache(tmp_path)
+    cache.get_or_compute("gpt-4o", 0, "système", "q", lambda: "en cache")
+    locked = threading.Event()
+
+    def hold_lock():
+        with cache.backend._lock:
+            locked.set()
+            time.sleep(0.3)
+
+    async def compute():
+        return "calculé"
+
+    async def main():
+        ticks = []
+
+        async def ticker():
+            for _ in range(10):
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.02)
+
+        ticking = asyncio.create_task(ticker())
+        await asyncio.sleep(0.03)
+        value = await cache.aget_or_compute("gpt-4o", 0, "système", "q", compute)
+        await ticking
+        return value, ticks
+
+    holder = threading.Thread(target=hold_lock)
+    holder.start()
+    locked.wait()
+    value, ticks = asyncio.run(main())
+    holder.join()
+
+    assert value == "en cache"
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.15
+
+
+def test_refresh_replaces_the_cached_response(tmp_path):
+    """Une régénération explicite ignore la réponse en cache et la remplace"""
+    cache = _cache(tmp_path)
+    answers = iter(["première", "seconde"])
+
+    def compute():
+        return next(answers)
+
+    assert cache.get_or_compute("gpt-4o", 0.7, "système", "q", compute) == "première"
+    assert cache.get_or_compute("gpt-4o", 0.7, "système", "q", compute, refresh=True) == "seconde"
+    assert cache.get_or_compute("gpt-4o", 0.7, "système", "q", lambda: "jamais") == "seconde"
+
+
+def test_bypass_nondeterministic_only_skips_sampled_calls(tmp_path):
+    cache = _cache(tmp_path, bypass_nondeterministic=True)
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return "réponse"
+
+    for _ in range(2):
+        cache.get_or_compute("gpt-4o", 0.7, "système", "q", compute)
+        cache.get_or_compute("gpt-4o", 0, "système", "q", compute)
+
+    assert len(calls) == 3
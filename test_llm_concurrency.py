@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests du plafond d'appels LLM simultanés partagé par les étapes du pipeline et leurs lots
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent))
+sys.path.append(str(Path(__file__).parent / "agent"))
+
+from pipeline import ConcurrencyLimiter, StageGraph
+
+components = pytest.importorskip("components")
+fake_chat_models = pytest.importorskip("langchain_core.language_models.fake_chat_models")
+
+from shared.utils.llm_cache import LLMCache, SQLiteCacheBackend
+
+OBJECTIVES = [f"L'apprenant sera capable de reformuler l'objectif numéro {i} du module" for i in range(12)]
+
+
+class InFlight:
+    """Compte les appels au modèle en cours et retient le maximum observé"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.current = 0
+        self.peak = 0
+
+    def __enter__(self):
+        with self.lock:
+            self.current += 1
+            self.peak = max(self.peak, self.current)
+
+    def __exit__(self, *exc):
+        with self.lock:
+            self.current -= 1
+
+
+class SlowChatModel(fake_chat_models.FakeListChatModel):
+    """Modèle factice lent qui enregistre sa concurrence"""
+
+    in_flight: InFlight
+
+    def _call(self, *args, **kwargs):
+        with self.in_flight:
+            time.sleep(0.05)
+        return "1. Objectif reformulé"
+
+    async def _acall(self, *args, **kwargs):
+        with self.in_flight:
+            await asyncio.sleep(0.05)
+        return "1. Objectif reformulé"
+
+
+@pytest.fixture
+def llm(tmp_path, monkeypatch):
+    cache = LLMCache(SQLiteCacheBackend(str(tmp_path / "llm_cache.db")), enabled=False)
+    monkeypatch.setattr(components, "get_llm_cache", lambda: cache)
+    return SlowChatModel(responses=["-"], in_flight=InFlight())
+
+
+def _graph(llm, limiter, use_async):
+    """Deux étapes indépendantes découpant chacune leurs objectifs en plusieurs lots"""
+    graph = StageGraph(max_concurrency=4)
+    for name in ("formatted", "formatted_again"):
+        formatter = components.ObjectiveFormatter(llm, shard_tokens=60, max_workers=4, limiter=limiter)
+        if use_async:
+            async def stage(results, formatter=formatter):
+                return await formatter.aformat(OBJECTIVES)
+        else:
+            def stage(results, formatter=formatter):
+                return formatter.format(OBJECTIVES)
+        graph.add_stage(name, stage)
+    return graph
+
+
+def test_shared_limiter_bounds_sharded_calls_across_stages(llm):
+    results = _graph(llm, ConcurrencyLimiter(2), use_async=False).run()
+
+    assert results["formatted"]["formatted_objectives"].count("Objectif reformulé") > 1
+    assert llm.in_flight.peak == 2
+
+
+def test_shared_limiter_bounds_async_sharded_calls_across_stages(llm):
+    results = asyncio.run(_graph(llm, ConcurrencyLimiter(2), use_async=True).arun())
+
+    assert results["formatted_again"]["formatted_objectives"].count("Objectif reformulé") > 1
+    assert llm.in_flight.peak == 2
+
+
+def test_limiter_can_be_reused_across_event_loops():
+    limiter = ConcurrencyLimiter(1)
+
+    async def call():
+        async with limiter.aslot():
+            return True
+
+    assert asyncio.run(call())
+    assert asyncio.run(call())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Tests de l'index vectoriel local (alternative hors ligne à Pinecone)
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent / "agent"))
+
+from vector_stores import LocalVectorStore, create_vector_store
+
+
+def _vector(session_id, vector_id, values, **metadata):
+    return {"id": vector_id, "values": values, "metadata": dict(metadata, session_id=session_id)}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LocalVectorStore(str(tmp_path / "vector_store"))
+    store.upsert([
+        _vector("s1", "a", [1.0, 0.0, 0.0], source="cours.pdf"),
+        _vector("s1", "b", [0.0, 1.0, 0.0], source="annexe.pdf"),
+        _vector("s1", "c", [0.7, 0.7, 0.0], source="annexe.pdf"),
+        _vector("s2", "d", [1.0, 0.0, 0.0], source="autre.pdf")
+    ])
+    return store
+
+
+def _ids(response):
+    return [match["id"] for match in response["matches"]]
+
+
+def test_query_returns_nearest_vectors_of_the_session(store):
+    response = store.query([1.0, 0.1, 0.0], top_k=2, filter={"session_id": {"$eq": "s1"}})
+
+    assert _ids(response) == ["a", "c"]
+    assert response["matches"][0]["score"] == pytest.approx(0.995, abs=1e-3)
+    assert response["matches"][0]["metadata"]["source"] == "cours.pdf"
+
+
+def test_query_without_session_searches_all_sessions(store):
+    assert set(_ids(store.query([1.0, 0.0, 0.0], top_k=2))) == {"a", "d"}
+
+
+def test_query_applies_metadata_filter(store):
+    response = store.query([1.0, 0.0, 0.0], top_k=3, filter={"session_id": "s1", "source": {"$eq": "annexe.pdf"}})
+
+    assert _ids(response) == ["c", "b"]
+
+
+def test_query_many_answers_each_vector(store):
+    responses = store.query_many([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], top_k=1, filter={"session_id": {"$eq": "s1"}})
+
+    assert [_ids(response) for response in responses] == [["a"], ["b"]]
+
+
+def test_upsert_replaces_existing_id(store):
+    store.upsert([_vector("s1", "a", [0.0, 0.0, 1.0], source="nouveau.pdf")])
+
+    response = store.query([0.0, 0.0, 1.0], top_k=3, filter={"session_id": {"$eq": "s1"}})
+    assert _ids(response)[0] == "a"
+    assert response["matches"][0]["metadata"]["source"] == "nouveau.pdf"
+    assert len(response["matches"]) == 3
+
+
+def test_upsert_rejects_other_dimension(store):
+    with pytest.raises(ValueError):
+        store.upsert([_vector("s1", "e", [1.0, 0.0])])
+
+
+def test_delete_by_ids(store):
+    store.delete(ids=["a", "b"], filter={"session_id": {"$eq": "s1"}})
+
+    assert _ids(store.query([1.0, 0.0, 0.0], top_k=5, filter={"session_id": {"$eq": "s1"}})) == ["c"]
+    assert _ids(store.query([1.0, 0.0, 0.0], top_k=5, filter={"session_id": {"$eq": "s2"}})) == ["d"]
+
+
+def test_delete_by_metadata_filter(store):
+    store.delete(filter={"session_id": {"$eq": "s1"}, "source": {"$eq": "annexe.pdf"}})
+
+    assert _ids(store.query([0.0, 1.0, 0.0], top_k=5, filter={"session_id": {"$eq": "s1"}})) == ["a"]
+
+
+def test_delete_whole_session(store):
+    store.delete(filter={"session_id": {"$eq": "s1"}})
+
+    assert store.query([1.0, 0.0, 0.0], top_k=5, filter={"session_id": {"$eq": "s1"}}) == {"matches": []}
+    assert _ids(store.query([1.0, 0.0, 0.0], top_k=5)) == ["d"]
+
+
+def test_reopening_from_disk_keeps_vectors_and_replacements(store):
+    store.upsert([
+        _vector("s1", "b", [0.0, 0.0, 1.0], source="remplacé.pdf"),
+        _vector("s1", "e", [0.0, 0.6, 0.8], source="ajout.pdf")
+    ])
+
+    reopened = LocalVectorStore(str(store.root_dir))
+    response = reopened.query([0.0, 0.0, 1.0], top_k=5, filter={"session_id": {"$eq": "s1"}})
+
+    assert _ids(response)[:2] == ["b", "e"]
+    assert response["matches"][0]["metadata"]["source"] == "remplacé.pdf"
+    assert sorted(_ids(response)) == ["a", "b", "c", "e"]
+
+
+def test_create_vector_store_local_backend(tmp_path):
+    assert isinstance(create_vector_store("local", root_dir=str(tmp_path)), LocalVectorStore)
+    with pytest.raises(ValueError):
+        create_vector_store("inconnu")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests du comptage de tokens et du découpage en chunks bornés en tokens
+"""
+
+import os
+import random
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent / "agent"))
+
+from tokenization import TokenAwareTextSplitter, count_tokens, count_tokens_batch
+
+
+def _document(seed=0, paragraphs=40):
+    rng = random.Random(seed)
+    words = ["apprenant", "objectif", "évaluer", "ERP", "INF-1010", "compétence", "données", "l'analyse", "42,5 %"]
+    text = []
+    for _ in range(paragraphs):
+        sentences = [" ".join(rng.choice(words) for _ in range(rng.randint(3, 40))) for _ in range(rng.randint(1, 6))]
+        text.append(". ".join(sentences) + ".")
+    # Un « mot » sans séparateur force le découpage direct sur les tokens
+    text.append("x" * 5000)
+    return "\n\n".join(text)
+
+
+def test_count_tokens_batch_matches_single_counts():
+    texts = ["Bonjour le monde", "", "L'apprenant sera capable d'analyser les données ERP."]
+
+    assert count_tokens_batch(texts) == [count_tokens(text) for text in texts]
+    assert count_tokens_batch([]) == []
+
+
+@pytest.mark.parametrize("chunk_size, chunk_overlap", [(400, 80), (50, 10), (16, 0)])
+def test_chunks_never_exceed_chunk_size(chunk_size, chunk_overlap):
+    splitter = TokenAwareTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+    chunks = splitter.split_text(_document())
+
+    assert len(chunks) > 1
+    assert max(count_tokens(chunk) for chunk in chunks) <= chunk_size
+
+
+def test_chunks_cover_the_whole_text():
+    text = _document(seed=1, paragraphs=10)
+    chunks = TokenAwareTextSplitter(chunk_size=60, chunk_overlap=0).split_text(text)
+
+    # Sans chevauchement, les chunks mis bout à bout redonnent le texte (aux espaces près)
+    assert "".join("".join(chunks).split()) == "".join(text.split())
+
+
+def test_split_stream_respects_chunk_size():
+    splitter = TokenAwareTextSplitter(chunk_size=80, chunk_overlap=20)
+    pages = _document(seed=2).split("\n\n")
+
+    chunks = list(splitter.split_stream(pages, buffer_tokens=200))
+
+    assert chunks
+    assert max(count_tokens(chunk) for chunk in chunks) <= 80
+
+
+def test_invalid_overlap_is_rejected():
+    with pytest.raises(ValueError):
+        TokenAwareTextSplitter(chunk_size=10, chunk_overlap=10)
+
+
+def test_empty_text_gives_no_chunk():
+    assert TokenAwareTextSplitter().split_text("") == []
+
+
+def test_chunk_worker_runs_in_a_spawned_process_without_agent_on_sys_path(tmp_path):
+    """Le découpage en processus séparé ne dépend pas du sys.path du parent"""
+    script = (
+        "import multiprocessing, sys\n"
+        "from concurrent.futures import ProcessPoolExecutor\n"
+        "from agent.document_streaming import chunk_document_worker\n"
+        "if __name__ == '__main__':\n"
+        "    assert not any(path.endswith('agent') for path in sys.path)\n"
+        "    text = ('Le module présente la gestion des stocks. ' * 300).encode('utf-8')\n"
+        "    context = multiprocessing.get_context('spawn')\n"
+        "    with ProcessPoolExecutor(1, mp_context=context) as executor:\n"
+        "        summary, chunks = executor.submit(chunk_document_worker, 'cours.txt', text, 100, 10, None).result()\n"
+        "    assert summary['chunk_count'] == len(chunks) > 1\n"
+    )
+    (tmp_path / "run_worker.py").write_text(script, encoding="utf-8")
+    env = dict(os.environ, PYTHONPATH=str(Path(__file__).parent))
+
+    result = subprocess.run([sys.executable, "run_worker.py"], cwd=tmp_path, env=env, capture_output=True, text=True)
+
+    assert result.returncode == 0, result.stderr